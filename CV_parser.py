@@ -1,33 +1,174 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
 import fitz  # PyMuPDF
 
+import metrics
+from config import CV_MAX_BYTES, CV_MAX_PAGES, CV_CACHE_SIZE
+
+# Extracted text of recently parsed files, keyed by the SHA-256 of their bytes
+_text_cache = OrderedDict()
+_text_cache_lock = threading.Lock()
+
+# Resume headings recognised by `split_sections`, mapped to the section they start
+SECTION_HEADINGS = {
+    "skills": [
+        "skills", "technical skills", "key skills", "core skills", "core competencies", "competencies",
+        "expertise", "areas of expertise", "technologies", "tools", "certifications", "licenses",
+    ],
+    "experience": [
+        "experience", "work experience", "professional experience", "employment", "employment history",
+        "work history", "career history", "internships", "projects", "relevant experience",
+    ],
+    "education": [
+        "education", "educational background", "academic background", "qualifications",
+        "academic qualifications", "education and training",
+    ],
+}
+_HEADING_WORDS = 5
+
+
+class CvLimitError(ValueError):
+    """Raised when an uploaded CV exceeds the size or page limits."""
+
+
+# Map a line to the section it introduces, or None if it is not a heading
+def _section_of_heading(line):
+    words = re.sub(r"[^a-z& ]", " ", line.lower()).split()
+    if not words or len(words) > _HEADING_WORDS:
+        return None
+    heading = " ".join(words)
+    for section, names in SECTION_HEADINGS.items():
+        for name in names:
+            if heading == name or heading.startswith(name + " &") or heading.startswith(name + " and"):
+                return section
+    return None
+
+
+def split_sections(cv_text):
+    """
+    Split resume text into its skills, experience and education sections.
+
+    A section runs from its heading to the next heading; text under
+    other headings (contact details, interests, ...) is ignored.
+
+    Args:
+        cv_text (str): The plain text of the CV.
+
+    Returns:
+        dict: Section name -> section text, only for sections found and non-empty.
+    """
+    sections = {}
+    current = None
+    for line in cv_text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        section = _section_of_heading(line)
+        if section is not None:
+            current = section
+        elif re.fullmatch(r"[A-Z][A-Z &/:]*", line) and len(line.split()) <= _HEADING_WORDS:
+            # An unrecognised all-caps heading ends the current section
+            current = None
+        elif current is not None:
+            sections.setdefault(current, []).append(line)
+    return {section: "\n".join(lines) for section, lines in sections.items() if lines}
+
+
 class CvConverter:
     def __init__(self, cv_file):
         """
         Initialize the converter with the CV file.
 
         Args:
-            cv_file (str): The path to the CV document.
+            cv_file (str | bytes | file-like): The path to the CV document, its
+                raw bytes, or a readable stream such as an uploaded file.
         """
         self.cv_file = cv_file
+        self._data = None
+
+    def read_bytes(self):
+        """
+        Read the whole document into memory, enforcing the size limit.
+
+        Returns:
+            bytes: The raw PDF data.
+        """
+        if self._data is None:
+            if isinstance(self.cv_file, (bytes, bytearray)):
+                data = bytes(self.cv_file)
+            elif hasattr(self.cv_file, "read"):
+                data = self.cv_file.read(CV_MAX_BYTES + 1)
+            else:
+                with open(self.cv_file, "rb") as f:
+                    data = f.read(CV_MAX_BYTES + 1)
+            if len(data) > CV_MAX_BYTES:
+                raise CvLimitError(f"The file is larger than {CV_MAX_BYTES // (1024 * 1024)} MB.")
+            self._data = data
+        return self._data
+
+    def file_hash(self):
+        return hashlib.sha256(self.read_bytes()).hexdigest()
+
+    def iter_pages(self):
+        """
+        Extract the text of each page, yielding pages in order.
+
+        Pages are extracted in the calling thread: with at most CV_MAX_PAGES
+        pages, worker processes would cost more to start than they save.
+        """
+        with fitz.open(stream=self.read_bytes(), filetype="pdf") as doc:
+            if doc.page_count > CV_MAX_PAGES:
+                raise CvLimitError(f"The file has more than {CV_MAX_PAGES} pages.")
+            for page in doc:
+                yield page.get_text()
 
     def convert_to_text(self):
         """
         Convert the CV document to plain text.
 
+        Results are cached by the SHA-256 of the file, so uploading the same
+        resume again skips extraction.
+
         Returns:
             str: The extracted text from the CV.
         """
-        text = ""
         try:
-            # Open the PDF file
-            with fitz.open(self.cv_file) as doc:
-                # Iterate through pages and extract text
-                for page in doc:
-                    text += page.get_text()
+            key = self.file_hash()
+            with _text_cache_lock:
+                if key in _text_cache:
+                    _text_cache.move_to_end(key)
+                    metrics.inc("jobot_cache_lookups_total", cache="cv_text", result="hit")
+                    return _text_cache[key]
+            metrics.inc("jobot_cache_lookups_total", cache="cv_text", result="miss")
+
+            with metrics.timer("cv_parse"):
+                text = "".join(self.iter_pages())
+
+            with _text_cache_lock:
+                _text_cache[key] = text
+                while len(_text_cache) > CV_CACHE_SIZE:
+                    _text_cache.popitem(last=False)
+        except CvLimitError:
+            raise
         except Exception as e:
             raise RuntimeError(f"Error processing the file: {e}")
         return text
 
+    def extract_sections(self, cv_text=None):
+        """
+        Return the skills, experience and education sections of the CV.
+
+        Args:
+            cv_text (str): Already extracted text; converted from the file when omitted.
+
+        Returns:
+            dict: Section name -> section text.
+        """
+        return split_sections(self.convert_to_text() if cv_text is None else cv_text)
+
     def export_to_markdown(self, cv_text):
         """
         Export the CV text to Markdown format.
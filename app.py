@@ -1,85 +1,96 @@
-from flask import Flask, request, jsonify
-from werkzeug.utils import secure_filename
-import os
-from CV_parser import CvConverter
+from flask import Flask, request, jsonify, Response, stream_with_context, g
 import logging
-from main import answer_question
-from config import MODEL
+from main import answer_question, stream_answer, response_cache
+from config import SESSION_COOKIE
 from flask_cors import CORS
-from main import load_csv_data
-from langchain_ollama import OllamaLLM
+from main import load_all_corpora
+from resume_store import resolve_session_id
+from web_common import RequestError, RESUME_REMOVED, start_chat, chat_body, wants_stream, sse_event, paraphrase_text, paraphrase_prompt
+from web_common import details_body, search_body, job_courses_body, reindex_body
+from encoder import warm_up
+import llm_pool
+import metrics
 
 
 app = Flask(__name__)
 CORS(app)
-UPLOAD_FOLDER = './uploads'
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
 
-# Store cv_text to persist across requests
-cv_text_cache = ""
+# Load the embedding model, the datasets and the prebuilt indexes (built on first run,
+# memory-mapped afterwards) and return the app. Importing this module does no such work;
+# serve `app:create_app()` so it happens once before requests arrive (and before forking
+# with gunicorn's preload_app), otherwise each dataset is loaded on its first request.
+def create_app():
+    warm_up()
+    load_all_corpora()
+    return app
 
 
-CAREERS_CSV_PATH = "dataset/mycareersfuture_jobs.csv"
-SKILLS_CSV_PATH = "dataset/skillsfuture_courses.csv"
+# Wrap an SSE generator in an unbuffered streaming response
+def sse_response(events):
+    return Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-# Load datasets
-careers_data = load_csv_data(CAREERS_CSV_PATH)
-skills_data = load_csv_data(SKILLS_CSV_PATH)
+
+# Hand out a session cookie to clients that did not identify their session
+@app.after_request
+def set_session_cookie(response):
+    if g.get("new_session_id"):
+        response.set_cookie(SESSION_COOKIE, g.new_session_id, httponly=True, samesite="Lax")
+    return response
+
+
+# Per-request latency, and the Server-Timing header when SERVER_TIMING_ENABLED is set.
+# Streamed answers only report the stages finished before their first byte.
+@app.before_request
+def start_timing():
+    g.request_started = metrics.start_request()
+
+@app.after_request
+def add_server_timing(response):
+    if "request_started" not in g:
+        return response
+    server_timing = metrics.finish_request(request.endpoint, g.request_started)
+    if server_timing:
+        response.headers["Server-Timing"] = server_timing
+    return response
 
 
 @app.route("/api/chat", methods=["POST"])
 def chat():
-    global cv_text_cache
     try:
-        # Retrieve form data
-        message = request.form.get("message", "")
-        mode = request.form.get("mode", "")
-        uploaded_file = request.files.get("uploadedFile")
-        history = request.form.get("history", "[]")
-        
-        # Convert history from string to Python list
-        history = eval(history)
-
-        if "remove resume" in message:
-            cv_text_cache = ""  # Clear the cached CV text
-            return jsonify({"response": "Your resume has been removed.", "status": "success"}), 200
-
-
-        # Check if a resume is uploaded
-        if uploaded_file:
-            filename = secure_filename(uploaded_file.filename)
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            uploaded_file.save(filepath)
-
-            try:
-                # Process the uploaded resume
-                converter = CvConverter(filepath)
-                cv_text_cache = converter.convert_to_text()
-                # print(f"Extracted CV Text: {cv_text_cache}")
-            except Exception as e:
-                logging.error(f"Error processing CV: {e}")
-                return jsonify({"response": "Error processing CV.", "status": "error"}), 500
-
-        # Use empty string if no resume is uploaded
-        cv_text = cv_text_cache if cv_text_cache.strip() else ""
-
-        # Generate a response using the LLM
-        history, response = answer_question(
-            query=message,
-            cv_text=cv_text,  # Use the CV text or an empty string
-            mode=mode,
-            history=history,
+        session_id, is_new = resolve_session_id(request.form.get("sessionId"), request.cookies.get(SESSION_COOKIE))
+        if is_new:
+            g.new_session_id = session_id
+        turn = start_chat(request.form, request.files.get("uploadedFile"), session_id)
+        if turn.route.intent == "remove_resume":
+            return jsonify({"response": RESUME_REMOVED, "status": "success"}), 200
+
+        answer_args = dict(
+            query=turn.message,
+            cv_text=turn.cv_text,  # Use the CV text or an empty string
+            mode=turn.mode,
+            history=turn.history,
+            cv_embedding=turn.cv_embedding,
+            section_embeddings=turn.section_embeddings,
+            filters=turn.filters,
+            session_id=session_id,
+            route=turn.route,
         )
 
-        return jsonify({
-            "response": response["text"],
-            "recommendations": response["recommendations"],
-            "status": "success"
-        })
+        # Stream recommendations first, then the answer as it is generated
+        if wants_stream(request.form.get("stream", ""), request.headers.get("Accept")):
+            return sse_response(sse_event(event, data) for event, data in stream_answer(**answer_args))
 
+        # Generate a response using the LLM
+        history, response = answer_question(**answer_args)
+        return jsonify(chat_body(response))
+
+    except RequestError as e:
+        return jsonify(e.body()), e.status
     except Exception as e:
         # Log the error and send an appropriate message
         logging.error(f"Error in /api/chat endpoint: {e}")
@@ -89,55 +100,73 @@ def chat():
 
 @app.route("/api/details", methods=["POST"])
 def details():
-    try:
-        title = request.json.get("title")
-        mode = request.json.get("mode", "career")
-        data = careers_data if mode == "career" else skills_data
+    body, status = details_body(request.get_json(silent=True) or {})
+    return Response(body, status=status, mimetype="application/json")
 
-        # Match the title column based on mode
-        title_column = "Job Title" if mode == "career" else "Course Title"
-        details = data[data[title_column] == title].to_dict(orient="records")
-        if not details:
-            return jsonify({"status": "error", "details": "No additional details found."})
+@app.route("/api/search", methods=["POST"])
+def search():
+    body, status = search_body(request.get_json(silent=True) or {})
+    return jsonify(body), status
 
-        return jsonify({"status": "success", "details": details[0]})
 
-    except Exception as e:
-        return jsonify({"status": "error", "details": str(e)})
+@app.route("/api/job-courses", methods=["POST"])
+def job_courses_endpoint():
+    body, status = job_courses_body(request.get_json(silent=True) or {})
+    return jsonify(body), status
+
 
 @app.route("/api/paraphrase", methods=["POST"])
 def paraphrase():
     try:
-        text = request.json.get("text", "").strip()
-        if not text:
-            return jsonify({"status": "error", "text": "No text provided to process."}), 400
+        payload = request.get_json(silent=True) or {}
+        text = paraphrase_text(payload)
 
-        # Initialize the LLM for summarization
-        llm = OllamaLLM(model=MODEL)
+        if wants_stream(payload.get("stream", ""), request.headers.get("Accept")):
+            return sse_response(stream_paraphrase(text))
 
         # Call LLM to paraphrase/summarize the text
-        paraphrased_text = llm(
-            f"""
-            You are a professional assistant. Summarize the following content succinctly and clearly in a friendly and direct manner.
-            Avoid any greeting phrases like "hey there, sure thing."
-            If you get information about "Location: ", it means where this job is located at.
-            Focus on delivering the core information without explaining the summarization process.
-            Always end off by asking the user a question if they need help with other things.
-
-            Content to Summarize:
-            {text}
-            """
-        ).strip()
+        paraphrased_text = llm_pool.invoke(paraphrase_prompt(text)).strip()
 
         if not paraphrased_text:
             raise ValueError("LLM returned empty text.")
 
         return jsonify({"status": "success", "text": paraphrased_text})
 
+    except RequestError as e:
+        return jsonify(e.body()), e.status
     except Exception as e:
         logging.error(f"Error in /api/paraphrase: {e}")
         return jsonify({"status": "error", "text": "An error occurred while processing the text."}), 500
 
 
+@app.route("/api/reindex", methods=["POST"])
+def reindex():
+    body, status = reindex_body(request.remote_addr, request.get_json(silent=True) or {})
+    return jsonify(body), status
+
+
+@app.route("/api/cache/stats", methods=["GET"])
+def cache_stats():
+    return jsonify({"status": "success", "stats": response_cache.stats()})
+
+
+# Stage latencies, LLM speed and cache hit counts in the Prometheus text format
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+# Yield the paraphrased text as SSE token events
+def stream_paraphrase(text):
+    try:
+        for token in llm_pool.stream(paraphrase_prompt(text)):
+            yield sse_event("token", token)
+    except Exception as e:
+        logging.error(f"Error in /api/paraphrase stream: {e}")
+        yield sse_event("error", {"text": "An error occurred while processing the text."})
+        return
+    yield sse_event("done", {})
+
+
 if __name__ == "__main__":
-    app.run(debug=False)
+    create_app().run(debug=False)
@@ -0,0 +1,216 @@
+import asyncio
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from quart import Quart, request, jsonify, Response, g
+from quart_cors import cors
+
+import llm_pool
+import metrics
+from config import MODEL, RETRIEVAL_THREADS, SESSION_COOKIE
+from llm_gate import LLMGate, Overloaded
+from main import plan_answer, store_cached_answer, response_cache, load_all_corpora
+from encoder import warm_up
+from resume_store import resolve_session_id
+from web_common import RequestError, RESUME_REMOVED, start_chat, chat_body, wants_stream, sse_event, paraphrase_text, paraphrase_prompt
+from web_common import details_body, search_body, job_courses_body, reindex_body
+
+# Async serving mode: run with an ASGI server, e.g. `hypercorn "asgi_app:create_app()" --bind 127.0.0.1:5000`.
+# Retrieval runs on a thread pool, LLM calls go through LLMGate so bursts get a fast 429/503.
+app = cors(Quart(__name__))
+
+retrieval_executor = ThreadPoolExecutor(max_workers=RETRIEVAL_THREADS, thread_name_prefix="retrieval")
+llm_gate = LLMGate()
+
+
+# Run a blocking function (embedding, FAISS, PDF parsing) without blocking the event loop.
+# It runs in a copy of the request's context, so its stage timings reach the Server-Timing header.
+async def run_blocking(func, *args):
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(retrieval_executor, context.run, func, *args)
+
+
+# Load the embedding model, the datasets and the prebuilt indexes, then return the app
+# (see app.create_app)
+def create_app():
+    warm_up()
+    load_all_corpora()
+    return app
+
+
+def overloaded_response(error, message_key="response"):
+    response = jsonify({message_key: str(error), "status": "error"})
+    response.headers["Retry-After"] = "5"
+    return response, error.status
+
+# Stream tokens from the LLM as SSE events. The gate slot is taken and released inside the
+# stream, so a response whose body is never sent holds no slot; a full queue is still
+# rejected with a 429 up front. Chat streams send their recommendations first and store the
+# finished answer in the response cache.
+def sse_stream(prompt, recommendations=None, lookup=None):
+    llm_gate.check()
+
+    async def events():
+        try:
+            if recommendations is not None:
+                yield sse_event("recommendations", recommendations)
+            tokens = []
+            async with llm_gate.slot():
+                async for token in llm_pool.astream(prompt):
+                    tokens.append(token)
+                    yield sse_event("token", token)
+            store_cached_answer(lookup, {"text": "".join(tokens), "recommendations": recommendations})
+            yield sse_event("done", {})
+        except Overloaded as e:
+            yield sse_event("error", {"text": str(e)})
+        except Exception as e:
+            logging.error(f"Error while streaming LLM output: {e}")
+            yield sse_event("error", {"text": "An error occurred while generating the response."})
+
+    return Response(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# Replay a cached answer in the same event format as a live stream
+def cached_sse_response(cached):
+    async def events():
+        yield sse_event("recommendations", cached["recommendations"])
+        yield sse_event("token", cached["text"])
+        yield sse_event("done", {})
+
+    return Response(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Hand out a session cookie to clients that did not identify their session
+@app.after_request
+async def set_session_cookie(response):
+    if g.get("new_session_id"):
+        response.set_cookie(SESSION_COOKIE, g.new_session_id, httponly=True, samesite="Lax")
+    return response
+
+
+@app.before_request
+async def start_timing():
+    g.request_started = metrics.start_request()
+
+@app.after_request
+async def add_server_timing(response):
+    if "request_started" not in g:
+        return response
+    server_timing = metrics.finish_request(request.endpoint, g.request_started)
+    if server_timing:
+        response.headers["Server-Timing"] = server_timing
+    return response
+
+
+@app.route("/api/chat", methods=["POST"])
+async def chat():
+    try:
+        form = await request.form
+        files = await request.files
+        session_id, is_new = resolve_session_id(form.get("sessionId"), request.cookies.get(SESSION_COOKIE))
+        if is_new:
+            g.new_session_id = session_id
+        turn = await run_blocking(start_chat, form, files.get("uploadedFile"), session_id)
+        if turn.route.intent == "remove_resume":
+            return jsonify({"response": RESUME_REMOVED, "status": "success"}), 200
+
+        # Greetings get a canned reply and repeated questions a cached one, served alike
+        cached, prompt, recommendations, lookup = await run_blocking(
+            plan_answer, turn.message, turn.cv_text, turn.history, turn.route, MODEL,
+            turn.cv_embedding, turn.section_embeddings, turn.filters, session_id,
+        )
+        stream = wants_stream(form.get("stream", ""), request.headers.get("Accept"))
+        if cached is not None:
+            if stream:
+                return cached_sse_response(cached)
+            return jsonify(chat_body(cached))
+
+        if stream:
+            return sse_stream(prompt, recommendations=recommendations, lookup=lookup)
+
+        async with llm_gate.slot():
+            llm_response = await llm_pool.ainvoke(prompt)
+
+        response = {"text": llm_response, "recommendations": recommendations}
+        store_cached_answer(lookup, response)
+        return jsonify(chat_body(response))
+
+    except RequestError as e:
+        return jsonify(e.body()), e.status
+    except Overloaded as e:
+        return overloaded_response(e)
+    except Exception as e:
+        logging.error(f"Error in /api/chat endpoint: {e}")
+        return jsonify({"response": "An error occurred while processing your request. Please try again later.", "status": "error"}), 500
+
+
+@app.route("/api/details", methods=["POST"])
+async def details():
+    body, status = await run_blocking(details_body, (await request.get_json(silent=True)) or {})
+    return Response(body, status=status, mimetype="application/json")
+
+
+@app.route("/api/reindex", methods=["POST"])
+async def reindex():
+    body, status = await run_blocking(reindex_body, request.remote_addr, (await request.get_json(silent=True)) or {})
+    return jsonify(body), status
+
+
+@app.route("/api/cache/stats", methods=["GET"])
+async def cache_stats():
+    return jsonify({"status": "success", "stats": response_cache.stats()})
+
+
+@app.route("/metrics", methods=["GET"])
+async def prometheus_metrics():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@app.route("/api/search", methods=["POST"])
+async def search():
+    body, status = await run_blocking(search_body, (await request.get_json(silent=True)) or {})
+    return jsonify(body), status
+
+
+@app.route("/api/job-courses", methods=["POST"])
+async def job_courses_endpoint():
+    body, status = await run_blocking(job_courses_body, (await request.get_json(silent=True)) or {})
+    return jsonify(body), status
+
+
+@app.route("/api/paraphrase", methods=["POST"])
+async def paraphrase():
+    try:
+        payload = (await request.get_json(silent=True)) or {}
+        text = paraphrase_text(payload)
+
+        if wants_stream(payload.get("stream", ""), request.headers.get("Accept")):
+            return sse_stream(paraphrase_prompt(text))
+
+        async with llm_gate.slot():
+            paraphrased_text = (await llm_pool.ainvoke(paraphrase_prompt(text))).strip()
+
+        if not paraphrased_text:
+            raise ValueError("LLM returned empty text.")
+
+        return jsonify({"status": "success", "text": paraphrased_text})
+
+    except RequestError as e:
+        return jsonify(e.body()), e.status
+    except Overloaded as e:
+        return overloaded_response(e, message_key="text")
+    except Exception as e:
+        logging.error(f"Error in /api/paraphrase: {e}")
+        return jsonify({"status": "error", "text": "An error occurred while processing the text."}), 500
+
+
+if __name__ == "__main__":
+    create_app().run(debug=False)
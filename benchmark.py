@@ -0,0 +1,161 @@
+import argparse
+import time
+
+import faiss
+import numpy as np
+
+from bm25_index import BM25Index
+from encoder import get_encoder
+from main import get_corpus, build_faiss_index, configure_faiss_search, faiss_query, search_rows, retrieve_context
+from prompt_builder import build_prompt
+
+# Index settings compared against the exact flat index
+INDEX_CANDIDATES = [
+    {"index_type": "flat", "metric": "cosine"},
+    {"index_type": "hnsw", "metric": "cosine"},
+    {"index_type": "ivf_flat", "metric": "cosine"},
+    {"index_type": "ivf_pq", "metric": "cosine"},
+]
+NPROBE_SWEEP = [1, 4, 16, 64]
+EF_SEARCH_SWEEP = [16, 64, 256]
+
+
+# Time a batch of single-query searches, the way the app issues them
+def time_searches(index, queries, k):
+    results = np.empty((len(queries), k), dtype=np.int64)
+    start = time.perf_counter()
+    for i, query in enumerate(queries):
+        _, I = index.search(faiss_query(index, query), k)
+        results[i] = I[0]
+    elapsed = time.perf_counter() - start
+    return results, elapsed / len(queries) * 1000
+
+
+def recall_at_k(results, ground_truth):
+    hits = sum(len(set(r[r >= 0]) & set(g)) for r, g in zip(results, ground_truth))
+    return hits / ground_truth.size
+
+
+def index_report(mode, k=10, n_queries=200, seed=0):
+    """
+    Print recall@k, latency, build time and size of each index type against
+    the exact flat index, using stored chunk embeddings as queries.
+    """
+    corpus = get_corpus(mode)
+    embeddings = np.ascontiguousarray(corpus.embeddings, dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    queries = embeddings[rng.choice(len(embeddings), size=min(n_queries, len(embeddings)), replace=False)]
+
+    exact = build_faiss_index(embeddings, index_type="flat", metric="cosine")
+    ground_truth, _ = time_searches(exact, queries, k)
+
+    print(f"{corpus.name}: {len(embeddings)} vectors, d={embeddings.shape[1]}, {len(queries)} queries, k={k}")
+    print(f"{'index':<10} {'knob':<14} {'recall@k':>9} {'ms/query':>9} {'build s':>8} {'size MB':>8}")
+    for params in INDEX_CANDIDATES:
+        start = time.perf_counter()
+        index = build_faiss_index(embeddings, **params)
+        build_seconds = time.perf_counter() - start
+        size_mb = faiss.serialize_index(index).nbytes / 1e6
+
+        if params["index_type"] == "hnsw":
+            knobs = [("efSearch", value, {"ef_search": value}) for value in EF_SEARCH_SWEEP]
+        elif params["index_type"].startswith("ivf"):
+            knobs = [("nprobe", value, {"nprobe": value}) for value in NPROBE_SWEEP]
+        else:
+            knobs = [("-", "", {})]
+
+        for knob, value, kwargs in knobs:
+            configure_faiss_search(index, **kwargs)
+            results, ms = time_searches(index, queries, k)
+            print(f"{params['index_type']:<10} {f'{knob}={value}' if value else knob:<14} "
+                  f"{recall_at_k(results, ground_truth):>9.3f} {ms:>9.3f} {build_seconds:>8.2f} {size_mb:>8.1f}")
+
+
+# Mean and 95th percentile of per-call latencies in milliseconds
+def latency_ms(func, inputs):
+    timings = []
+    for item in inputs:
+        start = time.perf_counter()
+        func(item)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.mean(timings)), float(np.percentile(timings, 95))
+
+
+def bm25_report(mode, k=5, n_queries=200, seed=0):
+    """
+    Print the BM25 index build time and size, and the latency of BM25 alone,
+    dense row search and hybrid row search, using dataset titles as queries.
+    """
+    corpus = get_corpus(mode)
+    start = time.perf_counter()
+    bm25 = BM25Index.build(corpus.chunks)
+    build_seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(seed)
+    titles = list(corpus.records.positions_of_title)
+    queries = [titles[i] for i in rng.choice(len(titles), size=min(n_queries, len(titles)), replace=False)]
+    embeddings = get_encoder().encode(queries, convert_to_tensor=False)
+    pairs = list(zip(queries, embeddings))
+
+    print(f"{corpus.name}: {len(corpus.chunks)} chunks, {len(bm25.vocab)} terms, {len(bm25.docs)} postings, "
+          f"{bm25.nbytes() / 1e6:.1f} MB, built in {build_seconds:.2f} s, {len(queries)} queries, k={k}")
+    print(f"{'search':<8} {'mean ms':>8} {'p95 ms':>8}")
+    rows = [
+        ("bm25", latency_ms(lambda pair: bm25.search(pair[0], k), pairs)),
+        ("dense", latency_ms(lambda pair: search_rows("", corpus, k=k, query_embedding=pair[1]), pairs)),
+        ("hybrid", latency_ms(lambda pair: search_rows(pair[0], corpus, k=k, query_embedding=pair[1]), pairs)),
+    ]
+    for name, (mean, p95) in rows:
+        print(f"{name:<8} {mean:>8.3f} {p95:>8.3f}")
+
+
+def prompt_report(mode, k=5, n_queries=50, seed=0):
+    """
+    Print the size of answer prompts built from dataset titles as questions,
+    with and without a long resume, and the share of each prompt that is the
+    static prefix Ollama can serve from its cache instead of prefilling.
+    """
+    corpus = get_corpus(mode)
+    rng = np.random.default_rng(seed)
+    titles = list(corpus.records.positions_of_title)
+    queries = [titles[i] for i in rng.choice(len(titles), size=min(n_queries, len(titles)), replace=False)]
+    # Stand-in resume: dataset chunks, long enough to hit the resume budget
+    resume = "\n".join(corpus.chunks[:20])
+
+    print(f"{corpus.name}: {len(queries)} questions")
+    print(f"{'resume':<8} {'tokens':>7} {'prefix':>7} {'cached %':>9} {'trimmed %':>10} {'build ms':>9}")
+    for label, cv_text in [("none", ""), ("long", resume)]:
+        contexts = [retrieve_context(query, cv_text, mode)[0] for query in queries]
+        start = time.perf_counter()
+        stats = [build_prompt(query, cv_text, lines)[1] for query, lines in zip(queries, contexts)]
+        build_ms = (time.perf_counter() - start) / len(queries) * 1000
+        tokens = np.mean([s["prompt_tokens"] for s in stats])
+        prefix = stats[0]["prefix_tokens"]
+        trimmed = np.mean([s["cv_truncated"] for s in stats]) * 100
+        print(f"{label:<8} {tokens:>7.0f} {prefix:>7} {prefix / tokens * 100:>9.1f} {trimmed:>10.0f} {build_ms:>9.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Retrieval benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = subparsers.add_parser("index", help="Recall vs latency of FAISS index types")
+    index_parser.add_argument("--mode", choices=["career", "course"], default=None, help="Dataset to benchmark (default: both)")
+    index_parser.add_argument("--k", type=int, default=10)
+    index_parser.add_argument("--queries", type=int, default=200)
+
+    bm25_parser = subparsers.add_parser("bm25", help="BM25 index size and hybrid search latency")
+    bm25_parser.add_argument("--mode", choices=["career", "course"], default=None, help="Dataset to benchmark (default: both)")
+    bm25_parser.add_argument("--k", type=int, default=5)
+    bm25_parser.add_argument("--queries", type=int, default=200)
+
+    prompt_parser = subparsers.add_parser("prompt", help="Answer prompt size and cached prefix share")
+    prompt_parser.add_argument("--mode", choices=["career", "course"], default=None, help="Dataset to benchmark (default: both)")
+    prompt_parser.add_argument("--k", type=int, default=5)
+    prompt_parser.add_argument("--queries", type=int, default=50)
+
+    args = parser.parse_args()
+    report = {"index": index_report, "bm25": bm25_report, "prompt": prompt_report}[args.command]
+    for mode in [args.mode] if args.mode else ["career", "course"]:
+        report(mode, k=args.k, n_queries=args.queries)
+        print()
@@ -0,0 +1,164 @@
+import json
+import os
+import re
+from collections import Counter
+
+import numpy as np
+
+from config import BM25_K1, BM25_B
+
+INDPTR_FILE = "bm25_indptr.npy"
+DOCS_FILE = "bm25_docs.npy"
+WEIGHTS_FILE = "bm25_weights.npy"
+VOCAB_FILE = "bm25_vocab.json"
+
+# Words, numbers and codes such as "tgs-2021001234", "c++" or "aws-saa" stay single tokens
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_.+#/][a-z0-9+#]+)*\+*")
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """
+    Okapi BM25 inverted index over the corpus chunks.
+
+    Postings are stored in CSR form: the postings of term t are
+    `docs[indptr[t]:indptr[t + 1]]` (chunk ids) with the matching entries of
+    `weights`, which already hold the full BM25 term weight, so a query is a
+    handful of array slices and one scatter-add.
+    """
+
+    def __init__(self, vocab, indptr, docs, weights, n_docs, k1=BM25_K1, b=BM25_B):
+        self.vocab = vocab
+        self.indptr = indptr
+        self.docs = docs
+        self.weights = weights
+        self.n_docs = n_docs
+        self.k1 = k1
+        self.b = b
+
+    @classmethod
+    def build(cls, chunks, k1=BM25_K1, b=BM25_B):
+        """
+        Build the index over a list of chunk texts.
+
+        Args:
+            chunks (list[str]): The chunk texts; chunk ids are list positions.
+            k1 (float): Term frequency saturation.
+            b (float): Document length normalisation.
+
+        Returns:
+            BM25Index: The built index.
+        """
+        vocab = {}
+        term_ids, doc_ids, freqs = [], [], []
+        lengths = np.zeros(len(chunks), dtype=np.float32)
+        for doc_id, chunk in enumerate(chunks):
+            tokens = tokenize(chunk)
+            lengths[doc_id] = len(tokens)
+            for term, freq in Counter(tokens).items():
+                term_ids.append(vocab.setdefault(term, len(vocab)))
+                doc_ids.append(doc_id)
+                freqs.append(freq)
+
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+        doc_ids = np.asarray(doc_ids, dtype=np.int32)
+        freqs = np.asarray(freqs, dtype=np.float32)
+
+        # Sort postings by term to get the CSR layout; doc ids stay ascending within a term
+        order = np.argsort(term_ids, kind="stable")
+        term_ids, doc_ids, freqs = term_ids[order], doc_ids[order], freqs[order]
+        doc_freq = np.bincount(term_ids, minlength=len(vocab))
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(doc_freq, out=indptr[1:])
+
+        n_docs = len(chunks)
+        idf = np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+        avg_length = max(float(lengths.mean()) if n_docs else 0.0, 1.0)
+        norm = k1 * (1 - b + b * lengths[doc_ids] / avg_length)
+        weights = (idf[term_ids] * freqs * (k1 + 1) / (freqs + norm)).astype(np.float32)
+        return cls(vocab, indptr, doc_ids, weights, n_docs, k1, b)
+
+    def scores(self, query):
+        """Return the BM25 score of every chunk for a query string."""
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        for term, count in Counter(tokenize(query)).items():
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                continue
+            start, stop = self.indptr[term_id], self.indptr[term_id + 1]
+            # A term's postings hold each chunk once, so plain fancy-index addition is safe
+            scores[self.docs[start:stop]] += count * self.weights[start:stop]
+        return scores
+
+    def search(self, query, k, chunk_mask=None):
+        """
+        Return the k best matching chunks for a query string.
+
+        Args:
+            query (str): The query text.
+            k (int): Number of chunks to return.
+            chunk_mask (np.ndarray): Optional boolean mask of the chunks allowed in the results.
+
+        Returns:
+            tuple: (chunk_ids, scores), best first; chunks without any query
+            term are left out.
+        """
+        scores = self.scores(query)
+        if chunk_mask is not None:
+            scores[~chunk_mask] = 0
+        matched = np.flatnonzero(scores)
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        order = np.argsort(-scores[matched], kind="stable")
+        return matched[order], scores[matched[order]]
+
+    def nbytes(self):
+        return self.indptr.nbytes + self.docs.nbytes + self.weights.nbytes
+
+    def save(self, path):
+        """
+        Write the index into an artifact directory.
+
+        The vocabulary file is written last, so an interrupted save is never
+        picked up by `load`.
+        """
+        for filename, array in ((INDPTR_FILE, self.indptr), (DOCS_FILE, self.docs), (WEIGHTS_FILE, self.weights)):
+            tmp_file = os.path.join(path, f".tmp-{filename}")
+            np.save(tmp_file, array)
+            os.replace(tmp_file, os.path.join(path, filename))
+        tmp_file = os.path.join(path, f".tmp-{VOCAB_FILE}")
+        with open(tmp_file, "w") as f:
+            json.dump({"n_docs": self.n_docs, "k1": self.k1, "b": self.b, "vocab": self.vocab}, f)
+        os.replace(tmp_file, os.path.join(path, VOCAB_FILE))
+
+    @classmethod
+    def load(cls, path, k1=BM25_K1, b=BM25_B):
+        """
+        Load a stored index, memory-mapping the posting arrays.
+
+        Returns:
+            BM25Index | None: The index, or None if none is stored for these
+            BM25 parameters.
+        """
+        if not os.path.exists(os.path.join(path, VOCAB_FILE)):
+            return None
+        try:
+            with open(os.path.join(path, VOCAB_FILE)) as f:
+                meta = json.load(f)
+            if meta["k1"] != k1 or meta["b"] != b:
+                return None
+            return cls(
+                meta["vocab"],
+                np.load(os.path.join(path, INDPTR_FILE), mmap_mode="r"),
+                np.load(os.path.join(path, DOCS_FILE), mmap_mode="r"),
+                np.load(os.path.join(path, WEIGHTS_FILE), mmap_mode="r"),
+                meta["n_docs"],
+                k1,
+                b,
+            )
+        except Exception as e:
+            print(f"Ignoring unreadable BM25 index in {path}: {e}")
+            return None
@@ -0,0 +1,125 @@
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+import index_store
+from config import EMBEDDING_BATCH_SIZE, EMBEDDING_SHARD_SIZE, EMBEDDING_PROCESSES
+from encoder import get_encoder
+from main import corpus_inputs, save_corpus_artifacts, length_order, get_corpus, get_skill_graph
+
+MANIFEST_FILE = "manifest.json"
+
+# Offline index build: `python build_index.py` encodes the datasets in length-sorted shards,
+# checkpointing every shard so a killed build resumes where it stopped. The app then
+# memory-maps the stored artifacts instead of encoding on startup.
+
+
+# Directory holding the finished shards of an unfinished build
+def shard_dir(name, key):
+    return os.path.join(os.path.dirname(index_store.artifact_dir(name, key)), f".build-{key}")
+
+
+def encode_shards(chunks, directory, batch_size=EMBEDDING_BATCH_SIZE, shard_size=EMBEDDING_SHARD_SIZE, processes=EMBEDDING_PROCESSES):
+    """
+    Encode chunks shard by shard, reusing shards finished by an earlier run.
+
+    Chunks are sorted by length first, so each batch holds texts of similar
+    length and padding is minimal; shards are slices of that order.
+
+    Args:
+        chunks (list[str]): The chunk texts.
+        directory (str): Checkpoint directory of this build.
+        batch_size (int): Chunks per encode batch.
+        shard_size (int): Chunks per checkpointed shard.
+        processes (int): Encoder worker processes; 0 encodes in this process.
+
+    Returns:
+        np.ndarray: The embedding matrix in chunk order.
+    """
+    order = length_order(chunks)
+    manifest = {"count": len(chunks), "shard_size": shard_size}
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            if json.load(f) != manifest:
+                print(f"Discarding shards in {directory} from a build with different settings")
+                shutil.rmtree(directory)
+    os.makedirs(directory, exist_ok=True)
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f)
+
+    model = get_encoder()
+    pool = model.start_multi_process_pool(["cpu"] * processes) if processes else None
+    n_shards = -(-len(chunks) // shard_size)
+    shards = []
+    try:
+        for shard in range(n_shards):
+            path = os.path.join(directory, f"shard-{shard:05d}.npy")
+            positions = order[shard * shard_size:(shard + 1) * shard_size]
+            if os.path.exists(path):
+                shards.append(np.load(path))
+                print(f"  shard {shard + 1}/{n_shards}: reused")
+                continue
+
+            start = time.perf_counter()
+            texts = [chunks[i] for i in positions]
+            embeddings = np.asarray(model.encode(texts, batch_size=batch_size, pool=pool), dtype=np.float32)
+            # Write then rename, so a kill mid-write never leaves a truncated shard behind
+            tmp_path = os.path.join(directory, f".tmp-shard-{shard:05d}.npy")
+            np.save(tmp_path, embeddings)
+            os.replace(tmp_path, path)
+            shards.append(embeddings)
+            elapsed = time.perf_counter() - start
+            print(f"  shard {shard + 1}/{n_shards}: {len(texts)} chunks in {elapsed:.1f} s ({len(texts) / elapsed:.0f} chunks/s)")
+    finally:
+        if pool is not None:
+            model.stop_multi_process_pool(pool)
+
+    embeddings = np.empty((len(chunks), model.get_sentence_embedding_dimension()), dtype=np.float32)
+    if shards:
+        embeddings[order] = np.concatenate(shards)
+    return embeddings
+
+
+def build(mode, force=False, batch_size=EMBEDDING_BATCH_SIZE, shard_size=EMBEDDING_SHARD_SIZE, processes=EMBEDDING_PROCESSES):
+    """
+    Build and store the artifacts of one dataset unless they are up to date.
+    """
+    inputs = corpus_inputs(mode)
+    name, key, chunks = inputs["spec"]["name"], inputs["key"], inputs["chunks"]
+    artifacts = index_store.load_artifacts(name, key)
+    if artifacts is not None and len(artifacts["chunk_rows"]) == len(chunks) and not force:
+        print(f"{name}: index {key} is up to date")
+        return
+
+    print(f"{name}: encoding {len(chunks)} chunks (batch {batch_size}, shards of {shard_size}, {processes or 'no'} worker processes)")
+    start = time.perf_counter()
+    directory = shard_dir(name, key)
+    embeddings = encode_shards(chunks, directory, batch_size, shard_size, processes)
+    save_corpus_artifacts(inputs, embeddings)
+    shutil.rmtree(directory, ignore_errors=True)
+    print(f"{name}: index {key} built in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the embedding and FAISS index artifacts ahead of serving")
+    parser.add_argument("--mode", choices=["career", "course"], default=None, help="Dataset to build (default: both)")
+    parser.add_argument("--batch-size", type=int, default=EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--shard-size", type=int, default=EMBEDDING_SHARD_SIZE)
+    parser.add_argument("--processes", type=int, default=EMBEDDING_PROCESSES, help="Encoder worker processes (0 = in-process)")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the stored index is up to date")
+    args = parser.parse_args()
+
+    for mode in [args.mode] if args.mode else ["career", "course"]:
+        build(mode, args.force, args.batch_size, args.shard_size, args.processes)
+
+    # The job -> course graph is derived from both indexes, so it is built once both are current
+    if not args.mode:
+        start = time.perf_counter()
+        graph = get_skill_graph(get_corpus("career"), get_corpus("course"))
+        print(f"job -> course graph {graph.key}: {len(graph.courses)} links, {graph.nbytes() / 1e6:.1f} MB "
+              f"({time.perf_counter() - start:.1f} s)")
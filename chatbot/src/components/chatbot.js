@@ -4,6 +4,16 @@ import "../styles/chatbot.css";
 import { Button } from "@mui/material";
 import ReactMarkdown from "react-markdown";
 
+// Identifies this browser's chat session, so the server keeps its resume apart from other users'
+const getSessionId = () => {
+  let sessionId = localStorage.getItem("jobotSessionId");
+  if (!sessionId) {
+    sessionId = crypto.randomUUID();
+    localStorage.setItem("jobotSessionId", sessionId);
+  }
+  return sessionId;
+};
+
 const Chatbot = () => {
   const [messages, setMessages] = useState([]);
   const [recommendations, setRecommendations] = useState([]);
@@ -21,6 +31,30 @@ const Chatbot = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
   }, [messages, isTyping]);
 
+  // Read a Server-Sent Events response, calling onEvent(event, data) for each message
+  const readEventStream = async (response, onEvent) => {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      let boundary;
+      while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+        const raw = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        let event = "message";
+        let data = "";
+        raw.split("\n").forEach((line) => {
+          if (line.startsWith("event: ")) event = line.slice(7);
+          else if (line.startsWith("data: ")) data += line.slice(6);
+        });
+        onEvent(event, data ? JSON.parse(data) : null);
+      }
+    }
+  };
+
   const handleSend = async () => {
     if (!input.trim() && !file) {
       setMessages([...messages, { sender: "Bot", text: "Please provide some input to proceed." }]);
@@ -40,31 +74,53 @@ const Chatbot = () => {
     formData.append("message", input || ""); // Allow empty input if a file is uploaded
     formData.append("mode", mode);
     formData.append("history", JSON.stringify(messages));
+    formData.append("stream", "true"); // Receive the answer as it is generated
+    formData.append("sessionId", getSessionId());
     if (file) {
       formData.append("uploadedFile", file);
     }
   
     setIsTyping(true);
     try {
-      const response = await axios.post("http://127.0.0.1:5000/api/chat", formData, {
-        headers: { "Content-Type": "multipart/form-data" },
+      const response = await fetch("http://127.0.0.1:5000/api/chat", {
+        method: "POST",
+        body: formData,
       });
-  
-      setIsTyping(false);
-      if (response.data.status === "success") {
-        setMessages([...newMessages, { sender: "Bot", text: response.data.response }]);
-        if (response.data.recommendations?.length > 0) {
-          setMessages((prev) => [
-            ...prev,
-            {
-              sender: "Bot",
-              text: "Click on a recommendation below to learn more:",
-              recommendations: response.data.recommendations,
-            },
-          ]);
+
+      // Commands such as "remove resume" and upload errors still answer with plain JSON
+      if (!response.headers.get("Content-Type")?.includes("text/event-stream")) {
+        const data = await response.json();
+        setIsTyping(false);
+        setMessages([...newMessages, { sender: "Bot", text: data.response }]);
+        return;
+      }
+
+      let text = "";
+      let streamedRecommendations = [];
+      await readEventStream(response, (event, data) => {
+        if (event === "recommendations") {
+          streamedRecommendations = data;
+        } else if (event === "token") {
+          text += data;
+          setIsTyping(false);
+          setMessages([...newMessages, { sender: "Bot", text }]);
+        } else if (event === "error") {
+          text = data.text;
+          streamedRecommendations = [];
+          setMessages([...newMessages, { sender: "Bot", text }]);
         }
-      } else {
-        setMessages([...newMessages, { sender: "Bot", text: response.data.response }]);
+      });
+
+      setIsTyping(false);
+      if (streamedRecommendations.length > 0) {
+        setMessages((prev) => [
+          ...prev,
+          {
+            sender: "Bot",
+            text: "Click on a recommendation below to learn more:",
+            recommendations: streamedRecommendations,
+          },
+        ]);
       }
     } catch (error) {
       setIsTyping(false);
@@ -72,7 +128,9 @@ const Chatbot = () => {
     }
   };
   
-  const handleRecommendationClick = async (title) => {
+  const handleRecommendationClick = async ({ id, title, mode: recommendationMode }) => {
+    // A recommendation may come from the other dataset than the selected mode
+    const detailMode = recommendationMode || mode;
     // Add the user message for their query
     const userQuery = `Could you share with me more about ${title}?`;
     setMessages((prev) => [
@@ -81,7 +139,7 @@ const Chatbot = () => {
     ]);
   
     try {
-      const response = await axios.post("http://127.0.0.1:5000/api/details", { title, mode });
+      const response = await axios.post("http://127.0.0.1:5000/api/details", { id, title, mode: detailMode });
       const details = response.data.details;
   
       setSelectedDetail(details); // Store selected details
@@ -90,9 +148,9 @@ const Chatbot = () => {
         {
           sender: "Bot",
           text: `What would you like to know about **${title}** ${
-          mode === "career" ? `by **${details.Company}**` : `from **${details.Institution}**`
+          detailMode === "career" ? `by **${details.Company}**` : `from **${details.Institution}**`
           }?`,
-          options: mode === "career"
+          options: detailMode === "career"
             ? ["Company", "Location", "Employment Type", "Salary", "Job Description", "Go to Listing"]
             : [
                 "Upcoming Date",
@@ -234,7 +292,7 @@ const Chatbot = () => {
                   variant="outlined"
                   color="primary"
                   style={{ margin: "5px" }}
-                  onClick={() => handleRecommendationClick(rec.title)}
+                  onClick={() => handleRecommendationClick(rec)}
                 >
                   {rec.title}
                 </Button>
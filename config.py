@@ -1 +1,152 @@
-MODEL = "qwen2.5:3b"
\ No newline at end of file
+import os
+
+MODEL = "qwen2.5:3b"
+
+# Sentence embedding model used to build and query the FAISS indexes
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# Directory holding the prebuilt embeddings, FAISS indexes and chunk maps
+INDEX_CACHE_DIR = "index_cache"
+
+# Device for the embedding model ("cpu", "cuda", ...); None lets sentence-transformers pick
+EMBEDDING_DEVICE = None
+
+# Torch intra-op threads used for encoding; None keeps the torch default
+EMBEDDING_THREADS = None
+
+# Offline index builds (build_index.py): chunks per encode batch, chunks per checkpointed
+# shard, and encoder worker processes (0 encodes in the current process)
+EMBEDDING_BATCH_SIZE = 64
+EMBEDDING_SHARD_SIZE = 4096
+EMBEDDING_PROCESSES = 0
+
+# Maximal Marginal Relevance: candidates fetched from FAISS before reranking,
+# and the relevance/diversity trade-off (1.0 = relevance only)
+MMR_FETCH_K = 20
+MMR_LAMBDA = 0.5
+
+# How chunk scores are combined into one score per job/course row: "max" or "sum"
+ROW_AGGREGATION = "max"
+
+# FAISS index per dataset. "index_type" is "flat" (exact), "hnsw", "ivf_flat" or "ivf_pq";
+# "metric" is "l2" or "cosine". Extra keys are passed to build_faiss_index.
+# Run `python benchmark.py index` to compare recall and latency before switching.
+FAISS_INDEX_PARAMS = {
+    "careers": {"index_type": "flat", "metric": "l2"},
+    "skills": {"index_type": "flat", "metric": "l2"},
+}
+
+# Search-time knobs: IVF lists probed per query and HNSW candidate list size
+FAISS_NPROBE = 16
+FAISS_EF_SEARCH = 64
+
+# Async server (asgi_app.py): concurrent Ollama generations, requests allowed to wait
+# for a slot, and how long they may wait before getting a 503. LLM_SUMMARY_SLOTS (at least 1)
+# of the generations are kept for the background conversation summaries; answers get the rest.
+LLM_MAX_CONCURRENCY = 2
+LLM_SUMMARY_SLOTS = 1
+LLM_MAX_QUEUE = 16
+LLM_QUEUE_TIMEOUT = 30
+
+# Threads running retrieval (embedding + FAISS) for the async server
+RETRIEVAL_THREADS = 4
+
+# Ollama connection: server URL (None = default localhost), how long the model stays
+# loaded after a request, request timeout in seconds and pooled keep-alive connections
+OLLAMA_BASE_URL = None
+OLLAMA_KEEP_ALIVE = "30m"
+OLLAMA_TIMEOUT = 120
+OLLAMA_MAX_CONNECTIONS = 10
+
+# Context window Ollama allocates for the model; must hold the largest prompt below plus the answer
+OLLAMA_NUM_CTX = 8192
+
+# Retries for failed Ollama calls, with exponential backoff starting at this many seconds
+OLLAMA_RETRIES = 2
+OLLAMA_RETRY_BACKOFF = 0.5
+
+# Semantic response cache: serve a stored answer when a question is within this cosine
+# distance of a cached one (same mode, resume and model); size limit and lifetime in seconds
+RESPONSE_CACHE_ENABLED = True
+RESPONSE_CACHE_MAX_DISTANCE = 0.05
+RESPONSE_CACHE_MAX_ENTRIES = 1000
+RESPONSE_CACHE_TTL = 3600
+
+# Per-session resume storage: "memory" (LRU in this process) or "sqlite" (local file
+# shared by all workers), and how many sessions to keep. A memory store is private to its
+# process, so multi-worker servers must use "sqlite": gunicorn.conf.py sets it through the
+# RESUME_STORE_BACKEND and RESUME_STORE_PATH environment variables.
+RESUME_STORE_BACKEND = os.environ.get("RESUME_STORE_BACKEND", "memory")
+RESUME_STORE_PATH = os.environ.get("RESUME_STORE_PATH", "resumes.sqlite3")
+RESUME_STORE_MAX_SESSIONS = 1000
+
+# Cookie carrying the chat session ID for clients that do not send a sessionId field
+SESSION_COOKIE = "jobot_session"
+
+# Share of the resume in the retrieval query vector when a resume is uploaded (0-1)
+RESUME_QUERY_WEIGHT = 0.5
+
+# Resume upload limits, and how many parsed resumes are cached by file hash
+CV_MAX_BYTES = 10 * 1024 * 1024
+CV_MAX_PAGES = 30
+CV_CACHE_SIZE = 256
+
+# Reciprocal rank fusion constant used when a resume's section vectors (skills,
+# experience, education) each retrieve their own ranking
+RRF_K = 60
+
+# Hybrid retrieval: a BM25 index over the same chunks catches exact terms (course codes,
+# certifications, company names). HYBRID_FUSION is "rrf" (reciprocal rank fusion),
+# "weighted" (blend of cosine and max-scaled BM25 scores, HYBRID_SPARSE_WEIGHT for BM25)
+# or "dense" to search with FAISS only.
+HYBRID_FUSION = "rrf"
+HYBRID_SPARSE_WEIGHT = 0.3
+BM25_FETCH_K = 20
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Filtered searches that leave at most this many chunks score them all exactly instead
+# of walking the FAISS index with an ID selector
+FILTER_EXACT_MAX = 2000
+
+# Answer prompt budgets, in tokens: the per-request part (resume, retrieved context,
+# conversation and question) is trimmed to these, the static instructions and examples are never trimmed.
+# PROMPT_TOKENIZER names a Hugging Face tokenizer matching MODEL for exact counts; None
+# estimates them, which avoids downloading it.
+PROMPT_TOKENIZER = None
+PROMPT_CV_TOKENS = 1500
+PROMPT_CONTEXT_TOKENS = 400
+PROMPT_QUESTION_TOKENS = 200
+PROMPT_HISTORY_TOKENS = 600
+
+# Conversation memory: the latest messages are quoted in the prompt (within
+# PROMPT_HISTORY_TOKENS, each cut to MEMORY_MESSAGE_TOKENS); older ones are folded into a
+# rolling summary by a background LLM call once MEMORY_SUMMARY_BATCH of them have piled up.
+# MEMORY_MAX_MESSAGES caps how much of the client's history is read per request; beyond it
+# the oldest messages fall off and the summary starts over.
+MEMORY_RECENT_MESSAGES = 6
+MEMORY_SUMMARY_BATCH = 4
+MEMORY_SUMMARY_WORDS = 150
+MEMORY_MESSAGE_TOKENS = 200
+MEMORY_MAX_MESSAGES = 1000
+MEMORY_MAX_SESSIONS = 1000
+
+# Intent routing in front of the chat answer: keywords, then the nearest intent centroid
+# (cosine similarity of at least ROUTER_MIN_SIMILARITY, ROUTER_MIN_MARGIN ahead of the
+# next intent) choose careers, courses, both or no retrieval; otherwise the UI's mode is used
+ROUTER_ENABLED = True
+ROUTER_MIN_SIMILARITY = 0.35
+ROUTER_MIN_MARGIN = 0.05
+
+# Job -> course graph behind /api/job-courses: courses kept per job, the lowest cosine
+# similarity worth linking, and jobs compared per batched matrix search
+SKILL_GRAPH_K = 10
+SKILL_GRAPH_MIN_SCORE = 0.25
+SKILL_GRAPH_BATCH = 1024
+
+# Hot-path instrumentation: METRICS_ENABLED keeps per-stage latency histograms, LLM
+# time to first token and tokens/sec, and cache hit counts for GET /metrics (Prometheus
+# format); SERVER_TIMING_ENABLED adds a per-request Server-Timing header with the stage
+# durations. With both off the timers are no-ops.
+METRICS_ENABLED = True
+SERVER_TIMING_ENABLED = False
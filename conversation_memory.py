@@ -0,0 +1,194 @@
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import llm_pool
+import metrics
+from prompt_builder import get_token_counter
+from config import MODEL, MEMORY_RECENT_MESSAGES, MEMORY_SUMMARY_BATCH, MEMORY_SUMMARY_WORDS, MEMORY_MESSAGE_TOKENS
+from config import MEMORY_MAX_SESSIONS, MEMORY_MAX_MESSAGES, PROMPT_HISTORY_TOKENS, LLM_SUMMARY_SLOTS
+
+# Senders used by the chat UI, mapped to the speaker names shown to the LLM
+SPEAKERS = {"You": "User", "Bot": "Assistant"}
+
+
+def parse_history(value):
+    """
+    Parse the chat history sent by the UI without evaluating it.
+
+    Args:
+        value (str | list): JSON list of {"sender": "You" | "Bot", "text": str},
+            bot messages optionally with "recommendations" [{"title": str}].
+
+    Returns:
+        list[dict]: The last MEMORY_MAX_MESSAGES messages as {"sender", "text"};
+        entries that are not chat messages (or have no text) are skipped.
+
+    Raises:
+        ValueError: If the history is not valid JSON or not a list.
+    """
+    if not value:
+        return []
+    history = json.loads(value) if isinstance(value, str) else value
+    if not isinstance(history, list):
+        raise ValueError("history must be a JSON list.")
+    messages = []
+    for message in history[-MEMORY_MAX_MESSAGES:]:
+        if not isinstance(message, dict) or message.get("sender") not in SPEAKERS:
+            continue
+        text = message.get("text")
+        text = text.strip() if isinstance(text, str) else ""
+        # Recommendation lists are quoted by title, so follow-ups can refer to them
+        recommendations = message.get("recommendations")
+        if isinstance(recommendations, list):
+            titles = [str(item["title"]) for item in recommendations if isinstance(item, dict) and item.get("title")]
+            if titles:
+                text = "Recommended: " + "; ".join(titles)
+        if text:
+            messages.append({"sender": message["sender"], "text": text})
+    return messages
+
+
+# Fingerprint of a run of messages, to notice when a client's history no longer matches the summary
+def history_fingerprint(messages):
+    digest = hashlib.sha1()
+    for message in messages:
+        digest.update(f"{message['sender']}\0{message['text']}\0".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def format_messages(messages, max_tokens=MEMORY_MESSAGE_TOKENS):
+    counter = get_token_counter()
+    lines = []
+    for message in messages:
+        text, truncated = counter.truncate(message["text"], max_tokens)
+        lines.append(f"{SPEAKERS[message['sender']]}: {text}{' [...]' if truncated else ''}")
+    return lines
+
+
+def summary_prompt(summary, messages, max_words=MEMORY_SUMMARY_WORDS):
+    return f"""
+            Update the summary of a conversation between a user and a career assistant that recommends jobs from MyCareersFuture and courses from SkillsFuture.
+            Keep what matters for later questions: the user's background, goals and preferences, and the jobs and courses already discussed.
+            Write at most {max_words} words of plain text, without any introduction.
+
+            Current summary:
+            {summary or "(none)"}
+
+            New messages:
+            {chr(10).join(format_messages(messages))}
+
+            Updated summary:
+            """
+
+
+class _SessionMemory:
+    def __init__(self):
+        self.summary = ""
+        self.summarized = 0  # leading history messages folded into the summary
+        self.fingerprint = history_fingerprint([])
+        self.pending = False
+
+
+class ConversationMemory:
+    """
+    Per-session conversation context for answer prompts.
+
+    The newest messages are quoted verbatim, as many as fit the token
+    budget; older ones are folded into a rolling summary. Summaries are
+    updated incrementally by a background LLM call once `summary_batch`
+    messages have aged out of the verbatim window, so requests never wait
+    for one: a request uses the summary as it stands and quotes the messages
+    it does not cover yet, budget permitting. At most LLM_SUMMARY_SLOTS
+    summaries are written at a time, the LLM capacity the async server's
+    LLMGate leaves for them.
+
+    The UI sends the full history with every message; it is the source of
+    truth. A session's summary is dropped when the history no longer starts
+    with the messages it was built from (e.g. after a page reload).
+
+    Args:
+        recent_messages (int): Messages always kept out of the summary.
+        summary_batch (int): Aged-out messages that trigger a summary update.
+        max_tokens (int): Token budget of the conversation block.
+        max_sessions (int): Sessions kept, least recently used dropped first.
+        model_name (str): Ollama model writing the summaries.
+    """
+
+    def __init__(self, recent_messages=MEMORY_RECENT_MESSAGES, summary_batch=MEMORY_SUMMARY_BATCH, max_tokens=PROMPT_HISTORY_TOKENS,
+                 max_sessions=MEMORY_MAX_SESSIONS, model_name=MODEL):
+        self.recent_messages = recent_messages
+        self.summary_batch = summary_batch
+        self.max_tokens = max_tokens
+        self.max_sessions = max_sessions
+        self.model_name = model_name
+        self.summaries = 0
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=LLM_SUMMARY_SLOTS, thread_name_prefix="summary")
+
+    def _session(self, session_id, history):
+        session = self._sessions.get(session_id)
+        if session is None or session.summarized > len(history) or \
+                history_fingerprint(history[:session.summarized]) != session.fingerprint:
+            session = _SessionMemory()
+            self._sessions[session_id] = session
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        return session
+
+    def context(self, session_id, history):
+        """
+        Return the conversation block for the prompt ("" without history) and
+        schedule a summary update if enough messages have aged out.
+
+        Args:
+            session_id (str): Chat session; None keeps no summary.
+            history (list[dict]): Parsed history, oldest first, without the
+                current question.
+        """
+        if not history:
+            return ""
+        if session_id is None:
+            summary, unsummarized = "", history
+        else:
+            with self._lock:
+                session = self._session(session_id, history)
+                summary, unsummarized = session.summary, history[session.summarized:]
+                aged_out = len(history) - self.recent_messages - session.summarized
+                if aged_out >= self.summary_batch and not session.pending:
+                    session.pending = True
+                    self._executor.submit(self._summarize, session_id, session, history[:len(history) - self.recent_messages])
+
+        counter = get_token_counter()
+        summary, _ = counter.truncate(summary, self.max_tokens // 2)
+        parts = [f"Summary of the earlier conversation: {summary}"] if summary else []
+        budget = self.max_tokens - sum(counter.count(part) for part in parts)
+        recent = []
+        for line in reversed(format_messages(unsummarized)):
+            tokens = counter.count(line) + 1
+            if tokens > budget:
+                break
+            recent.append(line)
+            budget -= tokens
+        return "\n".join(parts + recent[::-1])
+
+    def _summarize(self, session_id, session, history):
+        try:
+            summary = llm_pool.invoke(summary_prompt(session.summary, history[session.summarized:]), self.model_name).strip()
+        except Exception as e:
+            logging.warning(f"Conversation summary failed: {e}")
+            summary = None
+        metrics.inc("jobot_conversation_summaries_total", result="success" if summary else "error")
+        with self._lock:
+            session.pending = False
+            # Skip the update if the session was replaced or evicted while the summary was being written
+            if summary and self._sessions.get(session_id) is session:
+                session.summary = summary
+                session.summarized = len(history)
+                session.fingerprint = history_fingerprint(history)
+                self.summaries += 1
@@ -0,0 +1,88 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    STRING_DTYPE = "string[pyarrow]"
+except ImportError:
+    STRING_DTYPE = "string"
+
+# First and last dollar amount in a text such as "$3,000 to to$4,000" or "$150.00"
+FIRST_AMOUNT = r"\$\s*([\d,]+(?:\.\d+)?)"
+LAST_AMOUNT = r".*\$\s*([\d,]+(?:\.\d+)?)"
+
+# Datasets loaded in this process, keyed by CSV path
+_datasets = {}
+_datasets_lock = threading.Lock()
+
+
+def parse_amounts(series):
+    """
+    Parse the first and last dollar amounts out of a text column.
+
+    Returns:
+        tuple[pd.Series, pd.Series]: float32 columns, NaN where no amount was found.
+    """
+    def to_number(pattern):
+        amounts = series.astype(STRING_DTYPE).str.extract(pattern, expand=False)
+        return pd.to_numeric(amounts.str.replace(",", "", regex=False), errors="coerce").astype(np.float32)
+
+    return to_number(FIRST_AMOUNT), to_number(LAST_AMOUNT)
+
+
+def compact_dataset(data, category_columns=(), money_columns=None, date_columns=None):
+    """
+    Convert a freshly read CSV into a compact, fork-friendly representation.
+
+    Low-cardinality columns become categoricals, the remaining text columns
+    become Arrow-backed strings (contiguous buffers instead of one Python
+    object per cell, so pre-forked workers can share the pages copy-on-write),
+    and dollar and date columns get parsed typed companions.
+
+    Args:
+        data (pd.DataFrame): The raw dataset.
+        category_columns (list[str]): Columns stored as categoricals.
+        money_columns (dict): Text column -> names of the parsed columns, either
+            [amount] or [minimum, maximum].
+        date_columns (dict): Text column -> [name of the parsed datetime column, strptime format].
+
+    Returns:
+        pd.DataFrame: The compacted dataset.
+    """
+    data = data.copy()
+    for column in data.columns:
+        if column in category_columns:
+            data[column] = data[column].astype("category")
+        elif data[column].dtype == object or pd.api.types.is_string_dtype(data[column]):
+            data[column] = data[column].astype(STRING_DTYPE)
+
+    for column, targets in (money_columns or {}).items():
+        first, last = parse_amounts(data[column])
+        data[targets[0]] = first
+        if len(targets) > 1:
+            data[targets[1]] = last
+
+    for column, (target, date_format) in (date_columns or {}).items():
+        data[target] = pd.to_datetime(data[column].astype(STRING_DTYPE), format=date_format, errors="coerce")
+    return data
+
+
+def load_dataset(csv_path, category_columns=(), money_columns=None, date_columns=None, reload=False):
+    """
+    Return the compacted dataset for a CSV, reading it once per process.
+
+    Everything that needs the data (retrieval, /api/details, ...) shares the
+    returned DataFrame, which must be treated as read-only. With `reload`,
+    the CSV is read again and replaces the shared copy for later callers;
+    holders of the previous DataFrame keep using it unchanged.
+    """
+    data = None if reload else _datasets.get(csv_path)
+    if data is None:
+        with _datasets_lock:
+            data = None if reload else _datasets.get(csv_path)
+            if data is None:
+                data = compact_dataset(pd.read_csv(csv_path), category_columns, money_columns, date_columns)
+                _datasets[csv_path] = data
+    return data
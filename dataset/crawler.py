@@ -0,0 +1,314 @@
+import json
+import os
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from urllib.parse import urlparse
+
+import pandas as pd
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+
+# Dedup key of a record without a link, kept in the JSONL output but not exported to the CSV
+KEY_FIELD = "_crawl_key"
+
+
+# Records are told apart by their link; a record without one ("N/A") by its listing page
+# and listing fields (title, company, ...), so a resumed crawl does not write it twice
+def record_key(record, listing_url):
+    link = record.get("Link", "N/A")
+    if link and link != "N/A":
+        return link
+    fields = sorted((field, str(value)) for field, value in record.items() if field not in ("Link", KEY_FIELD))
+    return json.dumps([listing_url, fields], ensure_ascii=False)
+
+
+class HostRateLimiter:
+    """
+    Spaces out requests to the same host across all worker threads.
+
+    Args:
+        rate (float): Requests per second allowed per host; 0 disables the limit.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        if not self.interval:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class HttpFetcher:
+    """
+    Fetches pages with plain HTTP requests, for pages that render server-side
+    (and the local fixture server).
+    """
+
+    def __init__(self, limiter, timeout=30):
+        self.limiter = limiter
+        self.timeout = timeout
+
+    def fetch(self, url, wait_for=None):
+        self.limiter.wait(url)
+        request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return response.read().decode(response.headers.get_content_charset() or "utf-8")
+
+    def close(self):
+        pass
+
+
+class BrowserFetcher:
+    """
+    Fetches JavaScript-rendered pages with headless Chrome, one browser per
+    worker thread.
+
+    Instead of fixed sleeps, every fetch waits until the CSS selector given
+    as `wait_for` is present (at most `timeout` seconds) and then returns the
+    rendered HTML; on timeout the page is returned as it is, so the parser
+    decides whether it is usable.
+    """
+
+    def __init__(self, limiter, timeout=15):
+        self.limiter = limiter
+        self.timeout = timeout
+        self._local = threading.local()
+        self._drivers = []
+        self._lock = threading.Lock()
+
+    def _driver(self):
+        driver = getattr(self._local, "driver", None)
+        if driver is None:
+            from selenium import webdriver
+            from selenium.webdriver.chrome.options import Options
+
+            options = Options()
+            options.add_argument("--headless")
+            options.add_argument("--disable-gpu")
+            options.add_argument("--no-sandbox")
+            driver = webdriver.Chrome(options=options)
+            self._local.driver = driver
+            with self._lock:
+                self._drivers.append(driver)
+        return driver
+
+    def fetch(self, url, wait_for=None):
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        self.limiter.wait(url)
+        driver = self._driver()
+        driver.get(url)
+        if wait_for:
+            try:
+                WebDriverWait(driver, self.timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, wait_for)))
+            except TimeoutException:
+                print(f"Timed out waiting for {wait_for} on {url}")
+        return driver.page_source
+
+    def close(self):
+        with self._lock:
+            for driver in self._drivers:
+                driver.quit()
+            self._drivers.clear()
+
+
+def create_fetcher(backend, rate, timeout=15):
+    limiter = HostRateLimiter(rate)
+    if backend == "http":
+        return HttpFetcher(limiter, timeout)
+    if backend == "browser":
+        return BrowserFetcher(limiter, timeout)
+    raise ValueError(f"Unknown fetch backend: {backend}")
+
+
+class CrawlStore:
+    """
+    Append-only JSONL output of a crawl, with a checkpoint to resume from.
+
+    Every record is written as one JSON line as soon as it is scraped, so a
+    crash loses at most the line being written and no records are kept in
+    memory. The keys (see `record_key`) already written are read back on
+    start-up (a partial last line is cut off) and skipped by the crawl; the
+    checkpoint file next to the output holds the listing position to resume
+    from.
+
+    Args:
+        path (str): JSONL output file, e.g. "skillsfuture_courses.jsonl".
+        fresh (bool): Discard an earlier crawl's output and checkpoint.
+    """
+
+    def __init__(self, path, fresh=False):
+        self.path = path
+        self.state_path = os.path.splitext(path)[0] + ".state.json"
+        if fresh:
+            for stale in (self.path, self.state_path):
+                if os.path.exists(stale):
+                    os.remove(stale)
+
+        self.seen = self._read_links()
+        self.state = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                self.state = json.load(f)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _read_links(self):
+        seen = set()
+        if not os.path.exists(self.path):
+            return seen
+        end = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                end += len(line)
+                record = json.loads(line)
+                seen.add(record.get(KEY_FIELD) or record.get("Link"))
+        # Drop a line left half-written by a crash
+        if end != os.path.getsize(self.path):
+            os.truncate(self.path, end)
+        seen.discard("N/A")
+        return seen
+
+    def append(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.seen.add(record.get(KEY_FIELD) or record.get("Link"))
+
+    def checkpoint(self, **state):
+        """Record the crawl position once every record before it is on disk."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.state.update(state)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def close(self):
+        self._file.close()
+
+    def export_csv(self, csv_path, chunk_size=5000):
+        """Convert the JSONL output to the CSV the app loads, a chunk at a time."""
+        if not self._file.closed:
+            self._file.flush()
+        if not os.path.getsize(self.path):
+            return 0
+        rows = 0
+        tmp_path = f"{csv_path}.tmp"
+        for chunk in pd.read_json(self.path, lines=True, chunksize=chunk_size, dtype=False):
+            chunk = chunk.drop(columns=[KEY_FIELD], errors="ignore")
+            chunk.to_csv(tmp_path, mode="a" if rows else "w", header=not rows, index=False)
+            rows += len(chunk)
+        os.replace(tmp_path, csv_path)
+        return rows
+
+
+def _fetch_detail(fetcher, record, parse_detail, detail_wait, detail_defaults):
+    try:
+        details = parse_detail(fetcher.fetch(record["Link"], detail_wait))
+    except Exception as e:
+        print(f"Error retrieving details for {record['Link']}: {e}")
+        details = dict(detail_defaults)
+    return dict(record, **details)
+
+
+def crawl(listing_urls, parse_listing, parse_detail, fetcher, workers=4, listing_wait=None, detail_wait=None, detail_defaults=None,
+          seen_links=None, listing_done=None):
+    """
+    Crawl listing pages and fan their detail pages out across worker threads.
+
+    Listing pages are fetched and parsed once, in order, on the calling
+    thread; the detail page of every record is fetched by a pool of
+    `workers` threads while the next listing page is being read. The crawl
+    stops at the first listing page without records.
+
+    Records whose key (see `record_key`) is in `seen_links` are skipped, so
+    a resumed crawl re-reads the listing page it stopped on without fetching
+    or writing its records again. Records without a link carry their key in
+    KEY_FIELD. `listing_done` is called with each listing URL, in listing order,
+    once all of that page's records (and those of every earlier page) have
+    been handed out; it marks the position a crawl can safely resume from.
+
+    Args:
+        listing_urls (iterable[str]): Listing page URLs in crawl order.
+        parse_listing (callable): HTML -> list of partial records, each with a "Link".
+        parse_detail (callable): Detail page HTML -> dict of extra fields.
+        fetcher (HttpFetcher | BrowserFetcher): Fetch backend.
+        workers (int): Concurrent detail page fetches.
+        listing_wait (str): CSS selector marking a rendered listing page.
+        detail_wait (str): CSS selector marking a rendered detail page.
+        detail_defaults (dict): Fields used when a detail page cannot be read.
+        seen_links (set[str]): Keys of records already scraped.
+        listing_done (callable): Called with a listing URL once it is complete.
+
+    Yields:
+        tuple: (listing_url, record) for every complete record, as soon as its
+        detail page is parsed (not necessarily in listing order).
+    """
+    detail_defaults = detail_defaults or {}
+    seen_links = seen_links if seen_links is not None else set()
+    max_pending = workers * 4
+    pending = {}
+    # Records still to be handed out per listing page, in listing order
+    outstanding = {}
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="crawl")
+
+    def finish(listing_url):
+        outstanding[listing_url] -= 1
+        while outstanding and next(iter(outstanding.values())) == 0:
+            done_url = next(iter(outstanding))
+            del outstanding[done_url]
+            if listing_done:
+                listing_done(done_url)
+
+    try:
+        for listing_url in listing_urls:
+            records = parse_listing(fetcher.fetch(listing_url, listing_wait))
+            print(f"Found {len(records)} records on {listing_url}")
+            if not records:
+                break
+
+            records = [record for record in records if record_key(record, listing_url) not in seen_links]
+            # One extra count for the page itself, released once its records are queued
+            outstanding[listing_url] = len(records) + 1
+            for record in records:
+                if record.get("Link", "N/A") == "N/A":
+                    yield listing_url, dict(record, **detail_defaults, **{KEY_FIELD: record_key(record, listing_url)})
+                    finish(listing_url)
+                    continue
+                future = pool.submit(_fetch_detail, fetcher, record, parse_detail, detail_wait, detail_defaults)
+                pending[future] = listing_url
+            finish(listing_url)
+
+            # Hand out finished records, and keep the backlog bounded before reading more listings
+            while pending:
+                done, _ = wait(pending, timeout=0 if len(pending) <= max_pending else None, return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+                for future in done:
+                    done_url = pending.pop(future)
+                    yield done_url, future.result()
+                    finish(done_url)
+
+        for future in list(pending):
+            done_url = pending.pop(future)
+            yield done_url, future.result()
+            finish(done_url)
+    finally:
+        # On an interrupted crawl, drop the queued detail fetches instead of finishing them
+        pool.shutdown(wait=True, cancel_futures=True)
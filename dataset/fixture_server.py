@@ -0,0 +1,112 @@
+import argparse
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Local stand-in for MyCareersFuture and MySkillsFuture, serving generated listing and
+# detail pages with the markup the scrapers parse. Lets the crawler's throughput be
+# measured offline, e.g.:
+#   python fixture_server.py --pages 10 --latency 0.2
+#   python scrape_careers.py --base-url http://127.0.0.1:8765 --backend http --rate 0 --workers 8
+
+
+# Wrap `inner` in nested elements so it sits at an absolute XPath such as div[1]/div/div[2]:
+# an element with index n gets n - 1 empty siblings before it
+def nest(steps, inner):
+    html = inner
+    for step in reversed(steps.split("/")):
+        tag, _, index = step.partition("[")
+        index = int(index.rstrip("]")) if index else 1
+        html = f"<{tag}></{tag}>" * (index - 1) + f"<{tag}>{html}</{tag}>"
+    return html
+
+
+def job_card(job_id):
+    return f"""
+    <a class="JobCard__card___22xP3" href="/job/{job_id}">
+      <span data-testid="job-card__job-title">Fixture Job {job_id}</span>
+      <p data-testid="company-hire-info">Fixture Company {job_id % 17}</p>
+      <p data-cy="job-card__location">Central</p>
+      <p data-cy="job-card__employment-type">Full Time</p>
+      <div data-cy="salary-info"><div class="lh-solid"><span class="dib">$3,000</span><span class="dib">$4,000</span></div></div>
+    </a>"""
+
+
+def job_detail(job_id):
+    description = f"Fixture description for job {job_id}. " * 20
+    body = nest("div[1]/div/div/main/div/div/section/div[1]/div[4]/div[2]/section/div", description)
+    return f"<html><head><title>Job {job_id}</title></head><body>{body}</body></html>"
+
+
+def course_card(course_id):
+    return f"""
+    <div class="card">
+      <div class="course-provider">Fixture Institute {course_id % 11}</div>
+      <h5 class="card-title"><a href="/course-detail.html?id={course_id}">Fixture Course {course_id}</a></h5>
+      <strong data-bind="text: $Util.formatDate(Course_Start_Date_Nearest)">13 Jan 25</strong>
+      <div class="card-course-duration-holder"><span>1-2 days</span></div>
+      <div class="card-course-type-holder"><span>Part Time</span></div>
+    </div>"""
+
+
+def course_detail(course_id):
+    full_fee = nest("div[1]/div[1]/div[1]/div/div/div/div[2]/div[2]/div[2]/div/div[1]/div/strong", f"${course_id % 900 + 100}.00")
+    return f"""<html><head><title>Course {course_id}</title></head><body><main>{full_fee}
+      <div class="col-lg-8">
+        <h4>About This Course</h4><p>{f"Fixture course {course_id} overview. " * 10}</p>
+        <h4>What You'll Learn</h4><p>Fixture skills.</p>
+        <h4>Minimum Entry Requirement</h4><p>None.</p>
+        <strong data-bind="text: courseDetail.extCourseRefNo">${course_id % 400 + 50}.00</strong>
+      </div>
+    </main></body></html>"""
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    pages = 5
+    per_page = 20
+    latency = 0.1
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path == "/search":
+            page = int(query.get("page", ["0"])[0])
+            cards = [job_card(page * self.per_page + i) for i in range(self.per_page)] if page < self.pages else []
+            self.reply(f"<html><body>{''.join(cards)}</body></html>")
+        elif url.path.startswith("/job/"):
+            self.reply(job_detail(int(url.path.rsplit("/", 1)[1])))
+        elif url.path.endswith("portal-search.html"):
+            page = int(query.get("start", ["0"])[0]) // 24
+            cards = [course_card(page * 24 + i) for i in range(24)] if page < self.pages else []
+            self.reply(f"<html><body>{''.join(cards)}</body></html>")
+        elif url.path == "/course-detail.html":
+            self.reply(course_detail(int(query["id"][0])))
+        else:
+            self.send_error(404)
+
+    def reply(self, html):
+        body = html.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve fixture listing and detail pages for offline crawler tests")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--pages", type=int, default=5, help="Listing pages per site before an empty page")
+    parser.add_argument("--per-page", type=int, default=20, help="Job cards per careers listing page")
+    parser.add_argument("--latency", type=float, default=0.1, help="Seconds every response is delayed")
+    args = parser.parse_args()
+
+    FixtureHandler.pages, FixtureHandler.per_page, FixtureHandler.latency = args.pages, args.per_page, args.latency
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), FixtureHandler)
+    print(f"Serving fixtures on http://127.0.0.1:{args.port}")
+    server.serve_forever()
@@ -1,70 +1,47 @@
-import os
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
+import argparse
 import time
-import signal
-from selenium.webdriver.chrome.options import Options
-
-options = Options()
-options.add_argument("--headless")  # Enable headless mode
-options.add_argument("--disable-gpu")
-options.add_argument("--no-sandbox")
-
-driver = webdriver.Chrome(options=options)
-
-driver.maximize_window()
-
-# Open the website
-BASE_URL = "https://www.mycareersfuture.gov.sg/search?sortBy=relevancy&page=0"
-driver.get(BASE_URL)
-
-# Wait for the page to load
-wait = WebDriverWait(driver, 5)
-
-# Initialize the list to store all job postings
-all_jobs = []
-
-def save_progress():
-    """Save the progress to a CSV file."""
-    if all_jobs:
-        df = pd.DataFrame(all_jobs)
-        df.to_csv("mycareersfuture_jobs_with_description.csv", index=False)
-        print("Progress saved to mycareersfuture_jobs_with_description.csv.")
+from urllib.parse import urlparse, parse_qs
 
-# Handle interruptions (e.g., Ctrl+C)
-def signal_handler(sig, frame):
-    print("Interrupted! Saving progress...")
-    save_progress()
-    driver.quit()
-    exit(0)
-
-signal.signal(signal.SIGINT, signal_handler)
-
-# Function to scrape job description from the detailed page
-def scrape_job_description(job_link):
-    driver.get(job_link)  # Navigate to the job detail page
-    time.sleep(2)  # Wait for the page to load
+import lxml.html
+from bs4 import BeautifulSoup
 
-    try:
-        # Retrieve job description using XPath
-        job_description = driver.find_element(By.XPATH, "/html/body/div[1]/div/div/main/div/div/section/div[1]/div[4]/div[2]/section/div").text.strip()
-    except Exception as e:
-        print(f"Error retrieving job description: {e}")
-        job_description = "N/A"
-
-    # Navigate back to the listing page
-    driver.back()
-    time.sleep(2)  # Wait for the listing page to reload
-    print(job_description)
-    return job_description
-
-# Function to scrape one page of job postings
-def scrape_page():
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+from crawler import CrawlStore, crawl, create_fetcher
+
+BASE_URL = "https://www.mycareersfuture.gov.sg"
+LISTING_PATH = "/search?sortBy=relevancy&page="
+LAST_PAGE = 499
+
+# Rendered job cards on a listing page, and the job description on a detail page
+LISTING_WAIT = "a.JobCard__card___22xP3"
+DESCRIPTION_XPATH = "/html/body/div[1]/div/div/main/div/div/section/div[1]/div[4]/div[2]/section/div"
+DETAIL_WAIT = "main section"
+
+# Records are appended to the JSONL file as they are scraped, then exported to the CSV
+OUTPUT_JSONL = "mycareersfuture_jobs_with_description.jsonl"
+OUTPUT_CSV = "mycareersfuture_jobs_with_description.csv"
+
+def save_progress(store):
+    """Export the scraped records to a CSV file."""
+    rows = store.export_csv(OUTPUT_CSV)
+    if rows:
+        print(f"Progress saved to {OUTPUT_CSV} ({rows} jobs).")
+
+# Listing page URLs in crawl order
+def listing_urls(base_url=BASE_URL, first_page=0, last_page=LAST_PAGE):
+    for page in range(first_page, last_page + 1):
+        yield f"{base_url}{LISTING_PATH}{page}"
+
+# Function to scrape the job description from the detail page HTML
+def parse_job_description(html):
+    nodes = lxml.html.fromstring(html).xpath(DESCRIPTION_XPATH)
+    if not nodes:
+        print("Error retrieving job description: element not found")
+        return {"Job Description": "N/A"}
+    return {"Job Description": nodes[0].text_content().strip()}
+
+# Function to parse one listing page of job postings (without descriptions)
+def parse_listing(html, base_url=BASE_URL):
+    soup = BeautifulSoup(html, "html.parser")
     job_cards = soup.find_all("a", class_="JobCard__card___22xP3")
 
     jobs = []
@@ -76,8 +53,8 @@ def scrape_page():
 
         try:
             job_link = card["href"]
-            job_link = f"https://www.mycareersfuture.gov.sg{job_link}"
-        except (AttributeError, TypeError):
+            job_link = f"{base_url}{job_link}"
+        except (AttributeError, TypeError, KeyError):
             job_link = "N/A"
 
         try:
@@ -111,17 +88,6 @@ def scrape_page():
             salary = "Not specified"
             print(f"Error extracting salary: {e}")
 
-        try:
-            posted_date = card.find("span", {"data-cy": "job-card-date-info"}).text.strip()
-        except AttributeError:
-            posted_date = "N/A"
-
-        # Scrape job description from the detailed page
-        if job_link != "N/A":
-            job_description = scrape_job_description(job_link)
-        else:
-            job_description = "N/A"
-
         jobs.append({
             "Job Title": job_title,
             "Link": job_link,
@@ -129,42 +95,79 @@ def scrape_page():
             "Location": location,
             "Employment Type": employment_type,
             "Salary": salary,
-            "Job Description": job_description
         })
 
     return jobs
 
-# Scrape multiple pages
-try:
-    while True:
-        try:
-            # Scrape the current page
-            jobs_on_page = scrape_page()
-            all_jobs.extend(jobs_on_page)
-            print(f"Scraped {len(jobs_on_page)} jobs on this page.")
-
-            # Check if the current page is page=499 and exit
-            if "page=499" in driver.current_url:
-                print("Reached page=499. Exiting the loop.")
-                break
-
-            # Check if the "Next" button exists
-            next_buttons = driver.find_elements(By.XPATH, "//button[@aria-label='Next']")
-            if not next_buttons:  # If the "Next" button is not found
-                print("No more pages to scrape. Exiting.")
-                break
-
-            # Click the "Next" button
-            next_button = next_buttons[0]
-            next_button.click()
-            time.sleep(2)  # Wait for the next page to load
-        except Exception as e:
-            print(f"Error occurred: {e}. Exiting.")
-            break
-except Exception as e:
-    print(f"Unexpected error: {e}. Exiting.")
-finally:
-    save_progress()
-    driver.quit()
-
-print("Scraping completed.")
+
+# Listing page number of a listing URL
+def page_of(listing_url):
+    return int(parse_qs(urlparse(listing_url).query)["page"][0])
+
+
+def scrape(store, base_url=BASE_URL, backend="browser", workers=4, rate=2.0, last_page=LAST_PAGE):
+    """
+    Crawl the job listings, fetching job descriptions concurrently.
+
+    Resumes from the first listing page not yet fully written to `store`.
+
+    Args:
+        store (CrawlStore): Output and checkpoint of the crawl.
+        base_url (str): Site root; point it at `fixture_server.py` to test offline.
+        backend (str): "browser" (headless Chrome) or "http" (plain requests).
+        workers (int): Detail pages fetched in parallel.
+        rate (float): Requests per second per host; 0 for no limit.
+        last_page (int): Last listing page to visit.
+    """
+    first_page = store.state.get("next_page", 0)
+    if first_page:
+        print(f"Resuming from page {first_page} with {len(store.seen)} jobs already scraped.")
+
+    fetcher = create_fetcher(backend, rate)
+    start = time.perf_counter()
+    scraped = 0
+    try:
+        records = crawl(
+            listing_urls(base_url, first_page, last_page),
+            lambda html: parse_listing(html, base_url),
+            parse_job_description,
+            fetcher,
+            workers=workers,
+            listing_wait=LISTING_WAIT,
+            detail_wait=DETAIL_WAIT,
+            detail_defaults={"Job Description": "N/A"},
+            seen_links=store.seen,
+            listing_done=lambda url: store.checkpoint(next_page=page_of(url) + 1),
+        )
+        for _, job in records:
+            store.append(job)
+            scraped += 1
+    finally:
+        fetcher.close()
+    elapsed = time.perf_counter() - start
+    print(f"Scraped {scraped} jobs in {elapsed:.1f} s ({scraped / max(elapsed, 1e-9):.1f} jobs/s).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape job postings from MyCareersFuture")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--backend", choices=["browser", "http"], default="browser")
+    parser.add_argument("--workers", type=int, default=4, help="Detail pages fetched in parallel")
+    parser.add_argument("--rate", type=float, default=2.0, help="Requests per second per host (0 = unlimited)")
+    parser.add_argument("--last-page", type=int, default=LAST_PAGE)
+    parser.add_argument("--fresh", action="store_true", help="Start over instead of resuming the last crawl")
+    args = parser.parse_args()
+
+    store = CrawlStore(OUTPUT_JSONL, fresh=args.fresh)
+    try:
+        scrape(store, args.base_url, args.backend, args.workers, args.rate, args.last_page)
+    except KeyboardInterrupt:
+        # Handle interruptions (e.g., Ctrl+C)
+        print("Interrupted! Saving progress...")
+    except Exception as e:
+        print(f"Unexpected error: {e}. Exiting.")
+    finally:
+        store.close()
+        save_progress(store)
+
+    print("Scraping completed.")
@@ -1,105 +1,72 @@
-import os
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
+import argparse
 import time
-import signal
-import sys
-from selenium.webdriver.chrome.options import Options
+from urllib.parse import urlparse, parse_qs
 
-options = Options()
-options.add_argument("--headless")
-options.add_argument("--disable-gpu")
-options.add_argument("--no-sandbox")
+import lxml.html
+from bs4 import BeautifulSoup
 
-driver = webdriver.Chrome(options=options)
-driver.maximize_window()
+from crawler import CrawlStore, crawl, create_fetcher
 
 # Base URL with query parameters
-BASE_URL = "https://www.myskillsfuture.gov.sg/content/portal/en/portal-search/portal-search.html"
+BASE_URL = "https://www.myskillsfuture.gov.sg"
+SEARCH_PATH = "/content/portal/en/portal-search/portal-search.html"
 QUERY_PARAMS = "?fq=Course_Supp_Period_To_1%3A%5B2025-01-11T00%3A00%3A00Z%20TO%20*%5D&fq=IsValid%3Atrue&q=*%3A*"
 START_PARAM = "&start="
-
-# Wait object
-wait = WebDriverWait(driver, 10)
-
-# Initialize the list to store all course data
-all_courses = []
-
-def save_progress():
-    """Save the progress to a CSV file."""
-    if all_courses:
-        df = pd.DataFrame(all_courses)
-        df.to_csv("skillsfuture_courses.csv", index=False)
-        print("Progress saved to skillsfuture_courses.csv.")
-
-# Handle interruptions (e.g., Ctrl+C)
-def signal_handler(sig, frame):
-    print("Interrupted! Saving progress...")
-    save_progress()
-    driver.quit()
-    sys.exit(0)
-
-signal.signal(signal.SIGINT, signal_handler)
-
-def scrape_course_details(course_link):
-    """Scrape detailed course information from the course details page."""
-    try:
-        driver.get(course_link)
-        print(f"Navigating to: {course_link}")
-
-        # Wait for the course details to load
-        wait.until(EC.presence_of_element_located((By.CLASS_NAME, "col-lg-8")))
-        time.sleep(5)  # Ensure all elements are loaded
-
-        # Extract detailed information
-        try:
-            about_course = driver.find_element(By.XPATH, "//h4[text()='About This Course']/following-sibling::p").text.strip()
-        except Exception:
-            about_course = "N/A"
-
-        try:
-            what_you_learn = driver.find_element(By.XPATH, "//h4[text()=\"What You'll Learn\"]/following-sibling::p").text.strip()
-        except Exception:
-            what_you_learn = "N/A"
-
-        try:
-            min_requirement = driver.find_element(By.XPATH, "//h4[text()='Minimum Entry Requirement']/following-sibling::p").text.strip()
-        except Exception:
-            min_requirement = "N/A"
-
-        try:
-            full_fee = driver.find_element(By.XPATH, "/html/body/main/div[1]/div[1]/div[1]/div/div/div/div[2]/div[2]/div[2]/div/div[1]/div/strong").text.strip()
-        except Exception:
-            full_fee = "N/A"
-
-        # Scrape "After SkillsFuture Funding"
-        try:
-            time.sleep(2)
-            funded_fee_element = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "strong[data-bind*='courseDetail.extCourseRefNo']"))
-            )
-            funded_fee = funded_fee_element.text.strip()
-        except Exception as e:
-            funded_fee = "N/A"
-            print(f"Error retrieving funded fee: {e}")
-        print(f"About This Course: {about_course}")
-            
-
-        return about_course, what_you_learn, min_requirement, full_fee, funded_fee
-    
-
-    except Exception as e:
-        print(f"Error retrieving details for {course_link}: {e}")
-        return "N/A", "N/A", "N/A", "N/A", "N/A"
-
-def scrape_page():
-    """Scrapes one page of courses."""
+PAGE_SIZE = 24
+
+# Rendered course cards on a listing page; the funded fee is the last field bound on a detail page
+LISTING_WAIT = "div.card"
+DETAIL_WAIT = "strong[data-bind*='courseDetail.extCourseRefNo']"
+FULL_FEE_XPATH = "/html/body/main/div[1]/div[1]/div[1]/div/div/div/div[2]/div[2]/div[2]/div/div[1]/div/strong"
+DETAIL_DEFAULTS = {
+    "Full Fee": "N/A",
+    "Funded Fee": "N/A",
+    "About This Course": "N/A",
+    "What You'll Learn": "N/A",
+    "Minimum Entry Requirement": "N/A",
+}
+
+# Records are appended to the JSONL file as they are scraped, then exported to the CSV
+OUTPUT_JSONL = "skillsfuture_courses.jsonl"
+OUTPUT_CSV = "skillsfuture_courses.csv"
+
+def save_progress(store):
+    """Export the scraped records to a CSV file."""
+    rows = store.export_csv(OUTPUT_CSV)
+    if rows:
+        print(f"Progress saved to {OUTPUT_CSV} ({rows} courses).")
+
+# Listing page URLs in crawl order
+def listing_urls(base_url=BASE_URL, start_index=0):
+    while True:
+        yield f"{base_url}{SEARCH_PATH}{QUERY_PARAMS}{START_PARAM}{start_index}"
+        start_index += PAGE_SIZE
+
+# Start index of a listing URL
+def start_of(listing_url):
+    return int(parse_qs(urlparse(listing_url).query)["start"][0])
+
+# Text of the first element matching an XPath, or "N/A"
+def xpath_text(tree, xpath):
+    nodes = tree.xpath(xpath)
+    return nodes[0].text_content().strip() if nodes else "N/A"
+
+def parse_course_details(html):
+    """Parse detailed course information from the course details page."""
+    tree = lxml.html.fromstring(html)
+    funded_fee = BeautifulSoup(html, "html.parser").select_one(DETAIL_WAIT)
+    return {
+        "Full Fee": xpath_text(tree, FULL_FEE_XPATH),
+        "Funded Fee": funded_fee.text.strip() if funded_fee else "N/A",
+        "About This Course": xpath_text(tree, "//h4[text()='About This Course']/following-sibling::p"),
+        "What You'll Learn": xpath_text(tree, "//h4[text()=\"What You'll Learn\"]/following-sibling::p"),
+        "Minimum Entry Requirement": xpath_text(tree, "//h4[text()='Minimum Entry Requirement']/following-sibling::p"),
+    }
+
+def parse_listing(html, base_url=BASE_URL):
+    """Parses one page of courses (without their details)."""
     courses = []
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+    soup = BeautifulSoup(html, "html.parser")
     course_cards = soup.find_all("div", class_="card")
 
     if not course_cards:
@@ -110,7 +77,7 @@ def scrape_page():
         try:
             institution = card.find("div", class_="course-provider").text.strip() if card.find("div", class_="course-provider") else "N/A"
             course_title = card.find("h5", class_="card-title").find("a").text.strip() if card.find("h5", class_="card-title") else "N/A"
-            course_link = f"https://www.myskillsfuture.gov.sg{card.find('h5', class_='card-title').find('a')['href']}" if card.find("h5", class_="card-title") else "N/A"
+            course_link = f"{base_url}{card.find('h5', class_='card-title').find('a')['href']}" if card.find("h5", class_="card-title") else "N/A"
 
             try:
                 upcoming_date = card.find("strong", {"data-bind": "text: $Util.formatDate(Course_Start_Date_Nearest)"}).text.strip()
@@ -127,13 +94,6 @@ def scrape_page():
             except AttributeError:
                 training_mode = "N/A"
 
-            if course_link != "N/A":
-                about_course, what_you_learn, min_requirement, full_fee, funded_fee = scrape_course_details(course_link)
-                driver.back()
-                WebDriverWait(driver, 10).until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div.card")))
-            else:
-                about_course = what_you_learn = min_requirement = full_fee = funded_fee = "N/A"
-
             if course_title != "N/A":
                 courses.append({
                     "Institution": institution,
@@ -142,11 +102,6 @@ def scrape_page():
                     "Upcoming Date": upcoming_date,
                     "Duration": duration,
                     "Training Mode": training_mode,
-                    "Full Fee": full_fee,
-                    "Funded Fee": funded_fee,
-                    "About This Course": about_course,
-                    "What You'll Learn": what_you_learn,
-                    "Minimum Entry Requirement": min_requirement
                 })
 
         except Exception as e:
@@ -154,37 +109,64 @@ def scrape_page():
 
     return courses
 
-def scrape_all_pages():
-    start_index = 0
-    while True:
-        try:
-            url = f"{BASE_URL}{QUERY_PARAMS}{START_PARAM}{start_index}"
-            print(f"Scraping URL: {url}")
-            driver.get(url)
-            print("Waiting for the page to load...")
-            time.sleep(10)
-
-            WebDriverWait(driver, 15).until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div.card")))
-
-            courses_on_page = scrape_page()
-            if not courses_on_page:
-                print("No more courses to scrape. Exiting.")
-                break
-
-            all_courses.extend(courses_on_page)
-            print(f"Scraped {len(courses_on_page)} courses on this page.")
-
-            start_index += 24
-        except Exception as e:
-            print(f"An error occurred: {e}. Exiting.")
-            break
+def scrape_all_pages(store, base_url=BASE_URL, backend="browser", workers=4, rate=2.0):
+    """
+    Crawl the course listings, fetching course details concurrently.
+
+    Resumes from the first listing page not yet fully written to `store`.
+
+    Args:
+        store (CrawlStore): Output and checkpoint of the crawl.
+        base_url (str): Site root; point it at `fixture_server.py` to test offline.
+        backend (str): "browser" (headless Chrome) or "http" (plain requests).
+        workers (int): Detail pages fetched in parallel.
+        rate (float): Requests per second per host; 0 for no limit.
+    """
+    start_index = store.state.get("next_start", 0)
+    if start_index:
+        print(f"Resuming from start index {start_index} with {len(store.seen)} courses already scraped.")
+
+    fetcher = create_fetcher(backend, rate)
+    start = time.perf_counter()
+    scraped = 0
+    try:
+        records = crawl(
+            listing_urls(base_url, start_index),
+            lambda html: parse_listing(html, base_url),
+            parse_course_details,
+            fetcher,
+            workers=workers,
+            listing_wait=LISTING_WAIT,
+            detail_wait=DETAIL_WAIT,
+            detail_defaults=DETAIL_DEFAULTS,
+            seen_links=store.seen,
+            listing_done=lambda url: store.checkpoint(next_start=start_of(url) + PAGE_SIZE),
+        )
+        for _, course in records:
+            store.append(course)
+            scraped += 1
+    finally:
+        fetcher.close()
+    elapsed = time.perf_counter() - start
+    print(f"Scraped {scraped} courses in {elapsed:.1f} s ({scraped / max(elapsed, 1e-9):.1f} courses/s).")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape courses from MySkillsFuture")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--backend", choices=["browser", "http"], default="browser")
+    parser.add_argument("--workers", type=int, default=4, help="Detail pages fetched in parallel")
+    parser.add_argument("--rate", type=float, default=2.0, help="Requests per second per host (0 = unlimited)")
+    parser.add_argument("--fresh", action="store_true", help="Start over instead of resuming the last crawl")
+    args = parser.parse_args()
+
+    store = CrawlStore(OUTPUT_JSONL, fresh=args.fresh)
     try:
-        scrape_all_pages()
+        scrape_all_pages(store, args.base_url, args.backend, args.workers, args.rate)
+    except KeyboardInterrupt:
+        # Handle interruptions (e.g., Ctrl+C)
+        print("Interrupted! Saving progress...")
     except Exception as e:
         print(f"Unexpected error: {e}. Exiting.")
     finally:
-        save_progress()
-        driver.quit()
-        sys.exit(0)
+        store.close()
+        save_progress(store)
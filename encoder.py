@@ -0,0 +1,38 @@
+import threading
+
+import torch
+from sentence_transformers import SentenceTransformer
+
+from config import EMBEDDING_MODEL, EMBEDDING_DEVICE, EMBEDDING_THREADS
+
+# Process-wide registry of loaded embedding models, keyed by model name
+_encoders = {}
+_encoders_lock = threading.Lock()
+
+
+def get_encoder(model_name=EMBEDDING_MODEL):
+    """
+    Return the shared SentenceTransformer for a model, loading it once per process.
+
+    Args:
+        model_name (str): Name of the sentence-transformers model.
+
+    Returns:
+        SentenceTransformer: The loaded model. Inference is safe to call from
+        several request threads at once.
+    """
+    encoder = _encoders.get(model_name)
+    if encoder is None:
+        with _encoders_lock:
+            encoder = _encoders.get(model_name)
+            if encoder is None:
+                if EMBEDDING_THREADS:
+                    torch.set_num_threads(EMBEDDING_THREADS)
+                encoder = SentenceTransformer(model_name, device=EMBEDDING_DEVICE)
+                _encoders[model_name] = encoder
+    return encoder
+
+
+# Load the model and run one encode so the first request does not pay for lazy initialisation
+def warm_up(model_name=EMBEDDING_MODEL):
+    get_encoder(model_name).encode(["warm up"], convert_to_tensor=False)
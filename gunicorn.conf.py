@@ -0,0 +1,22 @@
+import gc
+import os
+
+# Pre-forked serving of the Flask app: `gunicorn "app:create_app()"` (the ASGI app runs under hypercorn, see README).
+# The app is created once in the master, so the datasets, FAISS indexes and embedding model
+# are loaded before forking and shared copy-on-write by every worker.
+bind = "127.0.0.1:5000"
+workers = 4
+preload_app = True
+timeout = 180
+
+# Every worker has its own memory, so resumes go to one SQLite file all workers share;
+# otherwise a follow-up message handled by another worker would not see the resume.
+# Set before the app is loaded, which reads the backend from config.py.
+os.environ.setdefault("RESUME_STORE_BACKEND", "sqlite")
+os.environ.setdefault("RESUME_STORE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "resumes.sqlite3"))
+
+
+def when_ready(server):
+    # Move everything loaded so far out of the garbage collector's reach; otherwise the
+    # first collection in each worker writes to those pages and un-shares them
+    gc.freeze()
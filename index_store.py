@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import faiss
+import numpy as np
+
+from config import INDEX_CACHE_DIR
+
+EMBEDDINGS_FILE = "embeddings.npy"
+INDEX_FILE = "index.faiss"
+CHUNK_ROWS_FILE = "chunk_rows.npy"
+META_FILE = "meta.json"
+ROWS_FILE = "rows.json"
+
+
+# Hash the raw bytes of a file without reading it into memory at once
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Build the cache key for a dataset from everything that changes its embeddings
+def artifact_key(csv_path, model_name, text_columns, chunk_size, overlap, index_params=None):
+    digest = hashlib.sha256()
+    digest.update(file_sha256(csv_path).encode())
+    digest.update(json.dumps({
+        "model": model_name,
+        "text_columns": list(text_columns),
+        "chunk_size": chunk_size,
+        "overlap": overlap,
+        "index": index_params or {},
+    }, sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+def artifact_dir(name, key, cache_dir=INDEX_CACHE_DIR):
+    return os.path.join(cache_dir, name, key)
+
+
+def load_artifacts(name, key, cache_dir=INDEX_CACHE_DIR):
+    """
+    Load the stored artifacts of a dataset if they exist for this key.
+
+    The embedding matrix is memory-mapped read-only, so pages are only read
+    from disk when they are touched.
+
+    Args:
+        name (str): Dataset name, e.g. "careers".
+        key (str): Key returned by `artifact_key`.
+        cache_dir (str): Root directory of the artifact store.
+
+    Returns:
+        dict | None: "embeddings", "index", "chunk_rows", "meta" and "rows"
+        (the record IDs and text hashes of the indexed rows, None for entries
+        written before they were stored), or None if nothing usable is stored.
+    """
+    path = artifact_dir(name, key, cache_dir)
+    if not os.path.exists(os.path.join(path, META_FILE)):
+        return None
+    try:
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+        rows = None
+        if os.path.exists(os.path.join(path, ROWS_FILE)):
+            with open(os.path.join(path, ROWS_FILE)) as f:
+                rows = json.load(f)
+        return {
+            "embeddings": np.load(os.path.join(path, EMBEDDINGS_FILE), mmap_mode="r"),
+            "index": faiss.read_index(os.path.join(path, INDEX_FILE)),
+            "chunk_rows": np.load(os.path.join(path, CHUNK_ROWS_FILE), mmap_mode="r"),
+            "meta": meta,
+            "rows": rows,
+        }
+    except Exception as e:
+        print(f"Ignoring unreadable index artifacts in {path}: {e}")
+        return None
+
+
+def save_artifacts(name, key, embeddings, index, chunk_rows, meta=None, rows=None, cache_dir=INDEX_CACHE_DIR):
+    """
+    Write the artifacts of a dataset and drop older versions of it.
+
+    Files are written to a temporary directory first and renamed into place,
+    so a crashed build never leaves a half-written entry behind.
+
+    Args:
+        name (str): Dataset name, e.g. "careers".
+        key (str): Key returned by `artifact_key`.
+        embeddings (np.ndarray): Chunk embedding matrix.
+        index (faiss.Index): Index built over `embeddings`.
+        chunk_rows (np.ndarray): Dataset row position of every chunk.
+        meta (dict): Extra information stored alongside the artifacts.
+        rows (dict): {"ids": [...], "hashes": [...]} of the indexed rows, used
+            by later incremental updates to find unchanged rows.
+        cache_dir (str): Root directory of the artifact store.
+
+    Returns:
+        str: The directory the artifacts were written to.
+    """
+    parent = os.path.join(cache_dir, name)
+    os.makedirs(parent, exist_ok=True)
+    tmp_path = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+    try:
+        np.save(os.path.join(tmp_path, EMBEDDINGS_FILE), np.ascontiguousarray(embeddings, dtype=np.float32))
+        np.save(os.path.join(tmp_path, CHUNK_ROWS_FILE), np.asarray(chunk_rows, dtype=np.int32))
+        faiss.write_index(index, os.path.join(tmp_path, INDEX_FILE))
+        with open(os.path.join(tmp_path, META_FILE), "w") as f:
+            json.dump(dict(meta or {}, key=key, count=int(len(chunk_rows))), f, indent=2)
+        if rows is not None:
+            with open(os.path.join(tmp_path, ROWS_FILE), "w") as f:
+                json.dump(rows, f)
+
+        path = artifact_dir(name, key, cache_dir)
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.replace(tmp_path, path)
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+    prune_artifacts(name, keep=key, cache_dir=cache_dir)
+    return path
+
+
+# Return the most recently written artifacts of a dataset other than `exclude`, e.g. the
+# previous version to update incrementally from, or None
+def latest_artifacts(name, exclude=None, cache_dir=INDEX_CACHE_DIR):
+    parent = os.path.join(cache_dir, name)
+    if not os.path.isdir(parent):
+        return None
+    entries = [
+        entry for entry in os.listdir(parent)
+        if entry != exclude and not entry.startswith(".") and os.path.exists(os.path.join(parent, entry, META_FILE))
+    ]
+    for entry in sorted(entries, key=lambda e: os.path.getmtime(os.path.join(parent, e, META_FILE)), reverse=True):
+        artifacts = load_artifacts(name, entry, cache_dir)
+        if artifacts is not None:
+            return artifacts
+    return None
+
+
+# Remove stale versions of a dataset so the cache does not grow on every data refresh
+def prune_artifacts(name, keep, cache_dir=INDEX_CACHE_DIR):
+    parent = os.path.join(cache_dir, name)
+    if not os.path.isdir(parent):
+        return
+    for entry in os.listdir(parent):
+        if entry != keep and not entry.startswith(".tmp-"):
+            shutil.rmtree(os.path.join(parent, entry), ignore_errors=True)
@@ -0,0 +1,61 @@
+import hashlib
+
+import numpy as np
+
+
+# Fingerprint of each row's indexed text; a row whose fingerprint is unchanged keeps its embeddings
+def row_hashes(texts):
+    return [hashlib.sha1(text.encode("utf-8")).hexdigest()[:16] for text in texts]
+
+
+def reuse_embeddings(previous, row_ids, hashes, chunk_rows, dimension):
+    """
+    Carry the chunk embeddings of unchanged rows over from a previous index.
+
+    Rows are matched by their stable record ID (derived from the listing
+    link), so reordering, added and expired postings do not matter; a row is
+    reused when its text fingerprint and chunk count are unchanged.
+
+    Args:
+        previous (dict): Artifacts returned by `index_store.load_artifacts`,
+            including "rows".
+        row_ids (list[str]): Record ID of every new row.
+        hashes (list[str]): Text fingerprint of every new row.
+        chunk_rows (np.ndarray): Chunk -> row map of the new chunks.
+        dimension (int): Embedding dimension.
+
+    Returns:
+        tuple: (embeddings, missing, stats). `embeddings` is the new chunk
+        matrix with reused rows filled in, `missing` a boolean mask of the
+        chunks still to be encoded, and `stats` counts reused, encoded and
+        removed rows.
+    """
+    chunk_rows = np.asarray(chunk_rows)
+    embeddings = np.zeros((len(chunk_rows), dimension), dtype=np.float32)
+    missing = np.ones(len(chunk_rows), dtype=bool)
+
+    old_rows = previous["rows"]
+    old_chunk_rows = np.asarray(previous["chunk_rows"])
+    old_counts = np.bincount(old_chunk_rows, minlength=len(old_rows["ids"]))
+    old_starts = np.cumsum(old_counts) - old_counts
+    old_position = {row_id: position for position, row_id in enumerate(old_rows["ids"])}
+
+    new_counts = np.bincount(chunk_rows, minlength=len(row_ids))
+    new_starts = np.cumsum(new_counts) - new_counts
+
+    reused = 0
+    for row, (row_id, row_hash) in enumerate(zip(row_ids, hashes)):
+        old = old_position.get(row_id)
+        if old is None or old_rows["hashes"][old] != row_hash or old_counts[old] != new_counts[row]:
+            continue
+        start, old_start, count = new_starts[row], old_starts[old], new_counts[row]
+        embeddings[start:start + count] = previous["embeddings"][old_start:old_start + count]
+        missing[start:start + count] = False
+        reused += 1
+
+    stats = {
+        "reused_rows": reused,
+        "encoded_rows": len(row_ids) - reused,
+        "removed_rows": len(set(old_rows["ids"]) - set(row_ids)),
+    }
+    return embeddings, missing, stats
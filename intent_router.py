@@ -0,0 +1,166 @@
+import re
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+import metrics
+from encoder import get_encoder
+from response_cache import normalize_query
+from config import ROUTER_ENABLED, ROUTER_MIN_SIMILARITY, ROUTER_MIN_MARGIN
+
+# Where a message goes: `modes` are the datasets to retrieve from ("career", "course", both or
+# none), and a canned `reply` (when set) answers it without the LLM. `query_vector` is the
+# message's unit embedding when routing had to compute it, so it is not encoded again.
+Route = namedtuple("Route", ["intent", "modes", "reply", "query_vector"], defaults=(None,))
+
+REMOVE_RESUME_PATTERN = re.compile(r"\bremove (?:my )?(?:resume|cv)\b", re.IGNORECASE)
+# Messages that are nothing but a greeting, a thank-you or a goodbye. A bare "ok" is not one
+# of them: it often answers the assistant's last question, so it goes to the LLM.
+GREETING_PATTERN = re.compile(r"^\W*(?:hi|hello|hey|hiya|good (?:morning|afternoon|evening))(?: there)?\W*$", re.IGNORECASE)
+THANKS_PATTERN = re.compile(
+    r"^\W*(?:(?:ok(?:ay)?|great|cool)\W*)?(?:thank(?:s| you)(?: so much| a lot| very much)?|thx|ty)\W*$", re.IGNORECASE,
+)
+GOODBYE_PATTERN = re.compile(
+    r"^\W*(?:(?:ok(?:ay)?|thanks?)\W*)?(?:bye|goodbye|bye bye|see you|see ya)(?: for now)?\W*$", re.IGNORECASE,
+)
+JOB_PATTERN = re.compile(
+    r"\b(?:jobs?|roles?|positions?|vacanc(?:y|ies)|hiring|openings?|careers?|employment|employers?|salar(?:y|ies)|"
+    r"internships?|compan(?:y|ies)|work as|mycareersfuture)\b",
+    re.IGNORECASE,
+)
+COURSE_PATTERN = re.compile(
+    r"\b(?:courses?|class(?:es)?|trainings?|learn(?:ing)?|upskill\w*|reskill\w*|certifications?|certificates?|"
+    r"diplomas?|workshops?|modules?|stud(?:y|ies)|skillsfuture)\b",
+    re.IGNORECASE,
+)
+RESUME_PATTERN = re.compile(r"\b(?:resume|cv|curriculum vitae|cover letter)\b", re.IGNORECASE)
+
+GREETING_REPLY = (
+    "Hi! I can recommend jobs from MyCareersFuture and courses from SkillsFuture, "
+    "or give feedback on your resume. What would you like to explore?"
+)
+THANKS_REPLY = "You're welcome! Let me know if you'd like more jobs, courses or resume tips."
+GOODBYE_REPLY = "Goodbye, and all the best with your career plans!"
+
+# Canned replies for small talk, tried in order: (pattern, intent, reply)
+SMALL_TALK = (
+    (GREETING_PATTERN, "greeting", GREETING_REPLY),
+    (THANKS_PATTERN, "thanks", THANKS_REPLY),
+    (GOODBYE_PATTERN, "goodbye", GOODBYE_REPLY),
+)
+
+# Example messages per intent; their mean embeddings route messages no keyword matched
+INTENT_EXAMPLES = {
+    "career": [
+        "What jobs can I apply for?",
+        "Find me openings for software engineers",
+        "Which companies are looking for accountants?",
+        "I want to work in marketing",
+        "Are there any part-time opportunities near Jurong?",
+    ],
+    "course": [
+        "What can I take to get better at Python?",
+        "Recommend something to improve my data analysis skills",
+        "I want to pick up digital marketing",
+        "Which programmes are funded for mid-career switchers?",
+        "How do I get qualified in project management?",
+    ],
+    "resume": [
+        "How can I make my resume stronger?",
+        "What should I add to my CV?",
+        "Is my experience section written well?",
+        "Give me feedback on my profile",
+        "How do I describe my achievements better?",
+    ],
+    "chat": [
+        "Who are you?",
+        "What can you do?",
+        "How are you today?",
+        "Tell me a joke",
+        "Nice to meet you",
+    ],
+}
+# Datasets retrieved for each intent found by keywords or centroids
+INTENT_MODES = {"career": ("career",), "course": ("course",), "both": ("career", "course"), "resume": (), "chat": ()}
+
+_centroids = None
+_centroids_lock = threading.Lock()
+
+
+# Unit mean embedding of each intent's examples, computed once
+def intent_centroids():
+    global _centroids
+    if _centroids is None:
+        with _centroids_lock:
+            if _centroids is None:
+                names = list(INTENT_EXAMPLES)
+                vectors = []
+                for name in names:
+                    embeddings = np.asarray(get_encoder().encode(INTENT_EXAMPLES[name], convert_to_tensor=False), dtype=np.float32)
+                    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-12
+                    centroid = embeddings.mean(axis=0)
+                    vectors.append(centroid / (np.linalg.norm(centroid) + 1e-12))
+                _centroids = (names, np.vstack(vectors))
+    return _centroids
+
+
+# Nearest intent by cosine similarity (None when it is not clearly ahead of the rest), and the
+# query's unit vector. The query is normalised as for the response cache, so the vector is reused.
+def nearest_intent(query):
+    names, centroids = intent_centroids()
+    vector = np.asarray(get_encoder().encode([normalize_query(query)], convert_to_tensor=False)[0], dtype=np.float32)
+    vector /= np.linalg.norm(vector) + 1e-12
+    similarities = centroids @ vector
+    order = np.argsort(-similarities)
+    best, runner_up = similarities[order[0]], similarities[order[1]]
+    if best < ROUTER_MIN_SIMILARITY or best - runner_up < ROUTER_MIN_MARGIN:
+        return None, vector
+    return names[order[0]], vector
+
+
+def route_query(query, mode_hint, enabled=ROUTER_ENABLED):
+    """
+    Decide which datasets a chat message needs, and whether it needs the LLM.
+
+    Keyword rules run first and cost microseconds; only messages they cannot
+    place are embedded and matched against the intent centroids. The UI's
+    mode is a hint, used when neither is confident.
+
+    Args:
+        query (str): The user's message.
+        mode_hint (str): Mode selected in the UI, "career" or "course".
+        enabled (bool): False always routes to `mode_hint`, as before routing.
+
+    Returns:
+        Route: The intent ("remove_resume", "greeting", "thanks", "goodbye",
+        "career", "course", "both", "resume", "chat" or "hint"), datasets to
+        retrieve from and an optional canned reply.
+    """
+    with metrics.timer("route"):
+        route = _route(query, mode_hint, enabled)
+    metrics.inc("jobot_route_total", intent=route.intent)
+    return route
+
+
+def _route(query, mode_hint, enabled):
+    hint_modes = (mode_hint,) if mode_hint in ("career", "course") else ()
+    if REMOVE_RESUME_PATTERN.search(query):
+        return Route("remove_resume", (), None)
+    if not enabled or not query.strip():
+        return Route("hint", hint_modes, None)
+    for pattern, intent, reply in SMALL_TALK:
+        if pattern.match(query):
+            return Route(intent, (), reply)
+
+    jobs, courses = bool(JOB_PATTERN.search(query)), bool(COURSE_PATTERN.search(query))
+    if jobs or courses:
+        intent = "both" if jobs and courses else "career" if jobs else "course"
+    elif RESUME_PATTERN.search(query):
+        intent = "resume"
+    else:
+        intent, vector = nearest_intent(query)
+        if intent is None:
+            return Route("hint", hint_modes, None, vector)
+        return Route(intent, INTENT_MODES[intent], None, vector)
+    return Route(intent, INTENT_MODES[intent], None)
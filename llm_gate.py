@@ -0,0 +1,68 @@
+import asyncio
+import contextlib
+
+from config import LLM_MAX_CONCURRENCY, LLM_MAX_QUEUE, LLM_QUEUE_TIMEOUT, LLM_SUMMARY_SLOTS
+
+
+class Overloaded(Exception):
+    """
+    Raised when a request cannot get an LLM slot and should be rejected.
+
+    Attributes:
+        status (int): HTTP status to answer with (429 when the queue is full,
+            503 when the wait timed out).
+    """
+
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+class LLMGate:
+    """
+    Bounded concurrency in front of the Ollama backend.
+
+    At most `max_concurrency` generations run at once and at most `max_queue`
+    requests wait for a slot. Anything beyond that is rejected immediately
+    instead of piling up on the Ollama server. By default the slots taken by
+    the background conversation summaries (LLM_SUMMARY_SLOTS) are left out,
+    so together they stay within LLM_MAX_CONCURRENCY.
+    """
+
+    def __init__(self, max_concurrency=max(LLM_MAX_CONCURRENCY - LLM_SUMMARY_SLOTS, 1), max_queue=LLM_MAX_QUEUE, queue_timeout=LLM_QUEUE_TIMEOUT):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    # Reject right away when every slot is busy and the queue is full, without taking a slot.
+    # Requests count as waiting from the moment they pass the check (before their first await),
+    # so a burst arriving in one event loop tick cannot overrun the queue.
+    def check(self):
+        if self.active + self.waiting >= self.max_concurrency + self.max_queue:
+            raise Overloaded("Too many requests are waiting for the language model.", 429)
+
+    async def acquire(self):
+        self.check()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise Overloaded("Timed out waiting for the language model.", 503)
+        finally:
+            self.waiting -= 1
+        self.active += 1
+
+    def release(self):
+        self.active -= 1
+        self._semaphore.release()
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
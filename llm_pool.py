@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import threading
+import time
+
+import httpx
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_ollama import OllamaLLM
+from ollama import ResponseError
+
+import metrics
+
+from config import MODEL, OLLAMA_BASE_URL, OLLAMA_KEEP_ALIVE, OLLAMA_TIMEOUT, OLLAMA_MAX_CONNECTIONS, OLLAMA_NUM_CTX
+from config import OLLAMA_RETRIES, OLLAMA_RETRY_BACKOFF
+
+# Shared OllamaLLM instances keyed by model name. Each one owns an httpx client,
+# so reusing it keeps the HTTP connections to Ollama alive between requests.
+_llms = {}
+_llms_lock = threading.Lock()
+
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """
+    LangChain callback measuring every Ollama call, streamed or not.
+
+    Time to first token is taken from the first non-empty token; generation
+    speed and token counts come from the eval_count, eval_duration and
+    prompt_eval_count Ollama reports with its final chunk.
+    """
+
+    # Called in the caller's thread or task, so timings reach the right request
+    run_inline = True
+
+    def __init__(self):
+        self._started = {}
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        started = self._started.get(run_id)
+        if started is not None and token:
+            del self._started[run_id]
+            seconds = time.perf_counter() - started
+            metrics.observe("jobot_llm_time_to_first_token_seconds", seconds)
+            metrics.add_timing("llm_first_token", seconds)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._started.pop(run_id, None)
+        generations = response.generations[0] if response.generations else []
+        info = (generations[0].generation_info if generations else None) or {}
+        generated, duration = info.get("eval_count"), info.get("eval_duration")
+        if info.get("prompt_eval_count"):
+            metrics.inc("jobot_llm_prompt_tokens_total", info["prompt_eval_count"])
+        if generated:
+            metrics.inc("jobot_llm_generated_tokens_total", generated)
+            if duration:
+                metrics.observe("jobot_llm_tokens_per_second", generated / (duration / 1e9))
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._started.pop(run_id, None)
+        metrics.inc("jobot_llm_errors_total")
+
+
+def get_llm(model_name=MODEL):
+    """
+    Return the shared OllamaLLM for a model, creating it on first use.
+
+    Args:
+        model_name (str): Ollama model tag, e.g. "qwen2.5:3b".
+
+    Returns:
+        OllamaLLM: A client configured with the pool's timeout, connection
+        limits, keep_alive and context window, reporting to `metrics`.
+    """
+    llm = _llms.get(model_name)
+    if llm is None:
+        with _llms_lock:
+            llm = _llms.get(model_name)
+            if llm is None:
+                limits = httpx.Limits(
+                    max_connections=OLLAMA_MAX_CONNECTIONS,
+                    max_keepalive_connections=OLLAMA_MAX_CONNECTIONS,
+                    keepalive_expiry=60,  # httpx closes idle connections after 5s by default
+                )
+                llm = OllamaLLM(
+                    model=model_name,
+                    base_url=OLLAMA_BASE_URL,
+                    keep_alive=OLLAMA_KEEP_ALIVE,
+                    num_ctx=OLLAMA_NUM_CTX,
+                    client_kwargs={"timeout": OLLAMA_TIMEOUT, "limits": limits},
+                    callbacks=[LLMMetricsHandler()] if metrics.enabled() else None,
+                )
+                _llms[model_name] = llm
+    return llm
+
+
+# Connection problems and server-side errors are worth retrying; bad requests are not
+def is_retryable(error):
+    if isinstance(error, ResponseError):
+        return error.status_code >= 500
+    return isinstance(error, (ConnectionError, httpx.TransportError))
+
+
+def backoff_delay(attempt):
+    return OLLAMA_RETRY_BACKOFF * (2 ** attempt)
+
+
+def invoke(prompt, model_name=MODEL, retries=OLLAMA_RETRIES):
+    for attempt in range(retries + 1):
+        try:
+            with metrics.timer("llm"):
+                return get_llm(model_name).invoke(prompt)
+        except Exception as e:
+            if attempt == retries or not is_retryable(e):
+                raise
+            logging.warning(f"Ollama call failed ({e}), retrying in {backoff_delay(attempt):.1f}s")
+            time.sleep(backoff_delay(attempt))
+
+
+async def ainvoke(prompt, model_name=MODEL, retries=OLLAMA_RETRIES):
+    for attempt in range(retries + 1):
+        try:
+            with metrics.timer("llm"):
+                return await get_llm(model_name).ainvoke(prompt)
+        except Exception as e:
+            if attempt == retries or not is_retryable(e):
+                raise
+            logging.warning(f"Ollama call failed ({e}), retrying in {backoff_delay(attempt):.1f}s")
+            await asyncio.sleep(backoff_delay(attempt))
+
+
+# Streams are only retried until the first token arrives, so no text is ever repeated.
+# The "llm" stage of a stream lasts until its last token, retries included.
+def stream(prompt, model_name=MODEL, retries=OLLAMA_RETRIES):
+    with metrics.timer("llm"):
+        for attempt in range(retries + 1):
+            started = False
+            try:
+                for token in get_llm(model_name).stream(prompt):
+                    started = True
+                    yield token
+                return
+            except Exception as e:
+                if started or attempt == retries or not is_retryable(e):
+                    raise
+                logging.warning(f"Ollama stream failed ({e}), retrying in {backoff_delay(attempt):.1f}s")
+                time.sleep(backoff_delay(attempt))
+
+
+async def astream(prompt, model_name=MODEL, retries=OLLAMA_RETRIES):
+    with metrics.timer("llm"):
+        for attempt in range(retries + 1):
+            started = False
+            try:
+                async for token in get_llm(model_name).astream(prompt):
+                    started = True
+                    yield token
+                return
+            except Exception as e:
+                if started or attempt == retries or not is_retryable(e):
+                    raise
+                logging.warning(f"Ollama stream failed ({e}), retrying in {backoff_delay(attempt):.1f}s")
+                await asyncio.sleep(backoff_delay(attempt))
@@ -1,306 +1,1028 @@
+import json
+import logging
 import os
-import pandas as pd
-from sentence_transformers import SentenceTransformer
+import threading
 import faiss
 import numpy as np
-from langchain_ollama import OllamaLLM
-from sklearn.metrics.pairwise import cosine_similarity
-import re
+
+import index_store
+import metrics
+from bm25_index import BM25Index
+from search_filters import row_mask
+import llm_pool
+from response_cache import SemanticCache, normalize_query, text_fingerprint
+from record_index import RecordIndex, build_record_ids
+from index_update import row_hashes, reuse_embeddings
+from data_store import load_dataset
+from resume_store import ResumeRecord
+from encoder import get_encoder
+from CV_parser import split_sections
+from prompt_builder import build_prompt
+from conversation_memory import ConversationMemory
+from intent_router import route_query
+from skill_graph import SkillGraph, graph_key, row_vectors
 
 # Disable parallelism for tokenizers
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
 # Model configuration
-from config import MODEL
+from config import MODEL, EMBEDDING_MODEL, EMBEDDING_BATCH_SIZE, MMR_FETCH_K, MMR_LAMBDA, ROW_AGGREGATION
+from config import FAISS_INDEX_PARAMS, FAISS_NPROBE, FAISS_EF_SEARCH, RESPONSE_CACHE_ENABLED, RESUME_QUERY_WEIGHT, RRF_K
+from config import HYBRID_FUSION, HYBRID_SPARSE_WEIGHT, BM25_FETCH_K, FILTER_EXACT_MAX
 
 # Define file paths for the CSV datasets
 CAREERS_CSV_PATH = "dataset/mycareersfuture_jobs.csv"
 SKILLS_CSV_PATH = "dataset/skillsfuture_courses.csv"
 
-# Load data from CSV files
-def load_csv_data(csv_path):
-    return pd.read_csv(csv_path)
+# Columns combined into the text that gets embedded
+careers_text_columns = ["Job Title", "Company", "Location", "Employment Type", "Salary", "Job Description"]
+skills_text_columns = ["Institution", "Course Title", "Upcoming Date", "Duration", "Training Mode", "Full Fee", "Funded Fee", "About This Course"]
+
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+
+# Datasets keyed by chat mode, with the columns stored as categoricals, the dollar and
+# date columns parsed into typed ones at load time, and the metadata filters they support
+# (filter name -> (column, operator), see search_filters.row_mask)
+DATASETS = {
+    "career": {
+        "name": "careers",
+        "csv_path": CAREERS_CSV_PATH,
+        "text_columns": careers_text_columns,
+        "title_column": "Job Title",
+        "category_columns": ["Company", "Location", "Employment Type"],
+        "money_columns": {"Salary": ["Salary Min", "Salary Max"]},
+        "date_columns": {},
+        "filter_columns": {
+            "min_salary": ("Salary Max", "min"),
+            "max_salary": ("Salary Min", "max"),
+            "location": ("Location", "in"),
+            "employment_type": ("Employment Type", "contains"),
+            "company": ("Company", "in"),
+        },
+    },
+    "course": {
+        "name": "skills",
+        "csv_path": SKILLS_CSV_PATH,
+        "text_columns": skills_text_columns,
+        "title_column": "Course Title",
+        "category_columns": ["Institution", "Training Mode", "Duration"],
+        "money_columns": {"Full Fee": ["Full Fee Amount"], "Funded Fee": ["Funded Fee Amount"]},
+        "date_columns": {"Upcoming Date": ["Upcoming Date Value", "%d %b %y"]},
+        "filter_columns": {
+            "max_fee": ("Full Fee Amount", "max"),
+            "max_funded_fee": ("Funded Fee Amount", "max"),
+            "training_mode": ("Training Mode", "contains"),
+            "duration": ("Duration", "in"),
+            "institution": ("Institution", "in"),
+            "start_after": ("Upcoming Date Value", "min"),
+            "start_before": ("Upcoming Date Value", "max"),
+        },
+    },
+}
+
+# The CSV's own columns, without the typed money and date columns added by load_dataset
+def source_columns(spec, data):
+    derived = {column for targets in spec["money_columns"].values() for column in targets}
+    derived.update(target for target, _ in spec["date_columns"].values())
+    return [column for column in data.columns if column not in derived]
 
 # Extract text for embeddings
 def extract_text_from_csv(data, text_columns):
-    combined_text = data[text_columns].fillna(" ").apply(" ".join, axis=1)
+    combined_text = data[text_columns].astype(object).fillna(" ").apply(" ".join, axis=1)
     return combined_text.tolist()
 
 # Chunk the text for efficient retrieval
-def chunk_text(text_list, chunk_size=1000, overlap=200):
+def chunk_text(text_list, chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP):
+    chunks, _ = chunk_text_with_rows(text_list, chunk_size, overlap)
+    return chunks
+
+# Chunk the text and record which row every chunk came from
+def chunk_text_with_rows(text_list, chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP):
     chunks = []
-    for text in text_list:
+    chunk_rows = []
+    for row, text in enumerate(text_list):
         for i in range(0, len(text), chunk_size - overlap):
             chunks.append(text[i:i + chunk_size])
-    return chunks
+            chunk_rows.append(row)
+    return chunks, np.array(chunk_rows, dtype=np.int32)
 
 # Create embeddings using SentenceTransformer
-def create_embeddings(chunks):
-    model = SentenceTransformer("all-MiniLM-L6-v2")
-    embeddings = model.encode(chunks, convert_to_tensor=False)
-    return np.array(embeddings)
-
-# Build FAISS index
-def build_faiss_index(embeddings):
-    dimension = embeddings.shape[1]
-    index = faiss.IndexFlatL2(dimension)
+# Chunks are encoded longest first so every batch holds similar lengths and little padding
+def create_embeddings(chunks, batch_size=EMBEDDING_BATCH_SIZE):
+    model = get_encoder()
+    order = length_order(chunks)
+    embeddings = np.empty((len(chunks), model.get_sentence_embedding_dimension()), dtype=np.float32)
+    if len(chunks):
+        embeddings[order] = model.encode([chunks[i] for i in order], batch_size=batch_size, convert_to_tensor=False)
+    return embeddings
+
+# Chunk positions sorted by decreasing text length
+def length_order(chunks):
+    return np.argsort([-len(chunk) for chunk in chunks], kind="stable")
+
+def build_faiss_index(embeddings, index_type="flat", metric="l2", nlist=None, hnsw_m=32, ef_construction=200, pq_m=48, pq_nbits=8, trained=None):
+    """
+    Build a FAISS index over the chunk embeddings.
+
+    Args:
+        embeddings (np.ndarray): Chunk embedding matrix, shape (n, d).
+        index_type (str): "flat" (exact scan), "hnsw", "ivf_flat" or "ivf_pq".
+        metric (str): "l2", or "cosine" to normalise vectors and use inner product.
+        nlist (int): Number of IVF centroids; defaults to about 4 * sqrt(n).
+        hnsw_m (int): Neighbours per HNSW node.
+        ef_construction (int): HNSW candidate list size while building.
+        pq_m (int): Sub-quantizers per vector for IVF-PQ; lowered to the nearest divisor of d.
+        pq_nbits (int): Bits per sub-quantizer code for IVF-PQ.
+        trained (faiss.Index): A previous IVF index with the same settings whose
+            training (centroids, PQ codebooks) is reused instead of retraining.
+
+    Returns:
+        faiss.Index: The trained and populated index.
+    """
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    n, dimension = embeddings.shape
+    if metric == "cosine":
+        embeddings = normalize_rows(embeddings)
+        faiss_metric = faiss.METRIC_INNER_PRODUCT
+    elif metric == "l2":
+        faiss_metric = faiss.METRIC_L2
+    else:
+        raise ValueError(f"Unknown FAISS metric: {metric}")
+
+    if index_type == "flat":
+        index = faiss.IndexFlat(dimension, faiss_metric)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, hnsw_m, faiss_metric)
+        index.hnsw.efConstruction = ef_construction
+    elif index_type in ("ivf_flat", "ivf_pq") and isinstance(trained, faiss.IndexIVF) and trained.d == dimension:
+        index = faiss.clone_index(trained)
+        index.reset()
+    elif index_type in ("ivf_flat", "ivf_pq"):
+        # k-means wants roughly 39 training points per centroid, for the IVF lists and for
+        # the 2^pq_nbits centroids of each PQ sub-quantizer alike
+        nlist = nlist or int(4 * np.sqrt(n))
+        nlist = max(1, min(nlist, n // 39))
+        quantizer = faiss.IndexFlat(dimension, faiss_metric)
+        if index_type == "ivf_flat":
+            index = faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss_metric)
+        else:
+            pq_m = max(m for m in range(1, pq_m + 1) if dimension % m == 0)
+            pq_nbits = max(1, min(pq_nbits, int(np.log2(max(n // 39, 2)))))
+            index = faiss.IndexIVFPQ(quantizer, dimension, nlist, pq_m, pq_nbits, faiss_metric)
+        index.train(embeddings)
+    else:
+        raise ValueError(f"Unknown FAISS index type: {index_type}")
+
     index.add(embeddings)
     return index
 
+# Apply the search-time knobs of the approximate index types
+def configure_faiss_search(index, nprobe=FAISS_NPROBE, ef_search=FAISS_EF_SEARCH):
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = ef_search
+    else:
+        try:
+            faiss.extract_index_ivf(index).nprobe = nprobe
+        except RuntimeError:
+            pass  # Not an IVF index, nothing to tune
+    return index
+
+# Search parameters restricting a search to the chunks set in a boolean mask, keeping the
+# index's nprobe/efSearch. The packed bitmap is returned too and must outlive the search.
+def faiss_search_parameters(index, chunk_mask):
+    bitmap = np.packbits(chunk_mask, bitorder="little")
+    selector = faiss.IDSelectorBitmap(len(chunk_mask), faiss.swig_ptr(bitmap))
+    if isinstance(index, faiss.IndexHNSW):
+        params = faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+    elif isinstance(index, faiss.IndexIVF):
+        params = faiss.SearchParametersIVF(sel=selector, nprobe=index.nprobe)
+    else:
+        params = faiss.SearchParameters(sel=selector)
+    return params, bitmap
+
+# Prepare query embeddings for an index, normalising them for cosine indexes
+def faiss_query(index, query_embedding):
+    query_embedding = np.ascontiguousarray(np.atleast_2d(query_embedding), dtype=np.float32)
+    if index.metric_type == faiss.METRIC_INNER_PRODUCT:
+        return normalize_rows(query_embedding)
+    return query_embedding
+
+# Scale rows to unit length so dot products are cosine similarities
+def normalize_rows(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+# Fetch the stored vectors of the given chunk ids from the embedding matrix, or from the index itself
+def candidate_vectors(ids, faiss_index, embeddings=None):
+    if embeddings is not None:
+        return np.asarray(embeddings[ids], dtype=np.float32)
+    return faiss_index.reconstruct_batch(np.asarray(ids, dtype=np.int64))
+
+def mmr_select(query_vector, vectors, k, lambda_mult=MMR_LAMBDA, relevance=None):
+    """
+    Pick k items by Maximal Marginal Relevance.
+
+    Each step takes the candidate maximising
+    `lambda * sim(query, c) - (1 - lambda) * max(sim(c, selected))`.
+    All similarities come from one matrix product; the loop only updates a
+    running maximum per candidate.
+
+    Args:
+        query_vector (np.ndarray): Query embedding, shape (d,).
+        vectors (np.ndarray): Candidate embeddings, shape (n, d).
+        k (int): Number of items to select.
+        lambda_mult (float): 1.0 ranks purely by relevance, 0.0 purely by diversity.
+        relevance (np.ndarray): Precomputed relevance per candidate; defaults
+            to the cosine similarity with `query_vector`.
+
+    Returns:
+        list[int]: Positions into `vectors`, in selection order.
+    """
+    vectors = normalize_rows(vectors)
+    query_vector = normalize_rows(np.atleast_2d(query_vector))[0]
+    if relevance is None:
+        relevance = vectors @ query_vector
+    similarity = vectors @ vectors.T
+
+    k = min(k, len(vectors))
+    selected = []
+    max_similarity = np.full(len(vectors), -np.inf, dtype=np.float32)
+    available = np.ones(len(vectors), dtype=bool)
+    for _ in range(k):
+        if selected:
+            scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        else:
+            scores = relevance.copy()
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(max_similarity, similarity[best], out=max_similarity)
+    return selected
+
 # Search FAISS index with relevance and diversity
-def search_faiss_index(query, faiss_index, chunks, model, k=5, diversity_threshold=0.8):
+def search_faiss_index(query, faiss_index, chunks, model=None, k=5, fetch_k=MMR_FETCH_K, lambda_mult=MMR_LAMBDA, embeddings=None):
+    model = model or get_encoder()
     query_embedding = model.encode([query], convert_to_tensor=False)
-    D, I = faiss_index.search(np.array(query_embedding), k * 2)
-
-    selected_chunks = []
-    selected_indices = []
-    selected_embeddings = []
-
-    for idx in I[0]:
-        if len(selected_chunks) >= k:
-            break
-        chunk = chunks[idx]
-        chunk_embedding = model.encode([chunk], convert_to_tensor=False)
-        if all(cosine_similarity(
-            np.atleast_2d(chunk_embedding), 
-            np.atleast_2d(e))[0][0] < diversity_threshold for e in selected_embeddings):
-            selected_chunks.append(chunk)
-            selected_indices.append(idx)
-            selected_embeddings.append(chunk_embedding)
-
-    if len(selected_chunks) < k:
-        for idx in I[0][len(selected_chunks):k]:
-            selected_chunks.append(chunks[idx])
-            selected_indices.append(idx)
+    D, I = faiss_index.search(faiss_query(faiss_index, query_embedding), max(fetch_k, k))
+
+    candidate_ids = I[0][I[0] >= 0]
+    if len(candidate_ids) == 0:
+        return [], []
 
+    vectors = candidate_vectors(candidate_ids, faiss_index, embeddings)
+    order = mmr_select(query_embedding[0], vectors, k, lambda_mult)
+
+    selected_indices = [int(candidate_ids[i]) for i in order]
+    selected_chunks = [chunks[idx] for idx in selected_indices]
     return selected_chunks, selected_indices
 
-# Load datasets
-careers_data = load_csv_data(CAREERS_CSV_PATH)
-skills_data = load_csv_data(SKILLS_CSV_PATH)
 
-# Extract and process text for embeddings
-careers_text_columns = ["Job Title", "Company", "Location", "Employment Type", "Salary"]
-skills_text_columns = ["Institution", "Course Title", "Upcoming Date", "Duration", "Training Mode", "Full Fee", "Funded Fee"]
+# Build the row -> chunk span table: the chunks of row r are starts[r]:starts[r] + counts[r]
+def build_row_spans(chunk_rows, n_rows):
+    counts = np.bincount(chunk_rows, minlength=n_rows).astype(np.int32)
+    starts = (np.cumsum(counts) - counts).astype(np.int32)
+    return starts, counts
 
-careers_text = extract_text_from_csv(careers_data, careers_text_columns)
-skills_text = extract_text_from_csv(skills_data, skills_text_columns)
-
-careers_chunks = chunk_text(careers_text)
-skills_chunks = chunk_text(skills_text)
+def aggregate_chunk_scores(chunk_ids, scores, chunk_rows, how=ROW_AGGREGATION):
+    """
+    Collapse chunk-level scores into one score per dataset row.
 
-careers_embeddings = create_embeddings(careers_chunks)
-skills_embeddings = create_embeddings(skills_chunks)
-
-careers_faiss_index = build_faiss_index(careers_embeddings)
-skills_faiss_index = build_faiss_index(skills_embeddings)
-
-print("Data processing and FAISS index creation complete.")
+    Args:
+        chunk_ids (np.ndarray): Retrieved chunk ids.
+        scores (np.ndarray): Similarity of each retrieved chunk (higher is better).
+        chunk_rows (np.ndarray): Chunk -> row map of the corpus.
+        how (str): "max" keeps the best chunk per row, "sum" adds them up.
 
-## FEW SHOT PROMPTING
-
-few_shot_examples = """
-Example 1:
-User's Question: "What are some courses that can help me upskill in data analysis?"
-Response: 
-Here are some courses that might help you upskill in data analysis:
-1. **Advanced Data Analytics with Python**
-   - **Institution**: SkillsFuture Academy
-   - *Learn advanced Python techniques focusing on big data and visualization.*
-2. **Introduction to Data Analytics**
-   - **Institution**: DataTech Institute
-   - *A beginner-friendly course covering key concepts in data analysis and reporting.*
-3. **Data Visualization and Reporting with Tableau**
-   - **Institution**: AnalyticsEdge
-   - *Master the art of data storytelling by learning Tableau for creating impactful dashboards and visualizations.*
+    Returns:
+        tuple: (rows, row_scores, best_chunk_ids) for each distinct row.
+    """
+    rows = np.asarray(chunk_rows)[chunk_ids]
+    unique_rows, inverse = np.unique(rows, return_inverse=True)
+    if how == "max":
+        row_scores = np.full(len(unique_rows), -np.inf, dtype=np.float32)
+        np.maximum.at(row_scores, inverse, scores)
+    elif how == "sum":
+        row_scores = np.zeros(len(unique_rows), dtype=np.float32)
+        np.add.at(row_scores, inverse, scores)
+    else:
+        raise ValueError(f"Unknown row aggregation: {how}")
 
-Do any of these courses align with your goals, or would you like to explore other areas?
+    # The highest scoring chunk stands in for its row during diversity reranking
+    order = np.argsort(-scores, kind="stable")
+    _, first = np.unique(rows[order], return_index=True)
+    best_chunk_ids = np.asarray(chunk_ids)[order[first]]
+    return unique_rows, row_scores, best_chunk_ids
 
----
+def hybrid_chunk_scores(chunk_ids, dense_scores, sparse_ids, sparse_scores, query_vector, corpus, fusion=HYBRID_FUSION, sparse_weight=HYBRID_SPARSE_WEIGHT):
+    """
+    Fuse dense (FAISS) and sparse (BM25) chunk results into one candidate list.
 
-Example 2:
-User's Question: "What are some job opportunities for software developers?"
-Response: 
-Here are the job opportunities you might be interested in:
-1. **Full-Stack Developer**
-   - **Company**: XYZ Tech  
-   - *Develop web applications and collaborate with cross-functional teams.*
-2. **Mobile App Developer**
-   - **Company**: ABC Innovations  
-   - *Create and optimize mobile applications for Android and iOS platforms.*
-3. **Backend Engineer**
-   - **Company**: CloudWorks Solutions  
-   - *Focus on server-side architecture, API development, and database management to support scalable applications.*
+    Args:
+        chunk_ids (np.ndarray): Dense candidates.
+        dense_scores (np.ndarray): Cosine similarity of each dense candidate.
+        sparse_ids (np.ndarray): BM25 candidates, best first.
+        sparse_scores (np.ndarray): BM25 score of each sparse candidate.
+        query_vector (np.ndarray): Unit query vector, to score sparse-only candidates densely.
+        corpus (Corpus): The searched corpus.
+        fusion (str): "rrf" or "weighted".
+        sparse_weight (float): Share of the BM25 score with "weighted" fusion.
 
-Do these roles align with your career goals, or would you like me to refine the suggestions?
+    Returns:
+        tuple: (chunk_ids, scores) over the union of both candidate lists,
+        scores scaled so the best is about 1.
+    """
+    extra = np.setdiff1d(sparse_ids, chunk_ids)
+    all_ids = np.concatenate([chunk_ids, extra])
+    sparse_of = dict(zip(sparse_ids.tolist(), range(len(sparse_ids))))
+    sparse_position = np.array([sparse_of.get(c, -1) for c in all_ids.tolist()])
 
----
+    if fusion == "rrf":
+        dense_rank = np.full(len(all_ids), -1)
+        dense_rank[np.argsort(-dense_scores, kind="stable")] = np.arange(len(chunk_ids))
+        scores = np.where(dense_rank >= 0, 1.0 / (RRF_K + dense_rank + 1), 0.0)
+        scores += np.where(sparse_position >= 0, 1.0 / (RRF_K + sparse_position + 1), 0.0)
+        return all_ids, (scores / scores.max()).astype(np.float32)
+    if fusion == "weighted":
+        extra_scores = normalize_rows(candidate_vectors(extra, corpus.faiss_index, corpus.embeddings)) @ query_vector if len(extra) else []
+        dense = np.concatenate([dense_scores, extra_scores]).astype(np.float32)
+        sparse = np.where(sparse_position >= 0, sparse_scores[sparse_position] / sparse_scores.max(), 0.0)
+        return all_ids, ((1 - sparse_weight) * dense + sparse_weight * sparse).astype(np.float32)
+    raise ValueError(f"Unknown hybrid fusion: {fusion}")
 
-Example 3:
-User's Question: "How can I improve my resume to align with the Full-Stack Developer position at XYZ Tech?"
-Response: 
-To align your resume with the **Full-Stack Developer** role at **XYZ Tech**, consider the following improvements:
-1. **Highlight Relevant Technical Skills**:
-   - Emphasize skills like **JavaScript**, **React**, **Node.js**, and **REST APIs**, as they are commonly required for full-stack development.
-2. **Showcase Project Experience**:
-   - Include projects where you developed full-stack applications, focusing on the technologies and frameworks used, as well as the impact of your work.
-3. **Add Metrics to Achievements**:
-   - Quantify your accomplishments, e.g., "Developed a web application that increased client engagement by 30%."
-4. **Include Collaborative Experience**:
-   - Highlight any experience working in cross-functional teams, as collaboration is key in full-stack development roles.
+# Score the distinct dataset rows closest to a query vector, best first, aggregating chunk scores per row.
+# With `query_text` and a BM25 index on the corpus, exact term matches are fused into the candidates.
+# With `chunk_mask`, only the chunks it selects are searched (filtering happens inside the search).
+def score_rows(query_embedding, corpus, fetch_k=MMR_FETCH_K, aggregate=ROW_AGGREGATION, query_text=None, chunk_mask=None):
+    query_embedding = np.atleast_2d(np.asarray(query_embedding, dtype=np.float32))
+    query_vector = normalize_rows(query_embedding)[0]
+    empty = np.zeros(0, dtype=np.int64)
 
-Let me know if you'd like help crafting a tailored resume summary or refining specific sections!
+    allowed = corpus.faiss_index.ntotal if chunk_mask is None else int(chunk_mask.sum())
+    if allowed == 0:
+        return empty, np.zeros(0, dtype=np.float32), empty
 
----
-Example 4:
-User's Question: "How can I improve my resume to align with the Junior Retail Associate position at RECRUIT NOW SINGAPORE PTE. LTD.?"
-Response: 
-To align your resume with the **Junior Retail Associate** role at **RECRUIT NOW SINGAPORE PTE. LTD.**, consider the following improvements:
+    if chunk_mask is not None and allowed <= FILTER_EXACT_MAX:
+        # Few chunks pass the filter: scoring them all is exact and cheaper than a graph/IVF walk
+        chunk_ids = np.flatnonzero(chunk_mask)
+        vectors = candidate_vectors(chunk_ids, corpus.faiss_index, corpus.embeddings)
+    else:
+        params, bitmap = faiss_search_parameters(corpus.faiss_index, chunk_mask) if chunk_mask is not None else (None, None)
+        # Widen the chunk search until it covers enough distinct rows
+        fetch = fetch_k
+        while True:
+            D, I = corpus.faiss_index.search(faiss_query(corpus.faiss_index, query_embedding), min(fetch, allowed), params=params)
+            chunk_ids = I[0][I[0] >= 0]
+            distinct = len(np.unique(np.asarray(corpus.chunk_rows)[chunk_ids]))
+            if distinct >= fetch_k or fetch >= allowed:
+                break
+            fetch *= 4
+        if len(chunk_ids) == 0:
+            return empty, np.zeros(0, dtype=np.float32), empty
+        vectors = candidate_vectors(chunk_ids, corpus.faiss_index, corpus.embeddings)
 
-1. **Emphasize Retail Experience**:
-   - Highlight any roles involving cash handling, customer service, or sales. For example: 
-     *"Managed cash transactions and provided excellent customer service at NTUC FairPrice, increasing customer satisfaction ratings by 15%."*
+    scores = normalize_rows(vectors) @ query_vector
+    if query_text and HYBRID_FUSION != "dense" and corpus.bm25 is not None:
+        sparse_ids, sparse_scores = corpus.bm25.search(query_text, BM25_FETCH_K, chunk_mask)
+        if len(sparse_ids):
+            chunk_ids, scores = hybrid_chunk_scores(chunk_ids, scores, sparse_ids, sparse_scores, query_vector, corpus)
+    rows, row_scores, best_chunk_ids = aggregate_chunk_scores(chunk_ids, scores, corpus.chunk_rows, aggregate)
+    top = np.argsort(-row_scores, kind="stable")[:fetch_k]
+    return rows[top], row_scores[top], best_chunk_ids[top]
 
-2. **Add Relevant Skills**:
-   - Include skills like **Point-of-Sale (POS) systems**, **inventory management**, and **team collaboration** to align with the role's requirements.
+# Rerank scored rows for diversity using their representative chunks
+def rerank_rows(query_vector, corpus, rows, row_scores, best_chunk_ids, k, lambda_mult=MMR_LAMBDA):
+    if len(rows) == 0:
+        return [], []
+    row_vectors = candidate_vectors(best_chunk_ids, corpus.faiss_index, corpus.embeddings)
+    order = mmr_select(query_vector, row_vectors, k, lambda_mult, relevance=row_scores)
+    return [int(r) for r in rows[order]], [float(s) for s in row_scores[order]]
 
-3. **Quantify Achievements**:
-   - Add metrics to demonstrate your impact, e.g.: *"Reduced inventory discrepancies by 10% through improved stock management techniques."*
+# Search for distinct dataset rows, aggregating chunk scores per row before the MMR rerank.
+# Pass `query_embedding` to search with a precomputed vector instead of encoding `query`,
+# and `filters` (see Corpus.chunk_mask) to only return rows matching metadata filters.
+def search_rows(query, corpus, model=None, k=5, fetch_k=MMR_FETCH_K, lambda_mult=MMR_LAMBDA, aggregate=ROW_AGGREGATION, query_embedding=None, filters=None):
+    if query_embedding is None:
+        model = model or get_encoder()
+        query_embedding = model.encode([query], convert_to_tensor=False)
+    query_embedding = np.atleast_2d(np.asarray(query_embedding, dtype=np.float32))
+    with metrics.timer("search"):
+        chunk_mask = corpus.chunk_mask(filters)
+        rows, row_scores, best_chunk_ids = score_rows(query_embedding, corpus, max(fetch_k, k), aggregate, query_text=query, chunk_mask=chunk_mask)
+    with metrics.timer("mmr"):
+        return rerank_rows(normalize_rows(query_embedding)[0], corpus, rows, row_scores, best_chunk_ids, k, lambda_mult)
 
-4. **Restructure for Clarity**:
-   - Use a "Skills" section at the top of your resume to immediately highlight relevant qualifications for retail roles.
+def fuse_rankings(rankings, rrf_k=RRF_K):
+    """
+    Merge several ranked row lists with reciprocal rank fusion.
 
-Would you like help refining these sections or drafting a tailored summary for this role?
+    Args:
+        rankings (list[tuple]): (rows, best_chunk_ids) per query vector, best first.
+        rrf_k (int): Damping constant; larger values flatten the rank weights.
 
----
-"""
+    Returns:
+        tuple: (rows, fused_scores, best_chunk_ids), best first.
+    """
+    fused = {}
+    representative = {}
+    for rows, best_chunk_ids in rankings:
+        for rank, (row, chunk_id) in enumerate(zip(rows, best_chunk_ids)):
+            fused[int(row)] = fused.get(int(row), 0.0) + 1.0 / (rrf_k + rank + 1)
+            representative.setdefault(int(row), int(chunk_id))
+    order = sorted(fused, key=fused.get, reverse=True)
+    return (
+        np.array(order, dtype=np.int64),
+        np.array([fused[row] for row in order], dtype=np.float32),
+        np.array([representative[row] for row in order], dtype=np.int64),
+    )
 
+# Search with several query vectors (e.g. one per resume section), fusing their row rankings
+# with RRF before the MMR rerank against the first (primary) vector. `query_text` feeds BM25.
+def search_rows_fused(query_embeddings, corpus, k=5, fetch_k=MMR_FETCH_K, lambda_mult=MMR_LAMBDA, aggregate=ROW_AGGREGATION, rrf_k=RRF_K, query_text="", filters=None):
+    query_embeddings = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+    if len(query_embeddings) == 1:
+        return search_rows(query_text, corpus, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult, aggregate=aggregate, query_embedding=query_embeddings, filters=filters)
+    with metrics.timer("search"):
+        chunk_mask = corpus.chunk_mask(filters)
+        rankings = []
+        for query_embedding in query_embeddings:
+            rows, _, best_chunk_ids = score_rows(query_embedding, corpus, max(fetch_k, k), aggregate, query_text=query_text, chunk_mask=chunk_mask)
+            rankings.append((rows, best_chunk_ids))
+        rows, fused_scores, best_chunk_ids = fuse_rankings(rankings, rrf_k)
+    top = slice(0, max(fetch_k, k))
+    # Scale fused scores to [0, 1] so they weigh against diversity like similarities do
+    relevance = fused_scores[top] / fused_scores[0] if len(fused_scores) else fused_scores
+    query_vector = normalize_rows(query_embeddings[:1])[0]
+    with metrics.timer("mmr"):
+        return rerank_rows(query_vector, corpus, rows[top], relevance, best_chunk_ids[top], k, lambda_mult)
 
+class Corpus:
+    """
+    A dataset together with its chunks, embeddings, FAISS index and BM25 index.
 
-# CO-STAR Framework with Few-Shot Prompting
-context = """
-You are an AI assistant designed to answer questions specifically about job opportunities from MyCareersFuture and courses from SkillsFuture. Your primary goal is to directly answer the user's question based on the context of their query and the datasets provided. You must strictly adhere to the type of information requested—if the user asks for jobs, only provide job-related recommendations; if the user asks for courses, only provide course-related recommendations. Do not mix or include both unless explicitly requested by the user.
-"""
+    `version` identifies the indexed data (the artifact key), so anything
+    derived from search results can tell when the data was reindexed.
 
-outcome = """
-1. Directly address the user's question with the information that you have.
-2. If the user asks for job recommendations, only list 3 relevant jobs with explanations and avoid mentioning courses unless explicitly requested.
-3. If the user asks for course recommendations, only list 3 relevant courses with explanations and avoid mentioning jobs unless explicitly requested.
-4. Conclude with a follow-up question to encourage further engagement, but keep it specific to the query type.
-"""
+    `chunk_rows[c]` is the dataset row of chunk c, and the chunks of row r are
+    `row_starts[r]:row_starts[r] + row_counts[r]`.
+    """
 
-resources = """
-Use MyCareersFuture for job-related queries and SkillsFuture for course-related queries. If no relevant information is available in the datasets, inform the user politely and offer to refine the query for better results.
-"""
-
-examples = """
-{few_shot_examples}
-"""
-
-time = """
-Keep responses precise and focused on the user's query type to avoid overwhelming them with unnecessary information.
-"""
-
-
-def answer_question(query, cv_text, mode, history, model_name=MODEL):
-    llm = OllamaLLM(model=MODEL)
-    MAX_HISTORY_LENGTH = 10
-
-    if len(history) > MAX_HISTORY_LENGTH:
-        history = history[-MAX_HISTORY_LENGTH:]
+    def __init__(self, name, data, chunks, chunk_rows, embeddings, faiss_index, title_column, version=None, bm25=None, filter_columns=None, detail_columns=None):
+        self.name = name
+        self.version = version
+        self.data = data
+        self.chunks = chunks
+        self.chunk_rows = chunk_rows
+        self.embeddings = embeddings
+        self.faiss_index = faiss_index
+        self.bm25 = bm25
+        self.filter_columns = filter_columns or {}
+        self.row_starts, self.row_counts = build_row_spans(chunk_rows, len(data))
+        self.records = RecordIndex(data, title_column, columns=detail_columns)
+        self.record_ids = self.records.ids
 
-    # Reset history if a new resume is uploaded
-    if cv_text and "resume" in query.lower():
-        history = []  # Clear history for a new resume
+    def chunks_of_row(self, row):
+        start = self.row_starts[row]
+        return range(start, start + self.row_counts[row])
 
-    try:
-        model = SentenceTransformer("all-MiniLM-L6-v2")
-        combined_query = f"""
-        The user has uploaded a resume with the following details:
-        {cv_text}
-        
-        The user has asked the following question:
-        {query}
+    def chunk_mask(self, filters):
         """
+        Turn metadata filters into a mask over the chunks.
 
-        # Determine dataset and fields based on mode
-        if mode == "career":
-            faiss_index = careers_faiss_index
-            chunks = careers_chunks
-            data = careers_data
-            fields = ["Job Title", "Company", "Location", "Salary", "Job Description", "Link"]
-        elif mode == "course":
-            faiss_index = skills_faiss_index
-            chunks = skills_chunks
-            data = skills_data
-            fields = ["Course Title", "Institution", "Duration", "Upcoming Date", "Full Fee", "Funded Fee", "Description", "Link"]
-
-        relevant_chunks, relevant_indices = search_faiss_index(
-            query=combined_query,
-            faiss_index=faiss_index,
-            chunks=chunks,
-            model=model,
-            k=5
-        )
+        Args:
+            filters (dict): Filter name -> value, names from the dataset's
+                `filter_columns`, e.g. {"min_salary": 4000}.
 
-        # Fetch job/course details
-        details_list = []
-        for idx in relevant_indices[:3]:
-            row = data.iloc[idx]
-            details = {field: row[field] if field in row else "N/A" for field in fields}
-            details_list.append(details)
-
-        # Prepare recommendations
-        recommendations = [
-            {"title": details["Job Title" if mode == "career" else "Course Title"]}
-            for details in details_list
-        ]
-
-        # Generate LLM response
-        detailed_context = "\n".join(
-            [
-                f"{details['Job Title' if mode == 'career' else 'Course Title']} at {details['Company' if mode == 'career' else 'Institution']}"
-                for details in details_list
-            ]
-        )
+        Returns:
+            np.ndarray | None: Boolean mask per chunk, or None when there are no filters.
+        """
+        if not filters:
+            return None
+        return row_mask(self.data, self.filter_columns, filters)[np.asarray(self.chunk_rows)]
 
-        llm_response = llm(
-            f"""
-            {context}
-            {outcome}
-            {examples}
-            {time}
-            {resources}
-            
-            User's Resume:
-            {cv_text if cv_text else "No resume uploaded."}
-
-            Relevant Context:
-            {detailed_context}
-
-            User's Question:
-            {query}
-
-            If no resume has been provided, explicitly state that you cannot provide personalized recommendations without reviewing the user's resume. Provide general advice or invite the user to upload their resume for a detailed analysis.
-
-            Answer the user's question specifically without adding extra context. 
-            - If the user asks for job recommendations, provide only job recommendations in a concise format. 
-            - If the user asks about improving their resume, provide targeted resume improvement suggestions. 
-            - If the user asks about courses, provide only relevant courses. 
-            - Do not include unrelated information or combine multiple query types unless explicitly requested by the user.
-            - Use concise bullet points or numbered lists for clarity.
-            - Use Markdown formatting to structure the response.
-
-            If no relevant data is available, politely inform the user and suggest refining their query.
-            """
-        )
 
+def corpus_inputs(mode, reload=False):
+    """
+    Load a dataset, chunk it and compute the artifact key of its index.
+
+    Args:
+        mode (str): "career" or "course".
+        reload (bool): Read the CSV again even if it is already loaded.
+
+    Returns:
+        dict: "spec", "data", "chunks", "chunk_rows", "row_ids", "row_hashes",
+        "index_params" and "key".
+    """
+    spec = DATASETS[mode]
+    data = load_dataset(spec["csv_path"], spec["category_columns"], spec["money_columns"], spec["date_columns"], reload=reload)
+    text = extract_text_from_csv(data, spec["text_columns"])
+    chunks, chunk_rows = chunk_text_with_rows(text)
+    index_params = FAISS_INDEX_PARAMS.get(spec["name"], {})
+    key = index_store.artifact_key(spec["csv_path"], EMBEDDING_MODEL, spec["text_columns"], CHUNK_SIZE, CHUNK_OVERLAP, index_params)
+    return {
+        "spec": spec,
+        "data": data,
+        "chunks": chunks,
+        "chunk_rows": chunk_rows,
+        "row_ids": build_record_ids(data),
+        "row_hashes": row_hashes(text),
+        "index_params": index_params,
+        "key": key,
+    }
+
+# Settings that must match for embeddings of a previous index version to be reused
+def embedding_settings(spec):
+    return {"model": EMBEDDING_MODEL, "text_columns": list(spec["text_columns"]), "chunk_size": CHUNK_SIZE, "overlap": CHUNK_OVERLAP}
+
+def save_corpus_artifacts(inputs, embeddings=None):
+    """
+    Index chunk embeddings and store them in the artifact store.
+
+    Without precomputed `embeddings`, the previous stored version of the
+    dataset is used as a base: rows whose record ID and text are unchanged
+    keep their embeddings and only new or edited rows are encoded. Expired
+    rows simply drop out, and an IVF index reuses the previous training.
+
+    Returns:
+        dict | None: Counts of reused, encoded and removed rows for an
+        incremental update, None for a full build.
+    """
+    spec, chunks = inputs["spec"], inputs["chunks"]
+    settings = embedding_settings(spec)
+    stats = None
+    previous = None
+    if embeddings is None:
+        previous = index_store.latest_artifacts(spec["name"], exclude=inputs["key"])
+        if previous is not None and previous["rows"] and all(previous["meta"].get(k) == v for k, v in settings.items()):
+            embeddings, missing, stats = reuse_embeddings(
+                previous, inputs["row_ids"], inputs["row_hashes"], inputs["chunk_rows"], previous["embeddings"].shape[1]
+            )
+            print(f"Updating {spec['name']} index: {stats['reused_rows']} rows reused, "
+                  f"{stats['encoded_rows']} new or changed, {stats['removed_rows']} removed...")
+            if missing.any():
+                embeddings[missing] = create_embeddings([chunks[i] for i in np.flatnonzero(missing)])
+        else:
+            previous = None
+            print(f"Building {spec['name']} index for {len(chunks)} chunks...")
+            embeddings = create_embeddings(chunks)
+
+    trained = previous["index"] if previous is not None and previous["meta"].get("index") == inputs["index_params"] else None
+    faiss_index = build_faiss_index(embeddings, **inputs["index_params"], trained=trained)
+    index_store.save_artifacts(
+        spec["name"], inputs["key"], embeddings, faiss_index, inputs["chunk_rows"],
+        meta=dict(settings, index=inputs["index_params"]),
+        rows={"ids": inputs["row_ids"], "hashes": inputs["row_hashes"]},
+    )
+    return stats
+
+def load_corpus(mode, reload=False):
+    """
+    Load a dataset and its index, re-encoding only when the CSV or model changed.
+
+    Embeddings, the FAISS and BM25 indexes and the chunk-to-row map are kept in the
+    artifact store under a key derived from the CSV contents, the embedding
+    model and the chunking parameters. When the CSV changed, the index is
+    updated incrementally from the previous version (see
+    `save_corpus_artifacts`). Large datasets are better built ahead of time
+    with `python build_index.py`.
+
+    Args:
+        mode (str): "career" or "course".
+        reload (bool): Read the CSV again even if it is already loaded.
+
+    Returns:
+        Corpus: The loaded dataset.
+    """
+    inputs = corpus_inputs(mode, reload)
+    spec, chunks, key = inputs["spec"], inputs["chunks"], inputs["key"]
+    artifacts = index_store.load_artifacts(spec["name"], key)
+    if artifacts is None or len(artifacts["chunk_rows"]) != len(chunks):
+        save_corpus_artifacts(inputs)
+        artifacts = index_store.load_artifacts(spec["name"], key)
+
+    # The BM25 index lives next to the dense artifacts; older entries get it added on first load
+    path = index_store.artifact_dir(spec["name"], key)
+    bm25 = BM25Index.load(path)
+    if bm25 is None or bm25.n_docs != len(chunks):
+        bm25 = BM25Index.build(chunks)
+        bm25.save(path)
+
+    faiss_index = configure_faiss_search(artifacts["index"])
+    return Corpus(
+        spec["name"], inputs["data"], chunks, artifacts["chunk_rows"], artifacts["embeddings"], faiss_index,
+        spec["title_column"], version=key, bm25=bm25, filter_columns=spec["filter_columns"],
+        detail_columns=source_columns(spec, inputs["data"]),
+    )
+
+
+_corpora = {}
+_corpora_lock = threading.Lock()
+_reload_lock = threading.Lock()
+
+# Answers to recent questions; keys include the corpus version, so reindexing invalidates them
+response_cache = SemanticCache()
+
+# Rolling summary and recent messages of each chat session, quoted in answer prompts
+conversation_memory = ConversationMemory()
+
+# Return the corpus for a mode, loading it on first use
+def get_corpus(mode):
+    corpus = _corpora.get(mode)
+    if corpus is None:
+        with _corpora_lock:
+            corpus = _corpora.get(mode)
+            if corpus is None:
+                corpus = load_corpus(mode)
+                _corpora[mode] = corpus
+    return corpus
+
+def reload_corpus(mode):
+    """
+    Pick up a re-scraped CSV without restarting the app.
+
+    The new version is indexed incrementally and then swapped in with one
+    assignment, so requests in flight finish on the corpus they started
+    with. Cached answers are keyed by corpus version and stop matching.
+
+    Each process holds its own corpora: with several gunicorn workers, call
+    this once and restart the workers (`kill -HUP`) so they load the
+    already updated artifacts.
+
+    Returns:
+        dict: "version", "previous_version" and "changed".
+    """
+    with _reload_lock:
+        previous = _corpora.get(mode)
+        corpus = load_corpus(mode, reload=True)
+        with _corpora_lock:
+            _corpora[mode] = corpus
+    previous_version = previous.version if previous is not None else None
+    return {"version": corpus.version, "previous_version": previous_version, "changed": corpus.version != previous_version}
+
+_skill_graph = None
+_skill_graph_lock = threading.Lock()
+
+# Return the job -> course graph of these two corpora: stored, or built from their embeddings.
+# The graph is keyed by both corpus versions, so it is rebuilt after either is reindexed.
+def get_skill_graph(jobs, courses):
+    global _skill_graph
+    key = graph_key(jobs.version, courses.version)
+    graph = _skill_graph
+    if graph is None or graph.key != key:
+        with _skill_graph_lock:
+            if _skill_graph is None or _skill_graph.key != key:
+                graph = SkillGraph.load(key)
+                if graph is None or len(graph.indptr) != len(jobs.data) + 1:
+                    print(f"Building job -> course graph for {len(jobs.data)} jobs and {len(courses.data)} courses...")
+                    graph = SkillGraph.build(
+                        row_vectors(jobs.embeddings, jobs.chunk_rows, len(jobs.data)),
+                        row_vectors(courses.embeddings, courses.chunk_rows, len(courses.data)),
+                        key=key,
+                    )
+                    graph.save()
+                _skill_graph = graph
+            graph = _skill_graph
+    return graph
 
+# Load every dataset up front, e.g. before the server starts taking requests
+def load_all_corpora():
+    for mode in DATASETS:
+        get_corpus(mode)
+    get_skill_graph(get_corpus("career"), get_corpus("course"))
+    print("Data processing and FAISS index creation complete.")
 
-        return history, {
+
+# Build the stored state of an uploaded resume, reusing the previous embeddings if the text is unchanged.
+# Each section found in the resume gets its own vector: the mean of its chunk embeddings, so long
+# sections are covered beyond the encoder's token limit.
+def make_resume_record(cv_text, previous=None):
+    record = ResumeRecord(cv_text, np.zeros(0, dtype=np.float32))
+    reused = previous is not None and previous.content_hash == record.content_hash
+    metrics.inc("jobot_cache_lookups_total", cache="resume_embedding", result="hit" if reused else "miss")
+    if reused:
+        return previous
+
+    sections = split_sections(cv_text)
+    section_chunks = {name: chunk_text([text]) for name, text in sections.items()}
+    texts = [cv_text] + [chunk for chunks in section_chunks.values() for chunk in chunks]
+    with metrics.timer("resume_encode"):
+        vectors = np.asarray(get_encoder().encode(texts, convert_to_tensor=False), dtype=np.float32)
+
+    record.embedding = vectors[0]
+    start = 1
+    for name, chunks in section_chunks.items():
+        section_vectors = normalize_rows(vectors[start:start + len(chunks)])
+        record.section_embeddings[name] = section_vectors.mean(axis=0)
+        start += len(chunks)
+    return record
+
+# Unit embedding of a question, computed once per request for the response cache and retrieval
+def encode_query(query):
+    with metrics.timer("query_encode"):
+        return normalize_rows(get_encoder().encode([normalize_query(query)], convert_to_tensor=False))[0]
+
+# Retrieval vectors for a question: the question blended with the whole resume, followed by the
+# question blended with each resume section. Without a resume, just the question.
+# `query_vector` is the question's `encode_query` vector, when already computed.
+def build_query_embeddings(query, cv_text="", cv_embedding=None, section_embeddings=None, query_vector=None):
+    if query_vector is None:
+        query_vector = encode_query(query)
+    if not cv_text:
+        return query_vector[np.newaxis, :]
+    if cv_embedding is None:
+        with metrics.timer("query_encode"):
+            cv_embedding = get_encoder().encode([cv_text], convert_to_tensor=False)[0]
+    resume_vectors = [cv_embedding] + list((section_embeddings or {}).values())
+    resume_vectors = normalize_rows(np.vstack(resume_vectors).astype(np.float32))
+    blended = (1 - RESUME_QUERY_WEIGHT) * query_vector + RESUME_QUERY_WEIGHT * resume_vectors
+    return normalize_rows(blended)
+
+
+def retrieve_context(query, cv_text, mode, cv_embedding=None, section_embeddings=None, filters=None, query_embeddings=None):
+    """
+    Retrieve the jobs or courses relevant to a question.
+
+    Args:
+        query (str): The user's question.
+        cv_text (str): Extracted resume text, or an empty string.
+        mode (str): "career" or "course".
+        cv_embedding (np.ndarray): Stored embedding of `cv_text`; encoded on
+            the fly when missing.
+        section_embeddings (dict): Stored per-section resume embeddings. Each
+            section retrieves its own ranking and the rankings are fused.
+        filters (dict): Metadata filters the recommended rows must match, see
+            the mode's `filter_columns` in DATASETS.
+        query_embeddings (np.ndarray): Output of `build_query_embeddings`,
+            when already computed for another mode.
+
+    Returns:
+        tuple: (context_lines, recommendations). `context_lines` describe the
+        best rows for the prompt, best first; recommendations is the list
+        sent back to the UI.
+    """
+
+    # Determine dataset and fields based on mode
+    if mode == "career":
+        corpus = get_corpus(mode)
+        data = corpus.data
+        fields = ["Job Title", "Company", "Location", "Salary", "Job Description", "Link"]
+    elif mode == "course":
+        corpus = get_corpus(mode)
+        data = corpus.data
+        fields = ["Course Title", "Institution", "Duration", "Upcoming Date", "Full Fee", "Funded Fee", "Description", "Link"]
+    else:
+        raise ValueError(f"Unknown mode: {mode}")
+
+    if query_embeddings is None:
+        query_embeddings = build_query_embeddings(query, cv_text, cv_embedding, section_embeddings)
+    relevant_rows, _ = search_rows_fused(
+        query_embeddings,
+        corpus=corpus,
+        k=5,
+        query_text=query,
+        filters=filters,
+    )
+
+    # Fetch job/course details
+    details_list = []
+    for idx in relevant_rows[:3]:
+        row = data.iloc[idx]
+        details = {field: row[field] if field in row else "N/A" for field in fields}
+        details_list.append(details)
+
+    # Prepare recommendations; the id and mode let /api/details look the row up directly
+    recommendations = [
+        {"id": corpus.record_ids[idx], "title": details["Job Title" if mode == "career" else "Course Title"], "mode": mode}
+        for idx, details in zip(relevant_rows, details_list)
+    ]
+
+    context_lines = [
+        f"{details['Job Title' if mode == 'career' else 'Course Title']} at {details['Company' if mode == 'career' else 'Institution']}"
+        for details in details_list
+    ]
+    return context_lines, recommendations
+
+
+# Split metadata filters between the routed datasets; a filter no dataset supports is an error
+def filters_by_mode(modes, filters):
+    if not filters:
+        return {mode: None for mode in modes}
+    known = {name for spec in DATASETS.values() for name in spec["filter_columns"]}
+    unknown = sorted(set(filters) - known)
+    if unknown:
+        raise ValueError(f"Unknown filter: {', '.join(unknown)}. Available filters: {', '.join(sorted(known))}")
+    return {
+        mode: {name: value for name, value in filters.items() if name in DATASETS[mode]["filter_columns"]} or None
+        for mode in modes
+    }
+
+
+def prepare_answer(query, cv_text, modes, cv_embedding=None, section_embeddings=None, filters=None, conversation="", query_vector=None):
+    """
+    Retrieve the relevant jobs and/or courses and build the LLM prompt.
+
+    Takes the arguments of `retrieve_context`, except that `modes` lists
+    the datasets chosen by `route_query` (none, one or both), plus the
+    `conversation` block from `conversation_memory.context` and the
+    question's `encode_query` vector, when already computed. Each filter is
+    applied to the datasets that support it. The prompt is kept within the
+    PROMPT_*_TOKENS budgets and starts with the cached static prefix; its
+    size is logged for every request.
+
+    Returns:
+        tuple: (prompt, recommendations) where recommendations is the list
+        sent back to the UI.
+    """
+    context_lines, recommendations = [], []
+    if modes:
+        query_embeddings = build_query_embeddings(query, cv_text, cv_embedding, section_embeddings, query_vector)
+        mode_filters = filters_by_mode(modes, filters)
+        for mode in modes:
+            lines, mode_recommendations = retrieve_context(
+                query, cv_text, mode, filters=mode_filters[mode], query_embeddings=query_embeddings,
+            )
+            context_lines += lines
+            recommendations += mode_recommendations
+
+    with metrics.timer("prompt"):
+        prompt, stats = build_prompt(query, cv_text, context_lines, conversation)
+    metrics.observe("jobot_prompt_tokens", stats["prompt_tokens"])
+    logging.info(
+        "Prompt: %(prompt_tokens)d tokens (%(prefix_tokens)d static prefix, %(request_tokens)d per request, "
+        "resume %(cv_tokens)d%(trimmed)s, conversation %(conversation_tokens)d)",
+        dict(stats, trimmed=", trimmed" if stats["cv_truncated"] else ""),
+    )
+    return prompt, recommendations
+
+
+# Filtered search without the LLM: the best matching rows as {"id", "title", "score"}
+def search_records(query, mode, filters=None, k=5):
+    if mode not in DATASETS:
+        raise ValueError(f"Unknown mode: {mode}")
+    corpus = get_corpus(mode)
+    rows, scores = search_rows(query, corpus, k=k, filters=filters)
+    titles = corpus.data[DATASETS[mode]["title_column"]]
+    return [{"id": corpus.record_ids[row], "title": titles.iloc[row], "score": score} for row, score in zip(rows, scores)]
+
+
+def job_courses(job_id=None, title=None, k=5):
+    """
+    Look up the courses closest to a job in the precomputed job -> course graph.
+
+    No embedding, vector search or LLM call happens per request.
+
+    Args:
+        job_id (str): Record ID of the job, as in /api/chat recommendations.
+        title (str): Job title, used when no ID is given.
+        k (int): Courses to return, at most SKILL_GRAPH_K.
+
+    Returns:
+        dict | None: {"job": {"id", "title"}, "courses": [{"id", "title",
+        "institution", "score"}, ...]}, or None if the job is unknown.
+    """
+    jobs, courses = get_corpus("career"), get_corpus("course")
+    position = jobs.records.find(row_id=job_id, title=title)
+    if position is None:
+        return None
+    graph = get_skill_graph(jobs, courses)
+    titles, institutions = courses.data["Course Title"], courses.data["Institution"]
+    return {
+        "job": {"id": jobs.record_ids[position], "title": jobs.data["Job Title"].iloc[position]},
+        "courses": [
+            {"id": courses.record_ids[row], "title": titles.iloc[row], "institution": str(institutions.iloc[row]), "score": round(score, 4)}
+            for row, score in graph.courses_for(position, k)
+        ],
+    }
+
+
+def lookup_cached_answer(query, cv_text, modes, model_name=MODEL, filters=None, conversation="", query_vector=None):
+    """
+    Look a question up in the semantic response cache.
+
+    The conversation block quoted in the prompt is part of the key, so a
+    follow-up question is only answered from the cache after the same
+    conversation (e.g. the same opening exchange).
+
+    Args:
+        modes (tuple): Datasets the question is routed to.
+        query_vector (np.ndarray): The question's `encode_query` vector;
+            encoded here when missing.
+
+    Returns:
+        tuple: (lookup, response). `lookup` is passed back to
+        `store_cached_answer` after a miss; it is None when caching is off.
+        `response` is the cached answer or None.
+    """
+    if not RESPONSE_CACHE_ENABLED:
+        return None, None
+    versions = tuple(get_corpus(mode).version for mode in modes)
+    key = (
+        tuple(modes), text_fingerprint(cv_text), text_fingerprint(conversation), model_name, versions,
+        json.dumps(filters or {}, sort_keys=True, default=str),
+    )
+    if query_vector is None:
+        query_vector = encode_query(query)
+    with metrics.timer("cache_lookup"):
+        response = response_cache.get(key, query_vector)
+    metrics.inc(
+        "jobot_cache_lookups_total", cache="response", result="miss" if response is None else "hit",
+        turn="follow_up" if conversation else "opening",
+    )
+    return (key, query_vector), response
+
+def store_cached_answer(lookup, response):
+    if lookup is not None:
+        response_cache.put(*lookup, response)
+
+
+def plan_answer(query, cv_text, history, route, model_name=MODEL, cv_embedding=None, section_embeddings=None, filters=None, session_id=None):
+    """
+    Everything an answer needs before the LLM call.
+
+    Takes the arguments of `answer_question`, with `history` already
+    trimmed and `route` from `route_query`.
+
+    Returns:
+        tuple: (response, prompt, recommendations, lookup). `response` is a
+        canned or cached answer ({"text", "recommendations"}); when it is set
+        nothing needs generating and the other values are None. Otherwise
+        `prompt` goes to the LLM and `lookup` to `store_cached_answer`.
+    """
+    if route.reply is not None:
+        return {"text": route.reply, "recommendations": []}, None, None, None
+
+    conversation = conversation_memory.context(session_id, history)
+    # One embedding of the question serves the cache lookup and retrieval (the router may have made it)
+    query_vector = route.query_vector
+    if query_vector is None and (RESPONSE_CACHE_ENABLED or route.modes):
+        query_vector = encode_query(query)
+    lookup, cached = lookup_cached_answer(query, cv_text, route.modes, model_name, filters, conversation, query_vector)
+    if cached is not None:
+        return cached, None, None, None
+
+    prompt, recommendations = prepare_answer(query, cv_text, route.modes, cv_embedding, section_embeddings, filters, conversation, query_vector)
+    return None, prompt, recommendations, lookup
+
+
+def answer_question(query, cv_text, mode, history, model_name=MODEL, cv_embedding=None, section_embeddings=None, filters=None, session_id=None,
+                    route=None):
+    # The history is kept whole: the conversation memory summarises older turns and
+    # the prompt builder trims what is quoted to its token budget
+    try:
+        # The UI's mode is a hint: the router picks the datasets, or answers without the LLM
+        route = route or route_query(query, mode)
+        response, prompt, recommendations, lookup = plan_answer(
+            query, cv_text, history, route, model_name, cv_embedding, section_embeddings, filters, session_id,
+        )
+        if response is not None:
+            return history, response
+
+        llm_response = llm_pool.invoke(prompt, model_name)
+
+        response = {
             "text": llm_response,
             "recommendations": recommendations,
         }
+        store_cached_answer(lookup, response)
+        return history, response
 
     except Exception as e:
         return history, {"text": f"Error: {str(e)}", "recommendations": []}
+
+
+def stream_answer(query, cv_text, mode, history, model_name=MODEL, cv_embedding=None, section_embeddings=None, filters=None, session_id=None,
+                  route=None):
+    """
+    Streaming variant of `answer_question`.
+
+    Yields (event, data) pairs: one "recommendations" event as soon as
+    retrieval finishes, a "token" event per generated text fragment, and a
+    final "done" event. Failures are reported as an "error" event.
+    """
+    try:
+        route = route or route_query(query, mode)
+        response, prompt, recommendations, lookup = plan_answer(
+            query, cv_text, history, route, model_name, cv_embedding, section_embeddings, filters, session_id,
+        )
+        if response is not None:
+            yield "recommendations", response["recommendations"]
+            yield "token", response["text"]
+            yield "done", {}
+            return
+    except Exception as e:
+        yield "error", {"text": f"Error: {str(e)}"}
+        return
+    yield "recommendations", recommendations
+
+    tokens = []
+    try:
+        for token in llm_pool.stream(prompt, model_name):
+            tokens.append(token)
+            yield "token", token
+    except Exception as e:
+        yield "error", {"text": f"Error: {str(e)}"}
+        return
+    store_cached_answer(lookup, {"text": "".join(tokens), "recommendations": recommendations})
+    yield "done", {}
@@ -0,0 +1,184 @@
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+
+from config import METRICS_ENABLED, SERVER_TIMING_ENABLED
+
+# Content type of the Prometheus text exposition format served at /metrics
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Histogram bucket upper bounds, Prometheus style (each bucket counts observations <= its bound)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_RATE_BUCKETS = (1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 200, 300)
+PROMPT_SIZE_BUCKETS = (256, 512, 1024, 2048, 3072, 4096, 6144, 8192, 16384)
+
+# name -> (type, help, buckets) of every exported metric
+METRICS = {
+    "jobot_request_seconds": ("histogram", "Time to handle an API request, up to the response headers.", LATENCY_BUCKETS),
+    "jobot_stage_seconds": ("histogram", "Time spent in each stage of a request.", LATENCY_BUCKETS),
+    "jobot_llm_time_to_first_token_seconds": ("histogram", "Time from sending a prompt to Ollama to its first generated token.", LATENCY_BUCKETS),
+    "jobot_llm_tokens_per_second": ("histogram", "Ollama generation speed, generated tokens over eval_duration.", TOKEN_RATE_BUCKETS),
+    "jobot_prompt_tokens": ("histogram", "Estimated size of the answer prompts sent to the LLM.", PROMPT_SIZE_BUCKETS),
+    "jobot_llm_prompt_tokens_total": ("counter", "Prompt tokens Ollama evaluated; a reused prefix cache is not counted.", None),
+    "jobot_llm_generated_tokens_total": ("counter", "Tokens generated by Ollama.", None),
+    "jobot_llm_errors_total": ("counter", "Failed LLM calls, retries included.", None),
+    "jobot_cache_lookups_total": ("counter", "Cache lookups by cache and result (hit or miss).", None),
+    "jobot_route_total": ("counter", "Chat messages by routed intent.", None),
+    "jobot_conversation_summaries_total": ("counter", "Background conversation summary updates by result.", None),
+}
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Registry:
+    """
+    Thread-safe store of the counters and histograms in METRICS.
+
+    Values are keyed by metric name and label values, e.g.
+    ("jobot_stage_seconds", (("stage", "mmr"),)), so a new label value
+    starts a new series.
+    """
+
+    def __init__(self, metrics=METRICS):
+        self.metrics = metrics
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._values.get(key)
+            if histogram is None:
+                histogram = self._values[key] = Histogram(self.metrics[name][2])
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        """Return all series in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            values = {key: (list(v.counts), v.sum) if isinstance(v, Histogram) else v for key, v in self._values.items()}
+        lines = []
+        for name, (kind, help_text, buckets) in self.metrics.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for (series, labels), value in sorted(values.items()):
+                if series != name:
+                    continue
+                if kind == "counter":
+                    lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+                    continue
+                counts, total = value
+                cumulative = 0
+                for bound, count in zip(list(buckets) + ["+Inf"], counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{format_labels(labels + (('le', format_value(bound)),))} {cumulative}")
+                lines.append(f"{name}_sum{format_labels(labels)} {format_value(total)}")
+                lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + "}"
+
+
+def format_value(value):
+    return value if isinstance(value, str) else repr(float(value)) if isinstance(value, float) else str(value)
+
+
+registry = Registry()
+
+# Stage timings of the current request, for its Server-Timing header; None outside a request
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+# Start collecting the stage timings of a request; returns when it started
+def start_request():
+    if SERVER_TIMING_ENABLED:
+        _request_timings.set([])
+    return time.perf_counter()
+
+
+# Observe a finished request and return its Server-Timing header value (None when disabled)
+def finish_request(endpoint, started):
+    if METRICS_ENABLED:
+        registry.observe("jobot_request_seconds", time.perf_counter() - started, endpoint=endpoint or "unknown")
+    timings = _request_timings.get()
+    if not timings:
+        return None
+    durations = {}
+    for stage, seconds in timings:
+        durations[stage] = durations.get(stage, 0.0) + seconds
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in durations.items())
+
+
+# Add a duration to the current request's Server-Timing header, if it is collected
+def add_timing(name, seconds):
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+def record(stage, seconds):
+    if METRICS_ENABLED:
+        registry.observe("jobot_stage_seconds", seconds, stage=stage)
+    add_timing(stage, seconds)
+
+
+@contextmanager
+def _timed(stage):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - started)
+
+
+_disabled = nullcontext()
+
+
+# Whether anything is measured at all
+def enabled():
+    return METRICS_ENABLED or SERVER_TIMING_ENABLED
+
+
+def timer(stage):
+    """
+    Time a block of a request as `stage`, e.g. `with metrics.timer("mmr"): ...`.
+
+    The duration goes into the stage histogram and the request's Server-Timing
+    header. With both disabled this returns a shared no-op context manager.
+    """
+    if not enabled():
+        return _disabled
+    return _timed(stage)
+
+
+def observe(name, value, **labels):
+    if METRICS_ENABLED:
+        registry.observe(name, value, **labels)
+
+
+def inc(name, amount=1, **labels):
+    if METRICS_ENABLED:
+        registry.inc(name, amount, **labels)
+
+
+def render():
+    return registry.render()
@@ -0,0 +1,276 @@
+import logging
+import re
+import threading
+
+from config import PROMPT_TOKENIZER, PROMPT_CV_TOKENS, PROMPT_CONTEXT_TOKENS, PROMPT_QUESTION_TOKENS
+
+## FEW SHOT PROMPTING
+
+few_shot_examples = """
+Example 1:
+User's Question: "What are some courses that can help me upskill in data analysis?"
+Response: 
+Here are some courses that might help you upskill in data analysis:
+1. **Advanced Data Analytics with Python**
+   - **Institution**: SkillsFuture Academy
+   - *Learn advanced Python techniques focusing on big data and visualization.*
+2. **Introduction to Data Analytics**
+   - **Institution**: DataTech Institute
+   - *A beginner-friendly course covering key concepts in data analysis and reporting.*
+3. **Data Visualization and Reporting with Tableau**
+   - **Institution**: AnalyticsEdge
+   - *Master the art of data storytelling by learning Tableau for creating impactful dashboards and visualizations.*
+
+Do any of these courses align with your goals, or would you like to explore other areas?
+
+---
+
+Example 2:
+User's Question: "What are some job opportunities for software developers?"
+Response: 
+Here are the job opportunities you might be interested in:
+1. **Full-Stack Developer**
+   - **Company**: XYZ Tech  
+   - *Develop web applications and collaborate with cross-functional teams.*
+2. **Mobile App Developer**
+   - **Company**: ABC Innovations  
+   - *Create and optimize mobile applications for Android and iOS platforms.*
+3. **Backend Engineer**
+   - **Company**: CloudWorks Solutions  
+   - *Focus on server-side architecture, API development, and database management to support scalable applications.*
+
+Do these roles align with your career goals, or would you like me to refine the suggestions?
+
+---
+
+Example 3:
+User's Question: "How can I improve my resume to align with the Full-Stack Developer position at XYZ Tech?"
+Response: 
+To align your resume with the **Full-Stack Developer** role at **XYZ Tech**, consider the following improvements:
+1. **Highlight Relevant Technical Skills**:
+   - Emphasize skills like **JavaScript**, **React**, **Node.js**, and **REST APIs**, as they are commonly required for full-stack development.
+2. **Showcase Project Experience**:
+   - Include projects where you developed full-stack applications, focusing on the technologies and frameworks used, as well as the impact of your work.
+3. **Add Metrics to Achievements**:
+   - Quantify your accomplishments, e.g., "Developed a web application that increased client engagement by 30%."
+4. **Include Collaborative Experience**:
+   - Highlight any experience working in cross-functional teams, as collaboration is key in full-stack development roles.
+
+Let me know if you'd like help crafting a tailored resume summary or refining specific sections!
+
+---
+Example 4:
+User's Question: "How can I improve my resume to align with the Junior Retail Associate position at RECRUIT NOW SINGAPORE PTE. LTD.?"
+Response: 
+To align your resume with the **Junior Retail Associate** role at **RECRUIT NOW SINGAPORE PTE. LTD.**, consider the following improvements:
+
+1. **Emphasize Retail Experience**:
+   - Highlight any roles involving cash handling, customer service, or sales. For example: 
+     *"Managed cash transactions and provided excellent customer service at NTUC FairPrice, increasing customer satisfaction ratings by 15%."*
+
+2. **Add Relevant Skills**:
+   - Include skills like **Point-of-Sale (POS) systems**, **inventory management**, and **team collaboration** to align with the role's requirements.
+
+3. **Quantify Achievements**:
+   - Add metrics to demonstrate your impact, e.g.: *"Reduced inventory discrepancies by 10% through improved stock management techniques."*
+
+4. **Restructure for Clarity**:
+   - Use a "Skills" section at the top of your resume to immediately highlight relevant qualifications for retail roles.
+
+Would you like help refining these sections or drafting a tailored summary for this role?
+
+---
+"""
+
+
+
+# CO-STAR Framework with Few-Shot Prompting
+context = """
+You are an AI assistant designed to answer questions specifically about job opportunities from MyCareersFuture and courses from SkillsFuture. Your primary goal is to directly answer the user's question based on the context of their query and the datasets provided. You must strictly adhere to the type of information requested—if the user asks for jobs, only provide job-related recommendations; if the user asks for courses, only provide course-related recommendations. Do not mix or include both unless explicitly requested by the user.
+"""
+
+outcome = """
+1. Directly address the user's question with the information that you have.
+2. If the user asks for job recommendations, only list 3 relevant jobs with explanations and avoid mentioning courses unless explicitly requested.
+3. If the user asks for course recommendations, only list 3 relevant courses with explanations and avoid mentioning jobs unless explicitly requested.
+4. Conclude with a follow-up question to encourage further engagement, but keep it specific to the query type.
+"""
+
+resources = """
+Use MyCareersFuture for job-related queries and SkillsFuture for course-related queries. If no relevant information is available in the datasets, inform the user politely and offer to refine the query for better results.
+"""
+
+examples = f"""
+{few_shot_examples}
+"""
+
+time = """
+Keep responses precise and focused on the user's query type to avoid overwhelming them with unnecessary information.
+"""
+
+# Closing instructions; they are static too, so they belong to the cached prefix
+instructions = """
+If no resume has been provided, explicitly state that you cannot provide personalized recommendations without reviewing the user's resume. Provide general advice or invite the user to upload their resume for a detailed analysis.
+
+Answer the user's question specifically without adding extra context.
+- If the user asks for job recommendations, provide only job recommendations in a concise format.
+- If the user asks about improving their resume, provide targeted resume improvement suggestions.
+- If the user asks about courses, provide only relevant courses.
+- Do not include unrelated information or combine multiple query types unless explicitly requested by the user.
+- Use concise bullet points or numbered lists for clarity.
+- Use Markdown formatting to structure the response.
+
+If no relevant data is available, politely inform the user and suggest refining their query.
+"""
+
+
+# Everything before the per-request part of a prompt. It is assembled once, so every prompt
+# starts with the same bytes and Ollama can reuse the KV cache it computed for this prefix.
+STATIC_PREFIX = "\n\n".join(part.strip() for part in (context, outcome, examples, time, resources, instructions)) + "\n\n"
+
+REQUEST_TEMPLATE = """User's Resume:
+{cv}
+
+Relevant Context:
+{context}
+{conversation}
+User's Question:
+{query}
+"""
+
+CONVERSATION_TEMPLATE = """
+Conversation So Far:
+{conversation}
+"""
+
+# Rough stand-in for a BPE tokenizer: words split into pieces of up to 4 characters, and
+# every punctuation mark on its own. Within ~15% of real counts for English text.
+TOKEN_PATTERN = re.compile(r"\w{1,4}|[^\w\s]")
+
+
+class TokenCounter:
+    """
+    Counts and truncates text in LLM tokens.
+
+    Uses the Hugging Face tokenizer named by `tokenizer_name` when it can be
+    loaded, and otherwise estimates tokens with TOKEN_PATTERN.
+
+    Args:
+        tokenizer_name (str): Tokenizer matching the Ollama model, e.g.
+            "Qwen/Qwen2.5-3B-Instruct", or None to estimate.
+    """
+
+    def __init__(self, tokenizer_name=None):
+        self.tokenizer = None
+        if tokenizer_name:
+            try:
+                from transformers import AutoTokenizer
+                self.tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
+            except Exception as e:
+                logging.warning(f"Could not load tokenizer {tokenizer_name} ({e}), estimating token counts")
+
+    def count(self, text):
+        if self.tokenizer is not None:
+            return len(self.tokenizer.encode(text, add_special_tokens=False))
+        return len(TOKEN_PATTERN.findall(text))
+
+    def truncate(self, text, max_tokens):
+        """Return (text cut to at most `max_tokens` tokens, whether it was cut)."""
+        if self.tokenizer is not None:
+            ids = self.tokenizer.encode(text, add_special_tokens=False)
+            if len(ids) <= max_tokens:
+                return text, False
+            return self.tokenizer.decode(ids[:max_tokens]), True
+        if max_tokens <= 0:
+            return "", bool(text.strip())
+        for i, match in enumerate(TOKEN_PATTERN.finditer(text)):
+            if i == max_tokens - 1:
+                end = match.end()
+                return text[:end], bool(TOKEN_PATTERN.search(text, end))
+        return text, False
+
+
+_counter = None
+_counter_lock = threading.Lock()
+_prefix_tokens = None
+
+
+def get_token_counter():
+    global _counter
+    if _counter is None:
+        with _counter_lock:
+            if _counter is None:
+                _counter = TokenCounter(PROMPT_TOKENIZER)
+    return _counter
+
+
+# Token count of STATIC_PREFIX, counted once
+def prefix_tokens():
+    global _prefix_tokens
+    if _prefix_tokens is None:
+        _prefix_tokens = get_token_counter().count(STATIC_PREFIX)
+    return _prefix_tokens
+
+
+# Keep whole context lines, in ranked order, while they fit the budget
+def fit_lines(lines, max_tokens, counter):
+    kept, used = [], 0
+    for line in lines:
+        tokens = counter.count(line) + 1
+        if used + tokens > max_tokens:
+            break
+        kept.append(line)
+        used += tokens
+    return kept
+
+
+def build_prompt(query, cv_text, context_lines, conversation="", cv_tokens=PROMPT_CV_TOKENS, context_tokens=PROMPT_CONTEXT_TOKENS,
+                 question_tokens=PROMPT_QUESTION_TOKENS):
+    """
+    Assemble an answer prompt within a token budget.
+
+    The prompt is STATIC_PREFIX followed by the resume, the retrieved
+    context, the conversation so far and the question. Only the per-request
+    part is trimmed: the resume keeps its beginning, the context keeps its
+    best-ranked lines.
+
+    Args:
+        query (str): The user's question.
+        cv_text (str): Extracted resume text, or an empty string.
+        context_lines (list[str]): Retrieved jobs or courses, best first.
+        conversation (str): Conversation block from `ConversationMemory`,
+            already within its own budget; "" for the first message.
+        cv_tokens (int): Token budget of the resume.
+        context_tokens (int): Token budget of the context.
+        question_tokens (int): Token budget of the question.
+
+    Returns:
+        tuple: (prompt, stats). `stats` holds the token counts of the whole
+        prompt, its static prefix, resume and context, and what was trimmed.
+    """
+    counter = get_token_counter()
+
+    cv_truncated = False
+    if cv_text:
+        cv, cv_truncated = counter.truncate(cv_text.strip(), cv_tokens)
+        if cv_truncated:
+            cv += "\n[... rest of the resume omitted]"
+    else:
+        cv = "No resume uploaded."
+
+    lines = fit_lines(context_lines, context_tokens, counter)
+    query, _ = counter.truncate(query, question_tokens)
+    conversation = CONVERSATION_TEMPLATE.format(conversation=conversation) if conversation else ""
+    request_part = REQUEST_TEMPLATE.format(cv=cv, context="\n".join(lines), conversation=conversation, query=query)
+
+    stats = {
+        "prefix_tokens": prefix_tokens(),
+        "request_tokens": counter.count(request_part),
+        "cv_tokens": counter.count(cv) if cv_text else 0,
+        "cv_truncated": cv_truncated,
+        "conversation_tokens": counter.count(conversation) if conversation else 0,
+        "context_lines": len(lines),
+        "context_lines_dropped": len(context_lines) - len(lines),
+    }
+    stats["prompt_tokens"] = stats["prefix_tokens"] + stats["request_tokens"]
+    return STATIC_PREFIX + request_part, stats
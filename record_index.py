@@ -0,0 +1,87 @@
+import hashlib
+import json
+from collections import defaultdict
+
+import pandas as pd
+
+
+def build_record_ids(data, key_column="Link"):
+    """
+    Give every row a stable ID derived from its listing link.
+
+    The ID only depends on the record itself, so it stays the same when the
+    CSV is re-scraped and rows move around. Rows without a link fall back to
+    their position, and repeated links get a numeric suffix.
+
+    Returns:
+        list[str]: One ID per row, in row order.
+    """
+    ids = []
+    seen = defaultdict(int)
+    keys = data[key_column] if key_column in data else [None] * len(data)
+    for position, key in enumerate(keys):
+        if isinstance(key, str) and key and key != "N/A":
+            base = hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+        else:
+            base = f"row{position}"
+        seen[base] += 1
+        ids.append(base if seen[base] == 1 else f"{base}-{seen[base]}")
+    return ids
+
+
+class RecordIndex:
+    """
+    Hash indexes over a dataset for O(1) detail lookups.
+
+    Maps stable row IDs and titles to row positions, and caches the JSON
+    body served by /api/details for each row it has been asked for. Only
+    `columns` (all columns by default) are served, so helper columns added
+    when the dataset is loaded stay internal.
+    """
+
+    def __init__(self, data, title_column, key_column="Link", columns=None):
+        self.data = data
+        self.columns = list(data.columns) if columns is None else list(columns)
+        self.ids = build_record_ids(data, key_column)
+        self.position_of_id = {row_id: position for position, row_id in enumerate(self.ids)}
+        self.positions_of_title = defaultdict(list)
+        for position, title in enumerate(data[title_column]):
+            self.positions_of_title[title].append(position)
+        self._json_cache = {}
+
+    def find(self, row_id=None, title=None):
+        """
+        Return the row position for an ID, or else the first row with a title.
+
+        The title is also tried when the ID is unknown, e.g. an ID from a
+        corpus version that was replaced by /api/reindex.
+
+        Returns:
+            int | None: The row position, or None if nothing matches.
+        """
+        if row_id is not None:
+            position = self.position_of_id.get(row_id)
+            if position is not None:
+                return position
+        positions = self.positions_of_title.get(title)
+        return positions[0] if positions else None
+
+    def details_json(self, position):
+        """Return the serialised /api/details success body for a row."""
+        body = self._json_cache.get(position)
+        if body is None:
+            row = self.data.iloc[position]
+            record = {column: _json_value(row[column]) for column in self.columns}
+            record["id"] = self.ids[position]
+            body = json.dumps({"status": "success", "details": record}, default=str)
+            self._json_cache[position] = body
+        return body
+
+
+# Convert a cell to a JSON-friendly value: NaN/NA become null, numpy scalars plain numbers
+def _json_value(value):
+    if value is None or (pd.api.types.is_scalar(value) and pd.isna(value)):
+        return None
+    if hasattr(value, "item"):
+        return value.item()
+    return value
@@ -0,0 +1,125 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from config import RESPONSE_CACHE_MAX_DISTANCE, RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL
+
+
+# Normalise a question before embedding so trivial differences do not miss the cache
+def normalize_query(query):
+    return " ".join(query.lower().split())
+
+
+# Short stable fingerprint of the resume text or the conversation so far ("" when there is none)
+def text_fingerprint(text):
+    if not text:
+        return ""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+class SemanticCache:
+    """
+    Cache of chat answers looked up by embedding similarity.
+
+    Entries are grouped by an exact key (mode, resume and conversation
+    fingerprints, LLM model, dataset version); within a group a cached answer is served when the new
+    query's embedding is within `max_distance` cosine distance of a stored
+    one. Entries expire after `ttl` seconds and the least recently used ones
+    are evicted beyond `max_entries`.
+    """
+
+    def __init__(self, max_distance=RESPONSE_CACHE_MAX_DISTANCE, max_entries=RESPONSE_CACHE_MAX_ENTRIES, ttl=RESPONSE_CACHE_TTL):
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # entry id -> (group key, value, created), in LRU order
+        self._groups = {}  # group key -> (entry ids, unit query vectors)
+        self._next_id = 0
+
+    def get(self, key, query_vector):
+        """
+        Return the cached value for the closest query in the group, or None.
+
+        Args:
+            key (tuple): Exact part of the cache key.
+            query_vector (np.ndarray): Embedding of the normalised query.
+        """
+        query_vector = _unit(query_vector)
+        with self._lock:
+            self._expire()
+            group = self._groups.get(key)
+            if group is not None:
+                ids, vectors = group
+                similarities = vectors @ query_vector
+                best = int(np.argmax(similarities))
+                entry_id = ids[best]
+                _, value, created = self._entries[entry_id]
+                if time.monotonic() - created > self.ttl:
+                    # Recently used entries sit at the LRU tail, so _expire may not have reached them
+                    self._remove(entry_id)
+                    self.evictions += 1
+                elif 1.0 - similarities[best] <= self.max_distance:
+                    self._entries.move_to_end(entry_id)
+                    self.hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, key, query_vector, value):
+        query_vector = _unit(query_vector)
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (key, value, time.monotonic())
+            ids, vectors = self._groups.get(key, ([], np.empty((0, len(query_vector)), dtype=np.float32)))
+            self._groups[key] = (ids + [entry_id], np.vstack([vectors, query_vector]))
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry, e.g. after the datasets were reindexed."""
+        with self._lock:
+            self._entries.clear()
+            self._groups.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _expire(self):
+        deadline = time.monotonic() - self.ttl
+        while self._entries:
+            entry_id, (_, _, created) = next(iter(self._entries.items()))
+            if created > deadline:
+                break
+            self._remove(entry_id)
+            self.evictions += 1
+
+    def _remove(self, entry_id):
+        key, _, _ = self._entries.pop(entry_id)
+        ids, vectors = self._groups[key]
+        position = ids.index(entry_id)
+        if len(ids) == 1:
+            del self._groups[key]
+        else:
+            self._groups[key] = (ids[:position] + ids[position + 1:], np.delete(vectors, position, axis=0))
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype=np.float32).ravel()
+    return vector / max(float(np.linalg.norm(vector)), 1e-12)
@@ -0,0 +1,153 @@
+import contextlib
+import hashlib
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+from config import RESUME_STORE_BACKEND, RESUME_STORE_PATH, RESUME_STORE_MAX_SESSIONS
+
+
+# Return the session ID sent by the client, or a new one (flagged so the caller can set the cookie)
+def resolve_session_id(*candidates):
+    for candidate in candidates:
+        if candidate:
+            return candidate, False
+    return uuid.uuid4().hex, True
+
+
+class ResumeRecord:
+    """
+    A parsed resume belonging to one chat session.
+
+    Attributes:
+        text (str): Extracted resume text.
+        content_hash (str): SHA-256 of the text.
+        embedding (np.ndarray): Precomputed resume embedding, reused on every turn.
+        section_embeddings (dict): Section name (skills, experience, education)
+            -> embedding of that section, for the sections found in the text.
+    """
+
+    def __init__(self, text, embedding, content_hash=None, section_embeddings=None):
+        self.text = text
+        self.content_hash = content_hash or hashlib.sha256(text.encode("utf-8")).hexdigest()
+        self.embedding = np.asarray(embedding, dtype=np.float32)
+        self.section_embeddings = {
+            name: np.asarray(vector, dtype=np.float32) for name, vector in (section_embeddings or {}).items()
+        }
+
+
+class InMemoryResumeStore:
+    """
+    Resumes keyed by session ID, held in process memory.
+
+    Keeps at most `max_sessions` sessions and evicts the least recently used.
+    """
+
+    def __init__(self, max_sessions=RESUME_STORE_MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self._records = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        with self._lock:
+            record = self._records.get(session_id)
+            if record is not None:
+                self._records.move_to_end(session_id)
+            return record
+
+    def put(self, session_id, record):
+        with self._lock:
+            self._records[session_id] = record
+            self._records.move_to_end(session_id)
+            while len(self._records) > self.max_sessions:
+                self._records.popitem(last=False)
+
+    def delete(self, session_id):
+        with self._lock:
+            self._records.pop(session_id, None)
+
+
+class SQLiteResumeStore:
+    """
+    Resumes keyed by session ID, persisted in a local SQLite file.
+
+    Survives restarts and is shared by every worker on the machine. Keeps at
+    most `max_sessions` sessions, dropping the least recently used.
+    """
+
+    def __init__(self, path=RESUME_STORE_PATH, max_sessions=RESUME_STORE_MAX_SESSIONS):
+        self.path = path
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS resumes ("
+                "session_id TEXT PRIMARY KEY, text TEXT, content_hash TEXT, embedding BLOB, used REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS resumes_used ON resumes (used)")
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(resumes)")}
+            if "section_names" not in columns:
+                # Stores created before section embeddings existed
+                conn.execute("ALTER TABLE resumes ADD COLUMN section_names TEXT")
+                conn.execute("ALTER TABLE resumes ADD COLUMN section_embeddings BLOB")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:  # commits, or rolls back on error
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, session_id):
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT text, content_hash, embedding, section_names, section_embeddings FROM resumes WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE resumes SET used = ? WHERE session_id = ?", (time.time(), session_id))
+        text, content_hash, embedding, section_names, section_embeddings = row
+        embedding = np.frombuffer(embedding, dtype=np.float32)
+        sections = {}
+        if section_names:
+            # Section vectors are stored back to back, each the size of the resume embedding
+            vectors = np.frombuffer(section_embeddings, dtype=np.float32).reshape(-1, len(embedding))
+            sections = dict(zip(section_names.split(","), vectors))
+        return ResumeRecord(text, embedding, content_hash, sections)
+
+    def put(self, session_id, record):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO resumes "
+                "(session_id, text, content_hash, embedding, used, section_names, section_embeddings) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    session_id, record.text, record.content_hash, record.embedding.tobytes(), time.time(),
+                    ",".join(record.section_embeddings),
+                    b"".join(vector.tobytes() for vector in record.section_embeddings.values()),
+                ),
+            )
+            conn.execute(
+                "DELETE FROM resumes WHERE session_id NOT IN "
+                "(SELECT session_id FROM resumes ORDER BY used DESC LIMIT ?)",
+                (self.max_sessions,),
+            )
+
+    def delete(self, session_id):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM resumes WHERE session_id = ?", (session_id,))
+
+
+def create_resume_store(backend=RESUME_STORE_BACKEND):
+    if backend == "memory":
+        return InMemoryResumeStore()
+    if backend == "sqlite":
+        return SQLiteResumeStore()
+    raise ValueError(f"Unknown resume store backend: {backend}")
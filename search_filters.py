@@ -0,0 +1,61 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Filter operators: the row value must be at least ("min") or at most ("max") the filter
+# value, equal one of the filter values ("in"), or contain the filter text ("contains").
+# Rows with a missing value never pass a filter on that column.
+OPERATORS = ("min", "max", "in", "contains")
+
+
+def _as_list(value):
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+def row_mask(data, filter_columns, filters):
+    """
+    Evaluate metadata filters against a dataset.
+
+    Args:
+        data (pd.DataFrame): The compacted dataset with its typed columns.
+        filter_columns (dict): Filter name -> (column, operator), e.g.
+            {"min_salary": ("Salary Max", "min")}.
+        filters (dict): Filter name -> requested value, e.g. {"min_salary": 4000}.
+            Multiple filters are combined with AND.
+
+    Returns:
+        np.ndarray: Boolean mask with one entry per row.
+
+    Raises:
+        ValueError: If a filter name is unknown or its value cannot be parsed.
+    """
+    mask = np.ones(len(data), dtype=bool)
+    for name, value in filters.items():
+        if value is None or value == "" or value == []:
+            continue
+        if name not in filter_columns:
+            raise ValueError(f"Unknown filter: {name}. Available filters: {', '.join(sorted(filter_columns))}")
+        column, operator = filter_columns[name]
+        values = data[column]
+
+        if operator in ("min", "max"):
+            if pd.api.types.is_datetime64_any_dtype(values):
+                bound = pd.Timestamp(value)
+            else:
+                try:
+                    bound = float(value)
+                except (TypeError, ValueError):
+                    raise ValueError(f"Filter {name} expects a number, got {value!r}")
+            passed = values >= bound if operator == "min" else values <= bound
+        elif operator == "in":
+            wanted = {str(v).strip().lower() for v in _as_list(value)}
+            passed = values.astype(str).str.strip().str.lower().isin(wanted)
+        elif operator == "contains":
+            pattern = "|".join(re.escape(str(v).strip().lower()) for v in _as_list(value))
+            passed = values.astype(str).str.lower().str.contains(pattern, regex=True)
+        else:
+            raise ValueError(f"Unknown filter operator: {operator}")
+
+        mask &= np.asarray(passed.fillna(False), dtype=bool)
+    return mask
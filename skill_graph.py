@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import faiss
+import numpy as np
+
+import index_store
+from config import INDEX_CACHE_DIR, SKILL_GRAPH_K, SKILL_GRAPH_MIN_SCORE, SKILL_GRAPH_BATCH
+
+GRAPH_NAME = "job_courses"
+INDPTR_FILE = "indptr.npy"
+COURSES_FILE = "courses.npy"
+SCORES_FILE = "scores.npy"
+
+
+# One unit vector per row: the mean of its normalised chunk embeddings (zero for rows without chunks)
+def row_vectors(embeddings, chunk_rows, n_rows, batch_size=65536):
+    chunk_rows = np.asarray(chunk_rows)
+    vectors = np.zeros((n_rows, embeddings.shape[1]), dtype=np.float32)
+    # Batches keep a memory-mapped embedding matrix from being read in all at once
+    for start in range(0, len(chunk_rows), batch_size):
+        batch = np.asarray(embeddings[start:start + batch_size], dtype=np.float32)
+        batch = batch / (np.linalg.norm(batch, axis=1, keepdims=True) + 1e-12)
+        np.add.at(vectors, chunk_rows[start:start + batch_size], batch)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+    return vectors
+
+
+# Key of a graph built from two indexed corpora with the given settings
+def graph_key(job_version, course_version, k=SKILL_GRAPH_K, min_score=SKILL_GRAPH_MIN_SCORE):
+    settings = json.dumps({"jobs": job_version, "courses": course_version, "k": k, "min_score": min_score}, sort_keys=True)
+    return hashlib.sha256(settings.encode()).hexdigest()[:16]
+
+
+class SkillGraph:
+    """
+    Precomputed job -> course nearest neighbours, stored as CSR arrays.
+
+    The courses of job row j are `courses[indptr[j]:indptr[j + 1]]`, best
+    first, with their cosine similarities in `scores`. Rows are positions in
+    the career and course datasets the graph was built from.
+    """
+
+    def __init__(self, indptr, courses, scores, key=None):
+        self.indptr = indptr
+        self.courses = courses
+        self.scores = scores
+        self.key = key
+
+    @classmethod
+    def build(cls, job_vectors, course_vectors, k=SKILL_GRAPH_K, min_score=SKILL_GRAPH_MIN_SCORE, batch_size=SKILL_GRAPH_BATCH, key=None):
+        """
+        Link every job to its `k` most similar courses with one batched search.
+
+        Args:
+            job_vectors (np.ndarray): Unit row vectors of the jobs.
+            course_vectors (np.ndarray): Unit row vectors of the courses.
+            k (int): Courses kept per job.
+            min_score (float): Links below this cosine similarity are dropped.
+            batch_size (int): Jobs searched per matrix product.
+            key (str): Key the graph is stored under.
+        """
+        index = faiss.IndexFlatIP(course_vectors.shape[1])
+        index.add(np.ascontiguousarray(course_vectors, dtype=np.float32))
+        k = min(k, index.ntotal)
+
+        counts = np.zeros(len(job_vectors), dtype=np.int64)
+        courses, scores = [], []
+        for start in range(0, len(job_vectors), batch_size):
+            D, I = index.search(np.ascontiguousarray(job_vectors[start:start + batch_size], dtype=np.float32), k)
+            keep = (I >= 0) & (D >= min_score)
+            counts[start:start + len(D)] = keep.sum(axis=1)
+            # Row-major boolean indexing keeps each job's links together, best first
+            courses.append(I[keep].astype(np.int32))
+            scores.append(D[keep].astype(np.float32))
+
+        indptr = np.zeros(len(job_vectors) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        empty_int, empty_float = np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+        return cls(indptr, np.concatenate(courses or [empty_int]), np.concatenate(scores or [empty_float]), key)
+
+    def courses_for(self, job_row, limit=None):
+        """Return [(course row, score), ...] of a job row, best first."""
+        start, end = int(self.indptr[job_row]), int(self.indptr[job_row + 1])
+        if limit is not None:
+            end = min(end, start + limit)
+        return list(zip(self.courses[start:end].tolist(), self.scores[start:end].tolist()))
+
+    def nbytes(self):
+        return self.indptr.nbytes + self.courses.nbytes + self.scores.nbytes
+
+    def save(self, cache_dir=INDEX_CACHE_DIR):
+        """Write the graph under its key, replacing older graphs."""
+        parent = os.path.join(cache_dir, GRAPH_NAME)
+        os.makedirs(parent, exist_ok=True)
+        tmp_path = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+        try:
+            np.save(os.path.join(tmp_path, INDPTR_FILE), self.indptr)
+            np.save(os.path.join(tmp_path, COURSES_FILE), self.courses)
+            np.save(os.path.join(tmp_path, SCORES_FILE), self.scores)
+            with open(os.path.join(tmp_path, index_store.META_FILE), "w") as f:
+                json.dump({"key": self.key, "jobs": len(self.indptr) - 1, "links": int(len(self.courses))}, f, indent=2)
+
+            path = index_store.artifact_dir(GRAPH_NAME, self.key, cache_dir)
+            if os.path.exists(path):
+                shutil.rmtree(path)
+            os.replace(tmp_path, path)
+        except Exception:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+        index_store.prune_artifacts(GRAPH_NAME, keep=self.key, cache_dir=cache_dir)
+
+    @classmethod
+    def load(cls, key, cache_dir=INDEX_CACHE_DIR):
+        """
+        Memory-map a stored graph.
+
+        Returns:
+            SkillGraph | None: The graph, or None if none is stored for `key`
+            or it is unreadable or inconsistent (it is then rebuilt).
+        """
+        path = index_store.artifact_dir(GRAPH_NAME, key, cache_dir)
+        if not os.path.exists(os.path.join(path, index_store.META_FILE)):
+            return None
+        try:
+            with open(os.path.join(path, index_store.META_FILE)) as f:
+                meta = json.load(f)
+            graph = cls(
+                np.load(os.path.join(path, INDPTR_FILE), mmap_mode="r"),
+                np.load(os.path.join(path, COURSES_FILE), mmap_mode="r"),
+                np.load(os.path.join(path, SCORES_FILE), mmap_mode="r"),
+                key,
+            )
+            links = int(graph.indptr[-1])
+            if len(graph.indptr) != meta["jobs"] + 1 or not links == len(graph.courses) == len(graph.scores) == meta["links"]:
+                raise ValueError("array sizes do not match the metadata")
+            return graph
+        except Exception as e:
+            print(f"Ignoring unreadable job -> course graph in {path}: {e}")
+            return None
@@ -0,0 +1,40 @@
+import os
+import re
+import sys
+import zlib
+
+import numpy as np
+import pytest
+
+# The modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import encoder
+from config import EMBEDDING_MODEL
+
+
+class StubEncoder:
+    """
+    Deterministic stand-in for the SentenceTransformer: a hashed bag of
+    words, so texts sharing words get similar vectors.
+    """
+
+    dimension = 32
+
+    def get_sentence_embedding_dimension(self):
+        return self.dimension
+
+    def encode(self, texts, convert_to_tensor=False, **kwargs):
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in re.findall(r"\w+", text.lower()):
+                vectors[i, zlib.crc32(word.encode()) % self.dimension] += 1.0
+        return vectors
+
+
+# Serve `get_encoder()` from the stub instead of downloading the real model
+@pytest.fixture
+def stub_encoder(monkeypatch):
+    stub = StubEncoder()
+    monkeypatch.setitem(encoder._encoders, EMBEDDING_MODEL, stub)
+    return stub
@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from config import MEMORY_MAX_MESSAGES
+from conversation_memory import parse_history
+
+
+def test_messages_keep_sender_and_stripped_text():
+    history = json.dumps([{"sender": "You", "text": "  Hi  "}, {"sender": "Bot", "text": "Hello!"}])
+    assert parse_history(history) == [{"sender": "You", "text": "Hi"}, {"sender": "Bot", "text": "Hello!"}]
+
+
+def test_recommendations_are_quoted_by_title():
+    history = [{"sender": "Bot", "text": "", "recommendations": [{"title": "Chef"}, {"id": "x"}, {"title": "Baker"}]}]
+    assert parse_history(history) == [{"sender": "Bot", "text": "Recommended: Chef; Baker"}]
+
+
+def test_non_messages_are_skipped():
+    history = [{"sender": "System", "text": "x"}, "text", {"sender": "You", "text": None}, {"sender": "You", "text": "ok"}]
+    assert parse_history(history) == [{"sender": "You", "text": "ok"}]
+    assert parse_history("") == []
+
+
+def test_only_the_latest_messages_are_kept():
+    history = [{"sender": "You", "text": str(i)} for i in range(MEMORY_MAX_MESSAGES + 5)]
+    parsed = parse_history(history)
+    assert len(parsed) == MEMORY_MAX_MESSAGES
+    assert parsed[-1]["text"] == str(MEMORY_MAX_MESSAGES + 4)
+
+
+@pytest.mark.parametrize("value", ["{not json", '{"sender": "You"}', "__import__('os')"])
+def test_invalid_history_is_rejected(value):
+    with pytest.raises(ValueError):
+        parse_history(value)
@@ -0,0 +1,91 @@
+import os
+import sys
+
+import pandas as pd
+
+# The scrapers and their crawler live in dataset/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dataset"))
+
+from crawler import KEY_FIELD, CrawlStore, crawl
+
+LISTINGS = {
+    "page0": [{"Job Title": "Chef", "Link": "https://jobs/1"}, {"Job Title": "Cleaner", "Company": "Acme", "Link": "N/A"}],
+    "page1": [{"Job Title": "Driver", "Link": "https://jobs/2"}],
+}
+# The same postings listed again on a later page
+LISTINGS["page3"] = LISTINGS["page0"]
+
+
+class FakeFetcher:
+    def __init__(self):
+        self.fetched = []
+
+    def fetch(self, url, wait_for=None):
+        self.fetched.append(url)
+        return url
+
+
+def run_crawl(store, urls, fetcher):
+    records = crawl(
+        urls, lambda page: [dict(r) for r in LISTINGS.get(page, [])], lambda html: {"Job Description": f"about {html}"}, fetcher,
+        workers=2, detail_defaults={"Job Description": "N/A"}, seen_links=store.seen,
+        listing_done=lambda url: store.checkpoint(next_page=int(url[-1]) + 1),
+    )
+    for _, record in records:
+        store.append(record)
+
+
+def test_resume_skips_records_already_written(tmp_path):
+    path = str(tmp_path / "jobs.jsonl")
+    store = CrawlStore(path)
+    run_crawl(store, ["page0"], FakeFetcher())
+    store.close()
+
+    # A crash before the checkpoint of page0 makes the next run read it again
+    os.remove(str(tmp_path / "jobs.state.json"))
+    store = CrawlStore(path)
+    assert "https://jobs/1" in store.seen and len(store.seen) == 2
+    fetcher = FakeFetcher()
+    run_crawl(store, ["page0", "page1", "page2"], fetcher)
+    store.close()
+
+    assert "https://jobs/1" not in fetcher.fetched
+    rows = pd.read_json(path, lines=True)
+    assert sorted(rows["Job Title"]) == ["Chef", "Cleaner", "Driver"]
+    assert store.state == {"next_page": 2}
+
+
+def test_records_without_link_are_told_apart_by_page(tmp_path):
+    store = CrawlStore(str(tmp_path / "jobs.jsonl"))
+    run_crawl(store, ["page0", "page3"], FakeFetcher())
+    store.close()
+    rows = pd.read_json(str(tmp_path / "jobs.jsonl"), lines=True)
+    # The link dedups Chef across pages; the linkless Cleaner is a separate posting per page
+    assert sorted(rows["Job Title"]) == ["Chef", "Cleaner", "Cleaner"]
+
+
+def test_partial_line_is_dropped_and_export_hides_keys(tmp_path):
+    path = str(tmp_path / "jobs.jsonl")
+    store = CrawlStore(path)
+    run_crawl(store, ["page0"], FakeFetcher())
+    store.close()
+    with open(path, "a") as f:
+        f.write('{"Job Title": "Half')
+
+    store = CrawlStore(path)
+    rows = store.export_csv(str(tmp_path / "jobs.csv"))
+    store.close()
+    data = pd.read_csv(str(tmp_path / "jobs.csv"), keep_default_na=False)
+    assert rows == 2
+    assert KEY_FIELD not in data.columns
+    assert set(data["Job Description"]) == {"about https://jobs/1", "N/A"}
+
+
+def test_fresh_discards_the_previous_crawl(tmp_path):
+    path = str(tmp_path / "jobs.jsonl")
+    store = CrawlStore(path)
+    run_crawl(store, ["page0"], FakeFetcher())
+    store.close()
+    store = CrawlStore(path, fresh=True)
+    store.close()
+    assert store.seen == set() and store.state == {}
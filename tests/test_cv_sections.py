@@ -0,0 +1,39 @@
+from CV_parser import split_sections
+
+CV = """Jane Tan
+jane@example.com | +65 9123 4567
+
+Technical Skills:
+Python, SQL, Tableau
+Machine learning
+
+WORK EXPERIENCE
+Data Analyst, Acme Pte Ltd (2021 - 2024)
+Built sales dashboards
+
+Education & Training
+BSc Statistics, NUS
+
+INTERESTS
+Hiking
+"""
+
+
+def test_sections_run_to_the_next_heading():
+    sections = split_sections(CV)
+    assert sections == {
+        "skills": "Python, SQL, Tableau\nMachine learning",
+        "experience": "Data Analyst, Acme Pte Ltd (2021 - 2024)\nBuilt sales dashboards",
+        "education": "BSc Statistics, NUS",
+    }
+
+
+def test_unknown_headings_and_preamble_are_ignored():
+    sections = split_sections(CV)
+    assert "jane@example.com" not in " ".join(sections.values())
+    assert "Hiking" not in sections["education"]
+
+
+def test_empty_or_missing_sections_are_left_out():
+    assert split_sections("Skills\n\nEducation\nDiploma in IT") == {"education": "Diploma in IT"}
+    assert split_sections("Just a paragraph about me.") == {}
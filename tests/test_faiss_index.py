@@ -0,0 +1,12 @@
+import numpy as np
+
+from main import build_faiss_index
+
+
+def test_ivf_pq_parameters_fit_the_training_set():
+    embeddings = np.random.default_rng(0).standard_normal((800, 16)).astype(np.float32)
+    index = build_faiss_index(embeddings, index_type="ivf_pq", pq_m=4)
+    # About 39 training points per centroid: 800 // 39 = 20 IVF lists and 2^4 PQ centroids
+    assert index.nlist == 20
+    assert index.pq.nbits == 4 and index.pq.M == 4
+    assert index.ntotal == 800
@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from bm25_index import BM25Index, tokenize
+from main import hybrid_chunk_scores
+
+CHUNKS = [
+    "Certified AWS-SAA cloud engineer",
+    "Python and SQL data analyst",
+    "Chef for a busy kitchen, python not required",
+    "Course code TGS-2021001234: data analytics with Python",
+]
+
+
+def test_codes_stay_single_tokens():
+    assert tokenize("TGS-2021001234 C++ and aws-saa") == ["tgs-2021001234", "c++", "and", "aws-saa"]
+
+
+def test_search_ranks_matching_chunks():
+    index = BM25Index.build(CHUNKS)
+    ids, scores = index.search("tgs-2021001234", k=5)
+    assert ids.tolist() == [3]
+    ids, scores = index.search("python sql", k=5)
+    assert ids[0] == 1
+    assert sorted(ids.tolist()) == [1, 2, 3]
+    assert np.all(np.diff(scores) <= 0)
+
+
+def test_search_respects_k_and_mask():
+    index = BM25Index.build(CHUNKS)
+    assert len(index.search("python", k=2)[0]) == 2
+    mask = np.array([True, False, True, True])
+    assert 1 not in index.search("python sql", k=5, chunk_mask=mask)[0].tolist()
+    assert len(index.search("pilot", k=5)[0]) == 0
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = BM25Index.build(CHUNKS)
+    index.save(str(tmp_path))
+    loaded = BM25Index.load(str(tmp_path))
+    assert loaded.n_docs == len(CHUNKS)
+    np.testing.assert_allclose(loaded.scores("data python"), index.scores("data python"))
+    # An index built with other BM25 parameters is not reused
+    assert BM25Index.load(str(tmp_path), k1=index.k1 + 0.5) is None
+
+
+def test_rrf_fuses_both_rankings():
+    ids, scores = hybrid_chunk_scores(
+        np.array([0, 1]), np.array([0.9, 0.5]),
+        np.array([1, 2]), np.array([3.0, 1.0]),
+        None, None, fusion="rrf",
+    )
+    assert ids.tolist() == [0, 1, 2]
+    # Chunk 1 is found by both searches, chunk 2 only by BM25
+    assert scores.argmax() == 1
+    assert scores.max() == pytest.approx(1.0)
+    assert scores[2] < scores[0]
+
+
+def test_weighted_scores_sparse_only_chunks_densely():
+    embeddings = np.eye(3, dtype=np.float32)
+    corpus = SimpleNamespace(faiss_index=None, embeddings=embeddings)
+    ids, scores = hybrid_chunk_scores(
+        np.array([0]), np.array([1.0]),
+        np.array([2]), np.array([4.0]),
+        np.array([0.6, 0.0, 0.8], dtype=np.float32), corpus,
+        fusion="weighted", sparse_weight=0.5,
+    )
+    assert ids.tolist() == [0, 2]
+    assert scores.tolist() == pytest.approx([0.5, 0.5 * 0.8 + 0.5])
+
+
+def test_unknown_fusion_is_rejected():
+    with pytest.raises(ValueError):
+        hybrid_chunk_scores(np.array([0]), np.array([1.0]), np.array([0]), np.array([1.0]), None, None, fusion="max")
@@ -0,0 +1,35 @@
+import numpy as np
+
+from index_update import reuse_embeddings, row_hashes
+
+# Previous index: rows a (2 chunks), b (1 chunk), c (1 chunk); chunk c embeds as [c, c]
+PREVIOUS = {
+    "rows": {"ids": ["a", "b", "c"], "hashes": row_hashes(["text a", "text b", "text c"])},
+    "chunk_rows": np.array([0, 0, 1, 2]),
+    "embeddings": np.array([[0, 0], [1, 1], [2, 2], [3, 3]], dtype=np.float32),
+}
+
+
+def test_unchanged_rows_are_reused_after_reordering():
+    # New order: c, new row d, a
+    embeddings, missing, stats = reuse_embeddings(
+        PREVIOUS, ["c", "d", "a"], row_hashes(["text c", "text d", "text a"]), np.array([0, 1, 2, 2]), 2,
+    )
+    assert missing.tolist() == [False, True, False, False]
+    assert embeddings[[0, 2, 3]].tolist() == [[3, 3], [0, 0], [1, 1]]
+    assert embeddings[1].tolist() == [0, 0]
+    assert stats == {"reused_rows": 2, "encoded_rows": 1, "removed_rows": 1}
+
+
+def test_changed_text_or_chunk_count_is_encoded_again():
+    embeddings, missing, stats = reuse_embeddings(
+        PREVIOUS, ["a", "b"], row_hashes(["text a", "edited b"]), np.array([0, 1]), 2,
+    )
+    # a now has one chunk instead of two, b's text changed
+    assert missing.tolist() == [True, True]
+    assert stats["reused_rows"] == 0
+
+
+def test_row_hashes_depend_only_on_text():
+    assert row_hashes(["x", "y"]) == row_hashes(["x", "y"])
+    assert row_hashes(["x"]) != row_hashes(["x "])
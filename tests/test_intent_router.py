@@ -0,0 +1,50 @@
+import pytest
+
+import intent_router
+from intent_router import GOODBYE_REPLY, GREETING_REPLY, THANKS_REPLY, route_query
+
+
+@pytest.mark.parametrize("message, intent, reply", [
+    ("Hello there!", "greeting", GREETING_REPLY),
+    ("ok, thanks a lot", "thanks", THANKS_REPLY),
+    ("bye", "goodbye", GOODBYE_REPLY),
+])
+def test_small_talk_gets_its_own_canned_reply(message, intent, reply):
+    route = route_query(message, "career")
+    assert (route.intent, route.modes, route.reply) == (intent, (), reply)
+
+
+@pytest.mark.parametrize("message, intent, modes", [
+    ("Any data analyst jobs in Jurong?", "career", ("career",)),
+    ("Which Python courses are funded?", "course", ("course",)),
+    ("Jobs and courses for a career switch into data", "both", ("career", "course")),
+    ("Can you improve my resume?", "resume", ()),
+    ("Please remove my CV", "remove_resume", ()),
+])
+def test_keywords_route_without_embedding(monkeypatch, message, intent, modes):
+    monkeypatch.setattr(intent_router, "nearest_intent", None)  # would fail if called
+    route = route_query(message, "course")
+    assert (route.intent, route.modes, route.reply, route.query_vector) == (intent, modes, None, None)
+
+
+def test_bare_ok_is_answered_by_the_llm(monkeypatch):
+    monkeypatch.setattr(intent_router, "nearest_intent", lambda query: (None, None))
+    route = route_query("ok", "career")
+    assert route.reply is None and route.intent == "hint" and route.modes == ("career",)
+
+
+def test_centroid_fallback_places_unmatched_messages(monkeypatch, stub_encoder):
+    monkeypatch.setattr(intent_router, "_centroids", None)
+    route = route_query("Who are you? What can you do?", "career")
+    assert (route.intent, route.modes, route.reply) == ("chat", (), None)
+    assert route.query_vector is not None
+
+    # Not close enough to any intent: the UI's mode decides
+    monkeypatch.setattr(intent_router, "ROUTER_MIN_SIMILARITY", 1.01)
+    route = route_query("Who are you? What can you do?", "course")
+    assert (route.intent, route.modes) == ("hint", ("course",))
+    assert route.query_vector is not None
+
+
+def test_disabled_router_follows_the_ui_mode():
+    assert route_query("Which Python courses are funded?", "career", enabled=False).modes == ("career",)
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from config import LLM_MAX_CONCURRENCY, LLM_SUMMARY_SLOTS
+from llm_gate import LLMGate, Overloaded
+
+
+async def request(gate, hold):
+    try:
+        async with gate.slot():
+            await asyncio.sleep(hold)
+        return "ok"
+    except Overloaded as e:
+        return e.status
+
+
+def burst(gate, n, hold, stagger=0.0):
+    async def run():
+        tasks = []
+        for _ in range(n):
+            tasks.append(asyncio.create_task(request(gate, hold)))
+            if stagger:
+                await asyncio.sleep(stagger)
+        return await asyncio.gather(*tasks)
+
+    return asyncio.run(run())
+
+
+def test_simultaneous_burst_is_capped_by_the_queue():
+    gate = LLMGate(max_concurrency=1, max_queue=1, queue_timeout=5)
+    assert burst(gate, 4, hold=0.05) == ["ok", "ok", 429, 429]
+    assert gate.active == 0 and gate.waiting == 0
+
+
+def test_staggered_requests_get_the_same_answer():
+    gate = LLMGate(max_concurrency=1, max_queue=1, queue_timeout=5)
+    assert burst(gate, 4, hold=0.1, stagger=0.01) == ["ok", "ok", 429, 429]
+
+
+def test_queued_request_times_out_with_503():
+    gate = LLMGate(max_concurrency=1, max_queue=1, queue_timeout=0.05)
+    assert burst(gate, 2, hold=0.3) == ["ok", 503]
+    assert gate.active == 0 and gate.waiting == 0
+
+
+def test_check_rejects_only_when_slots_and_queue_are_full():
+    gate = LLMGate(max_concurrency=2, max_queue=1)
+    gate.active, gate.waiting = 2, 0
+    gate.check()
+    gate.waiting = 1
+    with pytest.raises(Overloaded) as error:
+        gate.check()
+    assert error.value.status == 429
+
+
+def test_default_gate_leaves_slots_for_summaries():
+    assert LLMGate().max_concurrency + LLM_SUMMARY_SLOTS == LLM_MAX_CONCURRENCY
@@ -0,0 +1,34 @@
+import numpy as np
+
+from main import mmr_select
+
+
+def test_pure_relevance_ranks_by_similarity():
+    query = np.array([1.0, 0.0])
+    vectors = np.array([[0.5, 0.5], [1.0, 0.0], [0.0, 1.0]])
+    assert mmr_select(query, vectors, 3, lambda_mult=1.0) == [1, 0, 2]
+
+
+def test_diversity_skips_near_duplicates():
+    query = np.array([1.0, 0.0])
+    # Two copies of the best match and one weaker, different candidate
+    vectors = np.array([[1.0, 0.0], [1.0, 0.01], [0.6, 0.8]])
+    assert mmr_select(query, vectors, 2, lambda_mult=0.3) == [0, 2]
+
+
+def test_precomputed_relevance_is_used():
+    query = np.array([1.0, 0.0])
+    vectors = np.array([[1.0, 0.0], [0.0, 1.0]])
+    assert mmr_select(query, vectors, 1, lambda_mult=1.0, relevance=np.array([0.1, 0.9]))[0] == 1
+
+
+def test_k_is_capped_and_selections_are_distinct():
+    vectors = np.random.default_rng(0).normal(size=(4, 8))
+    selected = mmr_select(vectors[0], vectors, 10)
+    assert sorted(selected) == [0, 1, 2, 3]
+
+
+def test_vectors_need_not_be_normalised():
+    query = np.array([2.0, 0.0])
+    vectors = np.array([[10.0, 10.0], [0.1, 0.0]])
+    assert mmr_select(query, vectors, 1, lambda_mult=1.0) == [1]
@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+
+import intent_router
+import main
+from intent_router import Route, intent_centroids
+from response_cache import SemanticCache
+
+
+@pytest.fixture
+def career_corpus(monkeypatch, stub_encoder):
+    data = pd.DataFrame({
+        "Job Title": ["Data Analyst", "Chef"],
+        "Company": ["Acme", "Diner"],
+        "Location": ["Central", "East"],
+        "Employment Type": ["Full Time", "Part Time"],
+        "Salary": ["$4,000", "$3,000"],
+        "Job Description": ["sql dashboards", "kitchen cooking"],
+        "Link": ["https://a", "https://b"],
+    })
+    chunks, chunk_rows = main.chunk_text_with_rows(main.extract_text_from_csv(data, main.careers_text_columns))
+    embeddings = main.create_embeddings(chunks)
+    corpus = main.Corpus(
+        "careers", data, chunks, chunk_rows, embeddings, main.build_faiss_index(embeddings), "Job Title",
+        version="v1", bm25=main.BM25Index.build(chunks),
+    )
+    monkeypatch.setattr(main, "get_corpus", lambda mode: corpus)
+    monkeypatch.setattr(main, "response_cache", SemanticCache())
+    return corpus
+
+
+@pytest.fixture
+def encoded(monkeypatch, stub_encoder):
+    monkeypatch.setattr(intent_router, "_centroids", None)
+    intent_centroids()  # the intent examples are encoded once per process, not per request
+    texts = []
+    encode = stub_encoder.encode
+
+    def counting_encode(batch, **kwargs):
+        texts.extend(batch)
+        return encode(batch, **kwargs)
+
+    monkeypatch.setattr(stub_encoder, "encode", counting_encode)
+    return texts
+
+
+def test_question_is_encoded_once(career_corpus, encoded):
+    response, prompt, recommendations, lookup = main.plan_answer("Data analyst jobs", "", [], Route("career", ("career",), None))
+    assert response is None and recommendations[0]["title"] == "Data Analyst"
+    assert encoded == ["data analyst jobs"]
+
+
+def test_router_vector_is_reused(career_corpus, encoded):
+    route = main.route_query("sql dashboards", "career")
+    assert route.query_vector is not None
+    main.plan_answer("sql dashboards", "", [], route)
+    assert encoded == ["sql dashboards"]
+
+
+def test_cached_answer_needs_no_retrieval(career_corpus, encoded):
+    route = Route("career", ("career",), None)
+    _, _, recommendations, lookup = main.plan_answer("Data analyst jobs", "", [], route)
+    main.store_cached_answer(lookup, {"text": "Try Acme.", "recommendations": recommendations})
+    response, prompt, _, _ = main.plan_answer("data analyst  jobs", "", [], route)
+    assert response["text"] == "Try Acme." and prompt is None
@@ -0,0 +1,61 @@
+from config import MODEL
+from conversation_memory import ConversationMemory
+from prompt_builder import STATIC_PREFIX, TokenCounter, build_prompt, fit_lines, get_token_counter
+
+COUNTER = TokenCounter()
+
+
+def test_estimated_counts_and_truncation():
+    assert COUNTER.count("Data analysts, apply!") == 7  # Data anal ysts , appl y !
+    assert COUNTER.truncate("one two three four", 2) == ("one two", True)
+    assert COUNTER.truncate("one two", 5) == ("one two", False)
+    assert COUNTER.truncate("one", 0) == ("", True)
+
+
+def test_fit_lines_keeps_whole_lines_in_rank_order():
+    lines = ["Chef at Diner", "Data Analyst at Acme", "Baker at Bakery"]
+    budget = COUNTER.count(lines[0]) + COUNTER.count(lines[1]) + 2
+    assert fit_lines(lines, budget, COUNTER) == lines[:2]
+    assert fit_lines(lines, 1, COUNTER) == []
+
+
+def test_static_prefix_is_identical_for_every_request():
+    first, _ = build_prompt("Any jobs?", "", ["Chef at Diner"])
+    second, _ = build_prompt("Which courses?", "Python developer " * 50, [], conversation="User: hi")
+    assert first.startswith(STATIC_PREFIX) and second.startswith(STATIC_PREFIX)
+    assert first.encode()[:len(STATIC_PREFIX.encode())] == second.encode()[:len(STATIC_PREFIX.encode())]
+    assert "Any jobs?" not in STATIC_PREFIX
+
+
+def test_resume_and_context_are_trimmed_to_their_budgets():
+    cv_text = "skill " * 100
+    lines = [f"Job {i} at Company {i}" for i in range(10)]
+    prompt, stats = build_prompt("Any jobs?", cv_text, lines, cv_tokens=20, context_tokens=30)
+
+    assert stats["cv_truncated"] and stats["cv_tokens"] <= 20 + COUNTER.count("\n[... rest of the resume omitted]")
+    assert "[... rest of the resume omitted]" in prompt
+    kept = stats["context_lines"]
+    assert 0 < kept < len(lines) and stats["context_lines_dropped"] == len(lines) - kept
+    assert lines[kept - 1] in prompt and lines[kept] not in prompt
+
+
+def test_stats_add_up():
+    prompt, stats = build_prompt("Any jobs?", "", ["Chef at Diner"], conversation="User: hi")
+    counter = get_token_counter()
+    assert stats["prefix_tokens"] == counter.count(STATIC_PREFIX)
+    assert stats["request_tokens"] == counter.count(prompt[len(STATIC_PREFIX):])
+    assert stats["prompt_tokens"] == stats["prefix_tokens"] + stats["request_tokens"]
+    assert stats["cv_tokens"] == 0 and not stats["cv_truncated"]
+    assert stats["conversation_tokens"] > 0
+    assert (stats["context_lines"], stats["context_lines_dropped"]) == (1, 0)
+    assert "No resume uploaded." in prompt
+
+
+def test_history_keeps_the_latest_messages_within_budget():
+    memory = ConversationMemory(recent_messages=100, summary_batch=100, max_tokens=20, model_name=MODEL)
+    history = [{"sender": "You" if i % 2 == 0 else "Bot", "text": f"message number {i}"} for i in range(10)]
+    block = memory.context(None, history)
+    assert block.endswith("Assistant: message number 9")
+    assert "message number 0" not in block
+    assert get_token_counter().count(block) <= 20
+    assert memory.context(None, []) == ""
@@ -0,0 +1,45 @@
+import json
+
+import pandas as pd
+
+from data_store import compact_dataset
+from main import DATASETS, source_columns
+from record_index import RecordIndex, build_record_ids
+
+DATA = pd.DataFrame({
+    "Job Title": ["Chef", "Data Analyst", "Chef"],
+    "Link": ["https://a", "N/A", "https://a"],
+})
+
+
+def test_ids_are_stable_and_unique():
+    ids = build_record_ids(DATA)
+    assert ids[1] == "row1"
+    assert ids[2] == ids[0] + "-2"
+    assert build_record_ids(DATA.iloc[[2, 0]].reset_index(drop=True))[0] == ids[0]
+
+
+def test_find_by_id_or_title():
+    records = RecordIndex(DATA, "Job Title")
+    assert records.find(row_id=records.ids[2]) == 2
+    assert records.find(title="Data Analyst") == 1
+    assert records.find(title="Chef") == 0
+    assert records.find(title="Pilot") is None
+
+
+def test_unknown_id_falls_back_to_title():
+    records = RecordIndex(DATA, "Job Title")
+    assert records.find(row_id="stale-id", title="Data Analyst") == 1
+    assert records.find(row_id="stale-id") is None
+
+
+def test_details_only_serve_source_columns():
+    spec = DATASETS["career"]
+    data = compact_dataset(
+        pd.DataFrame({"Job Title": ["Chef"], "Link": ["https://a"], "Salary": ["$3,000 to $4,000"]}),
+        money_columns=spec["money_columns"],
+    )
+    assert "Salary Max" in data
+    records = RecordIndex(data, "Job Title", columns=source_columns(spec, data))
+    details = json.loads(records.details_json(0))["details"]
+    assert details == {"Job Title": "Chef", "Link": "https://a", "Salary": "$3,000 to $4,000", "id": records.ids[0]}
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+import response_cache
+from response_cache import SemanticCache, text_fingerprint, normalize_query
+
+KEY = ("career", "", "model", ("v1",), "{}")
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache.time, "monotonic", clock)
+    return clock
+
+
+def test_close_query_hits_and_distant_query_misses():
+    cache = SemanticCache(max_distance=0.05, max_entries=10, ttl=60)
+    cache.put(KEY, np.array([1.0, 0.0]), "answer")
+    assert cache.get(KEY, np.array([10.0, 0.1])) == "answer"
+    assert cache.get(KEY, np.array([0.0, 1.0])) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_groups_do_not_share_entries():
+    cache = SemanticCache(max_distance=0.05, max_entries=10, ttl=60)
+    cache.put(KEY, np.array([1.0, 0.0]), "answer")
+    assert cache.get(("course",) + KEY[1:], np.array([1.0, 0.0])) is None
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = SemanticCache(max_distance=0.05, max_entries=10, ttl=60)
+    cache.put(KEY, np.array([1.0, 0.0]), "answer")
+    clock.now += 59
+    assert cache.get(KEY, np.array([1.0, 0.0])) == "answer"
+    clock.now += 2
+    assert cache.get(KEY, np.array([1.0, 0.0])) is None
+    assert cache.stats()["entries"] == 0
+    assert cache.evictions == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SemanticCache(max_distance=0.01, max_entries=2, ttl=60)
+    cache.put(KEY, np.array([1.0, 0.0, 0.0]), "a")
+    cache.put(KEY, np.array([0.0, 1.0, 0.0]), "b")
+    # Touch "a", so "b" is the least recently used when "c" arrives
+    assert cache.get(KEY, np.array([1.0, 0.0, 0.0])) == "a"
+    cache.put(KEY, np.array([0.0, 0.0, 1.0]), "c")
+    assert cache.get(KEY, np.array([0.0, 1.0, 0.0])) is None
+    assert cache.get(KEY, np.array([1.0, 0.0, 0.0])) == "a"
+    assert cache.get(KEY, np.array([0.0, 0.0, 1.0])) == "c"
+    assert cache.evictions == 1
+
+
+def test_clear_and_stats():
+    cache = SemanticCache(max_distance=0.05, max_entries=10, ttl=60)
+    cache.put(KEY, np.array([1.0, 0.0]), "answer")
+    cache.get(KEY, np.array([1.0, 0.0]))
+    cache.clear()
+    assert cache.get(KEY, np.array([1.0, 0.0])) is None
+    assert cache.stats() == {"entries": 0, "hits": 1, "misses": 1, "evictions": 0, "hit_rate": 0.5}
+
+
+def test_key_helpers():
+    assert normalize_query("  What   JOBS\tsuit me? ") == "what jobs suit me?"
+    assert text_fingerprint("") == ""
+    assert text_fingerprint("resume") == text_fingerprint("resume") != text_fingerprint("other resume")
+
+
+def test_follow_ups_are_cached_per_conversation(monkeypatch, stub_encoder):
+    import main
+
+    monkeypatch.setattr(main, "response_cache", SemanticCache())
+    monkeypatch.setattr(main, "get_corpus", lambda mode: type("Corpus", (), {"version": "v1"}))
+    answer = {"text": "Try these.", "recommendations": []}
+    lookup, cached = main.lookup_cached_answer("Any data jobs?", "", ("career",), conversation="User: hi")
+    assert cached is None
+    main.store_cached_answer(lookup, answer)
+
+    assert main.lookup_cached_answer("any data jobs?", "", ("career",), conversation="User: hi")[1] == answer
+    assert main.lookup_cached_answer("Any data jobs?", "", ("career",), conversation="User: I am a chef")[1] is None
+    assert main.lookup_cached_answer("Any data jobs?", "", ("career",))[1] is None
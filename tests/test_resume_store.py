@@ -0,0 +1,31 @@
+import numpy as np
+
+from resume_store import InMemoryResumeStore, ResumeRecord, SQLiteResumeStore
+
+
+def record(text):
+    return ResumeRecord(text, np.ones(4, dtype=np.float32), section_embeddings={"skills": np.zeros(4, dtype=np.float32)})
+
+
+def test_sqlite_store_is_shared_between_workers(tmp_path):
+    # Two workers open the same file; a resume uploaded to one is seen by the other
+    path = str(tmp_path / "resumes.sqlite3")
+    first, second = SQLiteResumeStore(path), SQLiteResumeStore(path)
+    first.put("session", record("Python developer"))
+    stored = second.get("session")
+    assert stored.text == "Python developer"
+    assert stored.embedding.tolist() == [1, 1, 1, 1]
+    assert list(stored.section_embeddings) == ["skills"]
+
+    second.delete("session")
+    assert first.get("session") is None
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = InMemoryResumeStore(max_sessions=2)
+    store.put("a", record("a"))
+    store.put("b", record("b"))
+    store.get("a")
+    store.put("c", record("c"))
+    assert store.get("b") is None
+    assert store.get("a").text == "a"
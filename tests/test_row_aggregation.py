@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from main import Corpus, aggregate_chunk_scores, build_faiss_index, build_row_spans, chunk_text_with_rows, create_embeddings, search_rows
+
+CHUNK_ROWS = np.array([0, 0, 1, 2, 2, 2], dtype=np.int32)
+
+
+def test_max_keeps_best_chunk_per_row():
+    rows, scores, best = aggregate_chunk_scores(np.array([0, 1, 4, 3]), np.array([0.2, 0.9, 0.5, 0.7], dtype=np.float32), CHUNK_ROWS, "max")
+    assert rows.tolist() == [0, 2]
+    assert scores.tolist() == pytest.approx([0.9, 0.7])
+    assert best.tolist() == [1, 3]
+
+
+def test_sum_adds_chunk_scores():
+    rows, scores, best = aggregate_chunk_scores(np.array([3, 4, 2]), np.array([0.25, 0.5, 0.5], dtype=np.float32), CHUNK_ROWS, "sum")
+    assert rows.tolist() == [1, 2]
+    assert scores.tolist() == pytest.approx([0.5, 0.75])
+    assert best.tolist() == [2, 4]
+
+
+def test_unknown_aggregation_is_rejected():
+    with pytest.raises(ValueError):
+        aggregate_chunk_scores(np.array([0]), np.array([1.0]), CHUNK_ROWS, "mean")
+
+
+def test_row_spans():
+    starts, counts = build_row_spans(CHUNK_ROWS, 4)
+    assert starts.tolist() == [0, 2, 3, 6]
+    assert counts.tolist() == [2, 1, 3, 0]
+
+
+def test_chunks_remember_their_rows():
+    chunks, rows = chunk_text_with_rows(["a" * 25, "b" * 5], chunk_size=10, overlap=2)
+    assert rows.tolist() == [0, 0, 0, 0, 1]
+    assert chunks[-1] == "b" * 5
+
+
+def test_search_returns_distinct_rows(stub_encoder):
+    data = pd.DataFrame({
+        "Job Title": ["Data Analyst", "Chef", "Data Engineer"],
+        "Link": ["https://a", "https://b", "https://c"],
+    })
+    # Row 0 has several chunks that all match the query
+    text = ["data analyst sql " * 20, "chef kitchen cooking", "data engineer pipelines sql"]
+    chunks, chunk_rows = chunk_text_with_rows(text, chunk_size=40, overlap=0)
+    embeddings = create_embeddings(chunks)
+    corpus = Corpus("jobs", data, chunks, chunk_rows, embeddings, build_faiss_index(embeddings), "Job Title")
+
+    rows, scores = search_rows("data analyst sql", corpus, k=3, fetch_k=3)
+    assert rows[0] == 0
+    assert sorted(rows) == [0, 1, 2]
+    assert len(scores) == 3
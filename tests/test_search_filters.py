@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_store import compact_dataset
+from search_filters import row_mask
+
+FILTER_COLUMNS = {
+    "min_salary": ("Salary Max", "min"),
+    "location": ("Location", "in"),
+    "employment_type": ("Employment Type", "contains"),
+    "start_after": ("Upcoming Date Value", "min"),
+}
+
+DATA = compact_dataset(
+    pd.DataFrame({
+        "Salary": ["$3,000 to $4,000", "$6,000 to $8,000", "Not stated"],
+        "Location": ["Central", "East", "central"],
+        "Employment Type": ["Full Time", "Part Time, Contract", "Full Time"],
+        "Upcoming Date": ["01 Mar 25", "15 Jun 25", None],
+    }),
+    category_columns=["Location"],
+    money_columns={"Salary": ["Salary Min", "Salary Max"]},
+    date_columns={"Upcoming Date": ["Upcoming Date Value", "%d %b %y"]},
+)
+
+
+def mask(**filters):
+    return row_mask(DATA, FILTER_COLUMNS, filters).tolist()
+
+
+def test_numeric_bounds_skip_missing_values():
+    assert mask(min_salary=5000) == [False, True, False]
+    assert mask(min_salary="3500") == [True, True, False]
+
+
+def test_category_and_text_matches_ignore_case():
+    assert mask(location="CENTRAL") == [True, False, True]
+    assert mask(location=["east", "central"]) == [True, True, True]
+    assert mask(employment_type="contract") == [False, True, False]
+
+
+def test_date_bounds_and_combined_filters():
+    assert mask(start_after="2025-04-01") == [False, True, False]
+    assert mask(location="central", min_salary=3000) == [True, False, False]
+
+
+def test_empty_filters_pass_everything():
+    assert mask(location="", min_salary=None) == [True, True, True]
+    assert row_mask(DATA, FILTER_COLUMNS, {}).dtype == np.bool_
+
+
+def test_bad_filters_are_rejected():
+    with pytest.raises(ValueError, match="Unknown filter"):
+        mask(max_fee=100)
+    with pytest.raises(ValueError, match="expects a number"):
+        mask(min_salary="lots")
@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+import pytest
+
+from skill_graph import GRAPH_NAME, SkillGraph, graph_key, row_vectors
+
+COURSES = np.array([[1, 0, 0], [0.8, 0.6, 0], [0, 0, 1]], dtype=np.float32)
+JOBS = np.array([[1, 0, 0], [0, 0.6, 0.8], [0, -1, 0]], dtype=np.float32)
+
+
+def test_row_vectors_average_normalised_chunks():
+    embeddings = np.array([[2, 0], [0, 5], [0, 3]], dtype=np.float32)
+    vectors = row_vectors(embeddings, [0, 0, 1], 3, batch_size=2)
+    assert vectors[0] == pytest.approx([2 ** -0.5, 2 ** -0.5])
+    assert vectors[1] == pytest.approx([0, 1])
+    # A row without chunks gets a zero vector
+    assert vectors[2].tolist() == [0, 0]
+
+
+def test_jobs_link_to_their_nearest_courses_best_first():
+    graph = SkillGraph.build(JOBS, COURSES, k=2, min_score=0.25, batch_size=2)
+    assert [course for course, _ in graph.courses_for(0)] == [0, 1]
+    assert graph.courses_for(0)[1][1] == pytest.approx(0.8)
+    assert graph.courses_for(1) == [(2, pytest.approx(0.8)), (1, pytest.approx(0.36))]
+    assert graph.courses_for(0, limit=1) == [(0, pytest.approx(1.0))]
+
+
+def test_links_below_min_score_are_dropped():
+    graph = SkillGraph.build(JOBS, COURSES, k=3, min_score=0.5)
+    assert graph.courses_for(2) == []
+    assert [course for course, _ in graph.courses_for(1)] == [2]
+    assert graph.indptr.tolist() == [0, 2, 3, 3]
+
+
+def test_save_and_load_replace_older_graphs(tmp_path):
+    old = SkillGraph.build(JOBS, COURSES, k=1, key=graph_key("jobs-v1", "courses-v1"))
+    old.save(str(tmp_path))
+    graph = SkillGraph.build(JOBS, COURSES, k=2, key=graph_key("jobs-v2", "courses-v1"))
+    graph.save(str(tmp_path))
+
+    loaded = SkillGraph.load(graph.key, str(tmp_path))
+    assert loaded.courses_for(1) == graph.courses_for(1)
+    assert SkillGraph.load(old.key, str(tmp_path)) is None
+    assert [name for name in os.listdir(tmp_path / GRAPH_NAME) if not name.startswith(".")] == [graph.key]
+
+
+def test_graph_key_changes_with_settings():
+    assert graph_key("a", "b") == graph_key("a", "b")
+    assert graph_key("a", "b", k=5) != graph_key("a", "b")
+
+
+def test_unreadable_or_partial_graph_is_ignored(tmp_path):
+    graph = SkillGraph.build(JOBS, COURSES, k=2, key=graph_key("jobs", "courses"))
+    graph.save(str(tmp_path))
+    path = tmp_path / GRAPH_NAME / graph.key
+
+    np.save(str(path / "courses.npy"), np.zeros(1, dtype=np.int32))
+    assert SkillGraph.load(graph.key, str(tmp_path)) is None
+
+    (path / "scores.npy").write_bytes(b"not an array")
+    assert SkillGraph.load(graph.key, str(tmp_path)) is None
+
+
+def test_job_courses_rejects_a_non_integer_k():
+    from web_common import job_courses_body
+
+    body, status = job_courses_body({"title": "Chef", "k": "many"})
+    assert status == 400 and body["status"] == "error"
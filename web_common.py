@@ -0,0 +1,222 @@
+import json
+import logging
+from collections import namedtuple
+
+from CV_parser import CvConverter, CvLimitError
+from conversation_memory import parse_history
+from intent_router import route_query
+from main import get_corpus, make_resume_record, search_records, reload_corpus, job_courses
+from resume_store import create_resume_store
+
+# Request handling shared by the Flask (app.py) and ASGI (asgi_app.py) servers. The functions
+# here are synchronous: the ASGI server runs them on its retrieval thread pool.
+
+# Parsed resumes (text, hash and embedding) per chat session
+resume_store = create_resume_store()
+
+RESUME_REMOVED = "Your resume has been removed."
+NO_CV_TEXT = (
+    "No text could be extracted from this PDF. Scanned or image-only resumes are not supported; "
+    "please upload a PDF with selectable text."
+)
+
+
+class RequestError(Exception):
+    """
+    Raised when a request is answered with an error instead of being served.
+
+    Attributes:
+        status (int): HTTP status to answer with.
+        key (str): Field of the JSON body that carries the message.
+    """
+
+    def __init__(self, message, status, key="response"):
+        super().__init__(message)
+        self.status = status
+        self.key = key
+
+    def body(self):
+        return {self.key: str(self), "status": "error"}
+
+
+# A chat message after parsing and routing, with the session's resume
+ChatTurn = namedtuple("ChatTurn", ["message", "mode", "history", "filters", "route", "cv_text", "cv_embedding", "section_embeddings"])
+
+
+# Clients opt into streaming with a "stream" field or an SSE Accept header
+def wants_stream(value, accept=""):
+    if str(value).lower() in ("1", "true", "yes"):
+        return True
+    return "text/event-stream" in (accept or "")
+
+# Format one Server-Sent Event
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+# Metadata filters arrive as a JSON object, e.g. {"min_salary": 4000, "employment_type": "Part Time"}
+def parse_filters(value):
+    if not value:
+        return None
+    filters = json.loads(value) if isinstance(value, str) else value
+    if not isinstance(filters, dict):
+        raise ValueError("filters must be a JSON object.")
+    return filters
+
+
+def chat_body(response):
+    return {"response": response["text"], "recommendations": response["recommendations"], "status": "success"}
+
+
+def start_chat(form, uploaded_file, session_id):
+    """
+    Parse and route a chat message and bring the session's resume up to date.
+
+    A "remove my resume" message deletes the resume and is not processed
+    further; the caller answers it with RESUME_REMOVED. Otherwise an
+    uploaded resume is parsed, embedded and stored for the session.
+
+    Args:
+        form (dict): The /api/chat form fields.
+        uploaded_file: The uploaded resume (with a `stream`), or None.
+        session_id (str): The chat session.
+
+    Returns:
+        ChatTurn: The message, its route and the session's resume fields.
+
+    Raises:
+        RequestError: For malformed history or filters, or a resume that
+            cannot be read.
+    """
+    message = form.get("message", "")
+    mode = form.get("mode", "")
+    try:
+        # The history is parsed as JSON, never evaluated
+        history = parse_history(form.get("history", "[]"))
+        filters = parse_filters(form.get("filters"))
+    except ValueError as e:
+        raise RequestError(f"Invalid request: {e}", 400)
+
+    # The mode selected in the UI is only a hint; the router decides what the message needs
+    route = route_query(message, mode)
+    if route.intent == "remove_resume":
+        resume_store.delete(session_id)
+        return ChatTurn(message, mode, history, filters, route, "", None, None)
+
+    if uploaded_file:
+        store_resume(session_id, uploaded_file.stream)
+
+    resume = resume_store.get(session_id)
+    if resume is None:
+        return ChatTurn(message, mode, history, filters, route, "", None, None)
+    return ChatTurn(message, mode, history, filters, route, resume.text, resume.embedding, resume.section_embeddings)
+
+
+# Parse an uploaded resume straight from the request stream and embed it once for the session.
+# A file without extractable text (e.g. a scanned PDF) is rejected rather than silently ignored.
+def store_resume(session_id, stream):
+    try:
+        cv_text = CvConverter(stream).convert_to_text()
+    except CvLimitError as e:
+        raise RequestError(str(e), 413)
+    except Exception as e:
+        logging.error(f"Error processing CV: {e}")
+        raise RequestError("Error processing CV.", 500)
+
+    if not cv_text.strip():
+        raise RequestError(NO_CV_TEXT, 422)
+    try:
+        resume_store.put(session_id, make_resume_record(cv_text, resume_store.get(session_id)))
+    except Exception as e:
+        logging.error(f"Error processing CV: {e}")
+        raise RequestError("Error processing CV.", 500)
+
+
+def details_body(payload):
+    """
+    Look up the /api/details record of a recommendation.
+
+    Returns:
+        tuple: (JSON text, status). Found records are served from the
+        record index's serialised cache.
+    """
+    try:
+        mode = payload.get("mode", "career")
+        records = get_corpus("career" if mode == "career" else "course").records
+
+        # Prefer the row ID from /api/chat recommendations, fall back to the title
+        position = records.find(row_id=payload.get("id"), title=payload.get("title"))
+        if position is None:
+            return json.dumps({"status": "error", "details": "No additional details found."}), 200
+        return records.details_json(position), 200
+
+    except Exception as e:
+        return json.dumps({"status": "error", "details": str(e)}), 200
+
+
+# Filtered search without the LLM, e.g. {"query": "data analyst", "mode": "career", "filters": {"min_salary": 4000}}
+def search_body(payload):
+    try:
+        results = search_records(
+            payload.get("query", ""),
+            payload.get("mode", "career"),
+            parse_filters(payload.get("filters")),
+            int(payload.get("k", 5)),
+        )
+        return {"status": "success", "results": results}, 200
+
+    except ValueError as e:
+        return {"status": "error", "results": str(e)}, 400
+    except Exception as e:
+        logging.error(f"Error in /api/search: {e}")
+        return {"status": "error", "results": "An error occurred while searching."}, 500
+
+
+# Upskilling courses for a job from the precomputed job -> course graph, e.g. {"id": "<job id>", "k": 5}
+def job_courses_body(payload):
+    try:
+        result = job_courses(payload.get("id"), payload.get("title"), int(payload.get("k", 5)))
+        if result is None:
+            return {"status": "error", "details": "Job not found."}, 404
+        return dict(result, status="success"), 200
+
+    except ValueError as e:
+        return {"status": "error", "details": str(e)}, 400
+    except Exception as e:
+        logging.error(f"Error in /api/job-courses: {e}")
+        return {"status": "error", "details": "An error occurred while looking up courses."}, 500
+
+
+# Reindex after the scrapers wrote new CSVs: only new or changed postings are embedded.
+# Only accepted from the machine itself, e.g. `curl -X POST localhost:5000/api/reindex`.
+def reindex_body(remote_addr, payload):
+    if remote_addr not in ("127.0.0.1", "::1"):
+        return {"status": "error", "details": "Reindexing is only allowed locally."}, 403
+    try:
+        mode = payload.get("mode")
+        modes = [mode] if mode else ["career", "course"]
+        return {"status": "success", "details": {m: reload_corpus(m) for m in modes}}, 200
+    except Exception as e:
+        logging.error(f"Error in /api/reindex: {e}")
+        return {"status": "error", "details": str(e)}, 500
+
+
+# The text to paraphrase, or a 400 when there is none
+def paraphrase_text(payload):
+    text = (payload.get("text") or "").strip()
+    if not text:
+        raise RequestError("No text provided to process.", 400, key="text")
+    return text
+
+
+def paraphrase_prompt(text):
+    return f"""
+            You are a professional assistant. Summarize the following content succinctly and clearly in a friendly and direct manner.
+            Avoid any greeting phrases like "hey there, sure thing."
+            If you get information about "Location: ", it means where this job is located at.
+            Focus on delivering the core information without explaining the summarization process.
+            Always end off by asking the user a question if they need help with other things.
+
+            Content to Summarize:
+            {text}
+            """